@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+benchmarks/bench_docx_extraction.py
+-----------------------------------
+
+Compara la extracción de DOCX en streaming (`iter_docx_paragraphs`, por
+bloques y sin construir el árbol XML) con la extracción anterior, que leía
+`word/document.xml` entero y le aplicaba una expresión regular. Genera un
+DOCX sintético con párrafos del corpus de benchmarks y el marcado habitual
+de Word (estilos, ejecuciones con formato, marcas de revisión ortográfica)
+más una fila de tabla cada `--table-every` párrafos, y mide para cada
+método el mejor tiempo de `--repeat` ejecuciones, el pico de memoria de
+Python (`tracemalloc`) y las líneas de texto producidas.
+
+Uso:
+
+```
+python benchmarks/bench_docx_extraction.py --paragraphs 20000
+```
+"""
+
+import argparse
+import html
+import json
+import random
+import re
+import sys
+import tempfile
+import time
+import tracemalloc
+import zipfile
+from pathlib import Path
+from typing import Any, Callable, Dict
+from xml.sax.saxutils import escape
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR.parent / "ingestor"))
+
+import corpus  # noqa: E402
+import ingest  # noqa: E402
+
+W_NS = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+
+
+def legacy_extract(file_path: Path) -> str:
+    """Extracción anterior: documento completo en memoria y regex sobre el XML."""
+    with zipfile.ZipFile(file_path) as zf:
+        data = zf.read('word/document.xml').decode('utf-8')
+    text = html.unescape(re.sub('<[^<]+?>', '\n', data))
+    return '\n'.join(line.strip() for line in text.splitlines() if line.strip())
+
+
+def streaming_extract(file_path: Path) -> int:
+    return sum(1 for _ in ingest.iter_docx_paragraphs(file_path))
+
+
+def legacy_lines(file_path: Path) -> int:
+    return legacy_extract(file_path).count("\n") + 1
+
+
+def write_docx(path: Path, paragraphs: int, words: int, table_every: int, seed: int) -> None:
+    """Escribe un DOCX con el marcado habitual de Word: estilos, ejecuciones con formato y marcas."""
+    rng = random.Random(seed)
+    run_props = '<w:rPr><w:rFonts w:ascii="Calibri" w:hAnsi="Calibri"/><w:sz w:val="22"/><w:lang w:val="es-ES"/></w:rPr>'
+
+    def paragraph(text: str) -> str:
+        tokens = text.split(" ")
+        runs = []
+        for start in range(0, len(tokens), 8):
+            chunk = escape(" ".join(tokens[start:start + 8]) + " ")
+            runs.append(f'<w:r>{run_props}<w:t xml:space="preserve">{chunk}</w:t></w:r>')
+            if rng.random() < 0.2:
+                runs.append('<w:proofErr w:type="spellStart"/>')
+        return (
+            '<w:p><w:pPr><w:pStyle w:val="Normal"/><w:spacing w:after="120"/><w:jc w:val="both"/></w:pPr>'
+            f'{"".join(runs)}</w:p>'
+        )
+
+    body = []
+    for idx in range(paragraphs):
+        body.append(paragraph(corpus.make_document(words, rng)[0]))
+        if table_every and idx % table_every == table_every - 1:
+            cells = "".join(f"<w:tc>{paragraph(corpus.make_amount(rng))}</w:tc>" for _ in range(4))
+            body.append(f"<w:tbl><w:tr>{cells}</w:tr></w:tbl>")
+    document = (
+        f'<?xml version="1.0" encoding="UTF-8"?><w:document xmlns:w="{W_NS}"><w:body>'
+        f'{"".join(body)}</w:body></w:document>'
+    )
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("word/document.xml", document)
+
+
+def measure(func: Callable[[Path], Any], path: Path, repeat: int) -> Dict[str, Any]:
+    timings = []
+    for _ in range(max(1, repeat)):
+        start = time.perf_counter()
+        func(path)
+        timings.append(time.perf_counter() - start)
+    tracemalloc.start()
+    func(path)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"best_s": round(min(timings), 4), "peak_mb": round(peak / 1e6, 2)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Extracción de DOCX en streaming frente a regex sobre el XML')
+    parser.add_argument('--paragraphs', type=int, default=20000, help='Párrafos del documento sintético')
+    parser.add_argument('--words', type=int, default=60, help='Palabras por párrafo')
+    parser.add_argument('--table-every', type=int, default=50, help='Insertar una fila de tabla cada N párrafos')
+    parser.add_argument('--repeat', type=int, default=3, help='Repeticiones por método (se informa el mejor tiempo)')
+    parser.add_argument('--seed', type=int, default=1, help='Semilla del documento sintético')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "benchmark.docx"
+        write_docx(path, args.paragraphs, args.words, args.table_every, args.seed)
+        legacy = measure(legacy_extract, path, args.repeat)
+        streaming = measure(streaming_extract, path, args.repeat)
+        # La regex parte cada párrafo en tantas líneas como ejecuciones de texto tenga
+        legacy["lines"] = legacy_lines(path)
+        streaming["lines"] = streaming_extract(path)
+        size = path.stat().st_size
+
+    print(json.dumps({
+        "benchmark": "docx_extraction",
+        "paragraphs": args.paragraphs,
+        "docx_bytes": size,
+        "legacy": legacy,
+        "streaming": streaming,
+        "speedup": round(legacy["best_s"] / streaming["best_s"], 2) if streaming["best_s"] else None,
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+benchmarks/bench_keyword_index.py
+---------------------------------
+
+Mide el coste por documento del etiquetado cognitivo y del sentimiento
+heurístico. Compara la implementación original (un `in` por palabra
+clave y etiqueta) con `KeywordIndex` (una sola pasada sobre el texto) y
+repite la medición de `KeywordIndex` con léxicos ampliados artificialmente
+para comprobar que el coste no crece con el número de palabras clave.
+
+Uso:
+
+```
+python benchmarks/bench_keyword_index.py --words 5000 --docs 50 --sizes 0,1000,10000
+```
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR / "pipeline"))
+
+import analyze  # noqa: E402
+import reference  # noqa: E402
+
+FILLER_WORDS = (
+    "el equipo revisa la propuesta del proyecto y detecta un riesgo legal en la normativa "
+    "aunque el resultado es bueno y la idea parece viable pero queda una tarea pendiente"
+).split()
+
+
+def make_documents(count: int, words: int, seed: int) -> List[str]:
+    rng = random.Random(seed)
+    return [" ".join(rng.choice(FILLER_WORDS) for _ in range(words)) for _ in range(count)]
+
+
+def extend_lexicon(lexicon: Dict[str, Any], extra: int) -> Dict[str, Any]:
+    """Añade `extra` palabras clave sintéticas (que no aparecen en el texto) repartidas entre etiquetas."""
+    extended = json.loads(json.dumps(lexicon))
+    tags = list(extended["tags"])
+    for idx in range(extra):
+        extended["tags"][tags[idx % len(tags)]].append(f"termino{idx:06d}")
+    return extended
+
+
+def per_doc_ms(func: Callable[[str], Any], docs: List[str], repeat: int) -> float:
+    """Milisegundos por documento (mejor de `repeat` pasadas)."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for doc in docs:
+            func(doc)
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000 / len(docs)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Benchmark del índice de palabras clave')
+    parser.add_argument('--words', type=int, default=5000, help='Palabras por documento')
+    parser.add_argument('--docs', type=int, default=50, help='Documentos sintéticos')
+    parser.add_argument('--sizes', default='0,1000,10000', help='Palabras clave extra a añadir al léxico')
+    parser.add_argument('--lexicon', default=str(analyze.DEFAULT_LEXICON_PATH), help='Léxico base')
+    parser.add_argument('--repeat', type=int, default=3, help='Repeticiones (se toma el mejor tiempo)')
+    parser.add_argument('--seed', type=int, default=1, help='Semilla del generador')
+    args = parser.parse_args()
+
+    docs = make_documents(args.docs, args.words, args.seed)
+    with open(args.lexicon, "r", encoding="utf-8") as handle:
+        lexicon = json.load(handle)
+
+    def sequential(text: str) -> None:
+        reference.generate_cognitive_tags_sequential(text, None)
+        reference.heuristic_sentiment_sequential(text)
+
+    def indexed(text: str) -> None:
+        analyze.generate_cognitive_tags(text, None)
+        analyze.heuristic_sentiment(text)
+
+    result: Dict[str, Any] = {
+        "benchmark": "keyword_index",
+        "docs": args.docs,
+        "words_per_doc": args.words,
+        "sequential_ms_per_doc": round(per_doc_ms(sequential, docs, args.repeat), 3),
+        "index": [],
+    }
+    for extra in (int(size) for size in args.sizes.split(",") if size):
+        extended = extend_lexicon(lexicon, extra)
+        analyze._KEYWORD_INDEX = analyze.KeywordIndex(extended)
+        keywords = sorted({word for words in extended["tags"].values() for word in words})
+
+        def substring_scan(text: str, keywords: List[str] = keywords) -> None:
+            lower = text.lower()
+            [word for word in keywords if word in lower]
+
+        result["index"].append({
+            "keywords": len(analyze._KEYWORD_INDEX.keywords),
+            "index_ms_per_doc": round(per_doc_ms(indexed, docs, args.repeat), 3),
+            "substring_scan_ms_per_doc": round(per_doc_ms(substring_scan, docs, args.repeat), 3),
+        })
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+benchmarks/bench_sentiment_backend.py
+-------------------------------------
+
+Comprobación de paridad y rendimiento del backend ONNX (int8 dinámico)
+frente al backend PyTorch del clasificador de sentimientos. Ambos se
+evalúan sobre una muestra reservada en español con etiquetas de
+referencia (`benchmarks/data/sentiment_holdout.jsonl`). Se informa de:
+
+* concordancia de etiquetas entre backends y diferencia media de score;
+* exactitud de cada backend respecto a la referencia;
+* textos por segundo de cada backend.
+
+El script termina con código 1 si la concordancia baja de
+`--min-agreement` o si la exactitud de ONNX cae más de
+`--max-accuracy-drop` respecto a PyTorch. Requiere `transformers` y
+`optimum[onnxruntime]`; la primera ejecución exporta y cuantiza el modelo.
+
+Uso:
+
+```
+python benchmarks/bench_sentiment_backend.py --repeat 5
+```
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR / "pipeline"))
+
+import analyze  # noqa: E402
+
+DEFAULT_SAMPLE = Path(__file__).resolve().parent / "data" / "sentiment_holdout.jsonl"
+
+
+def load_sample(path: Path) -> Tuple[List[str], List[str]]:
+    texts: List[str] = []
+    labels: List[str] = []
+    with path.open("r", encoding="utf-8") as handle:
+        for line in handle:
+            if line.strip():
+                row = json.loads(line)
+                texts.append(row["text"])
+                labels.append(row["label"])
+    return texts, labels
+
+
+def run_backend(classifier: Any, texts: List[str], batch_size: int, repeat: int) -> Dict[str, Any]:
+    predictions = analyze.classify_sentiment_batch(texts, classifier, batch_size)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        analyze.classify_sentiment_batch(texts, classifier, batch_size)
+    elapsed = time.perf_counter() - start
+    return {
+        "predictions": predictions,
+        "texts_per_s": round(len(texts) * repeat / elapsed, 1) if elapsed else None,
+    }
+
+
+def accuracy(predictions: List[Tuple[str, float]], labels: List[str]) -> float:
+    hits = sum(1 for (label, _), expected in zip(predictions, labels) if label == expected)
+    return round(hits / len(labels), 4) if labels else 0.0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Paridad y rendimiento del backend ONNX de sentimiento')
+    parser.add_argument('--sample', default=str(DEFAULT_SAMPLE), help='JSONL con campos text y label')
+    parser.add_argument('--batch-size', type=int, default=analyze.DEFAULT_SENTIMENT_BATCH_SIZE, help='Textos por lote')
+    parser.add_argument('--repeat', type=int, default=3, help='Repeticiones para medir el rendimiento')
+    parser.add_argument('--min-agreement', type=float, default=0.95, help='Concordancia mínima de etiquetas')
+    parser.add_argument('--max-accuracy-drop', type=float, default=0.02, help='Caída máxima de exactitud de ONNX')
+    args = parser.parse_args()
+
+    texts, labels = load_sample(Path(args.sample))
+    backends = {}
+    for name in analyze.SENTIMENT_BACKENDS:
+        classifier = analyze.load_sentiment_classifier(name)
+        if classifier is None or (name == "onnx" and not analyze.sentiment_model_id(classifier).startswith("onnx")):
+            print(f"❌ No se pudo cargar el backend {name}", file=sys.stderr)
+            raise SystemExit(2)
+        backends[name] = run_backend(classifier, texts, args.batch_size, max(1, args.repeat))
+
+    reference = backends["pytorch"]["predictions"]
+    candidate = backends["onnx"]["predictions"]
+    agreed = [
+        abs(ref_score - cand_score)
+        for (ref_label, ref_score), (cand_label, cand_score) in zip(reference, candidate)
+        if ref_label == cand_label
+    ]
+    agreement = round(len(agreed) / len(texts), 4) if texts else 0.0
+    accuracy_pytorch = accuracy(reference, labels)
+    accuracy_onnx = accuracy(candidate, labels)
+    passed = agreement >= args.min_agreement and accuracy_pytorch - accuracy_onnx <= args.max_accuracy_drop
+
+    print(json.dumps({
+        "benchmark": "sentiment_backend",
+        "samples": len(texts),
+        "label_agreement": agreement,
+        "mean_score_diff": round(sum(agreed) / len(agreed), 4) if agreed else None,
+        "accuracy_pytorch": accuracy_pytorch,
+        "accuracy_onnx": accuracy_onnx,
+        "texts_per_s_pytorch": backends["pytorch"]["texts_per_s"],
+        "texts_per_s_onnx": backends["onnx"]["texts_per_s"],
+        "passed": passed,
+    }, indent=2))
+    if not passed:
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
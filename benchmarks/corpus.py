@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+benchmarks/corpus.py
+--------------------
+
+Generador de corpus sintéticos en castellano para los benchmarks. Cada
+documento tiene un tamaño controlado (en palabras), frases y párrafos
+realistas para el troceado, palabras clave de las etiquetas cognitivas y
+datos personales sembrados con una proporción fija: DNI y CIF con letra
+de control válida, números tipo IBAN, correos, teléfonos, fechas e
+importes, además de nombres de personas y empresas que se devuelven como
+entidades para simular un doc de spaCy.
+
+El generador es determinista para una semilla dada, de modo que los
+resultados son comparables entre commits.
+
+Uso:
+
+```
+python benchmarks/corpus.py --output outputs/bench_corpus --docs 100 --words 5000
+```
+"""
+
+import argparse
+import random
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+DNI_LETTERS = "TRWAGMYFPDXBNJZSQVHLCKE"
+CIF_LETTERS = "ABCDEFGHJNPQRSUVW"
+MONTHS = [
+    "enero", "febrero", "marzo", "abril", "mayo", "junio",
+    "julio", "agosto", "septiembre", "octubre", "noviembre", "diciembre",
+]
+FIRST_NAMES = ["María", "Juan", "Lucía", "Carlos", "Elena", "Javier", "Carmen", "Pablo", "Sofía", "Andrés"]
+LAST_NAMES = ["García", "Fernández", "López", "Martínez", "Sánchez", "Pérez", "Gómez", "Ruiz", "Díaz", "Moreno"]
+COMPANY_WORDS = ["Servicios", "Globales", "Ibérica", "Soluciones", "Consultores", "Logística", "Norte", "Digital"]
+FILLER_WORDS = (
+    "el equipo revisa la propuesta del proyecto y detecta un riesgo legal en la normativa vigente "
+    "aunque el resultado es bueno y la idea parece viable pero queda una tarea pendiente para la "
+    "próxima reunión con el cliente sobre el contrato de servicios y la protección de datos"
+).split()
+
+
+class SyntheticEntity:
+    """Entidad con la interfaz mínima de `spacy.tokens.Span` que usa el análisis."""
+
+    def __init__(self, text: str, label: str) -> None:
+        self.text = text
+        self.label_ = label
+
+
+class SyntheticDoc:
+    def __init__(self, text: str, ents: List[SyntheticEntity]) -> None:
+        self.text = text
+        self.ents = ents
+
+
+def make_dni(rng: random.Random) -> str:
+    number = rng.randrange(10_000_000, 100_000_000)
+    return f"{number}{DNI_LETTERS[number % 23]}"
+
+
+def make_cif(rng: random.Random) -> str:
+    digits = [rng.randrange(10) for _ in range(7)]
+    odd = sum(sum(divmod(d * 2, 10)) for d in digits[0::2])
+    control = (10 - (sum(digits[1::2]) + odd) % 10) % 10
+    return f"{rng.choice(CIF_LETTERS)}{''.join(map(str, digits))}{control}"
+
+
+def make_iban(rng: random.Random) -> str:
+    bban = "".join(str(rng.randrange(10)) for _ in range(20))
+    # Dígitos de control ISO 13616 ("ES" = 14 28)
+    check = 98 - int(bban + "142800") % 97
+    iban = f"ES{check:02d}{bban}"
+    return " ".join(iban[i:i + 4] for i in range(0, len(iban), 4))
+
+
+def make_email(rng: random.Random) -> str:
+    return f"{rng.choice(FIRST_NAMES).lower()}.{rng.choice(LAST_NAMES).lower()}{rng.randrange(100)}@empresa.es"
+
+
+def make_phone(rng: random.Random) -> str:
+    return f"+34 6{rng.randrange(10)}{rng.randrange(10)} {rng.randrange(100, 1000)} {rng.randrange(100, 1000)}"
+
+
+def make_date(rng: random.Random) -> str:
+    return f"{rng.randrange(1, 29)} de {rng.choice(MONTHS)} de {rng.randrange(2015, 2026)}"
+
+
+def make_amount(rng: random.Random) -> str:
+    return f"{rng.randrange(1, 999)}.{rng.randrange(100, 1000)},{rng.randrange(10, 100)} €"
+
+
+PII_GENERATORS: Dict[str, Callable[[random.Random], str]] = {
+    "DNI": make_dni,
+    "CIF": make_cif,
+    "IBAN": make_iban,
+    "EMAIL": make_email,
+    "PHONE": make_phone,
+    "DATE": make_date,
+    "CURRENCY": make_amount,
+}
+
+
+def make_document(
+    words: int,
+    rng: random.Random,
+    pii_ratio: float = 0.02,
+    entity_ratio: float = 0.01
+) -> Tuple[str, List[SyntheticEntity], Dict[str, int]]:
+    """Genera un documento de `words` palabras con datos sensibles y entidades sembrados.
+
+    Devuelve el texto, las entidades (personas y empresas insertadas) y el
+    número de datos sembrados por tipo.
+    """
+    parts: List[str] = []
+    ents: Dict[str, SyntheticEntity] = {}
+    seeded: Dict[str, int] = {}
+    sentence = 0
+    for idx in range(words):
+        roll = rng.random()
+        if roll < pii_ratio:
+            kind = rng.choice(list(PII_GENERATORS))
+            parts.append(PII_GENERATORS[kind](rng))
+            seeded[kind] = seeded.get(kind, 0) + 1
+        elif roll < pii_ratio + entity_ratio:
+            if rng.random() < 0.7:
+                name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+                label = "PER"
+            else:
+                name = f"{rng.choice(COMPANY_WORDS)} {rng.choice(COMPANY_WORDS)} S.L."
+                label = "ORG"
+            ents.setdefault(name, SyntheticEntity(name, label))
+            parts.append(name)
+            seeded[label] = seeded.get(label, 0) + 1
+        else:
+            parts.append(rng.choice(FILLER_WORDS))
+        sentence += 1
+        if sentence >= rng.randrange(8, 20):
+            parts[-1] += "."
+            sentence = 0
+            if rng.random() < 0.2:
+                parts[-1] += "\n\n"
+    return " ".join(parts), list(ents.values()), seeded
+
+
+def write_corpus(directory: Path, docs: int, words: int, seed: int, pii_ratio: float = 0.02) -> Dict[str, int]:
+    """Escribe `docs` documentos `.txt` en `directory`; devuelve los datos sembrados en total."""
+    rng = random.Random(seed)
+    directory.mkdir(parents=True, exist_ok=True)
+    totals: Dict[str, int] = {}
+    for idx in range(docs):
+        text, _, seeded = make_document(words, rng, pii_ratio)
+        (directory / f"doc_{idx:05d}.txt").write_text(text, encoding="utf-8")
+        for kind, count in seeded.items():
+            totals[kind] = totals.get(kind, 0) + count
+    return totals
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Genera un corpus sintético en castellano con datos sensibles')
+    parser.add_argument('--output', required=True, help='Directorio de salida')
+    parser.add_argument('--docs', type=int, default=100, help='Número de documentos')
+    parser.add_argument('--words', type=int, default=5000, help='Palabras por documento')
+    parser.add_argument('--pii-ratio', type=float, default=0.02, help='Proporción de palabras con datos sensibles')
+    parser.add_argument('--seed', type=int, default=1, help='Semilla del generador')
+    args = parser.parse_args()
+
+    seeded = write_corpus(Path(args.output), args.docs, args.words, args.seed, args.pii_ratio)
+    print(f"✅ {args.docs} documentos en {args.output} (datos sembrados: {seeded})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+benchmarks/reference.py
+-----------------------
+
+Implementaciones secuenciales originales de los caminos críticos de
+`pipeline/analyze.py`. No se usan en el pipeline: sirven de oráculo para
+las pruebas de equivalencia de `tests/` y de línea base para los
+benchmarks de este directorio.
+"""
+
+import re
+import sys
+from pathlib import Path
+from typing import Any, List, Optional, Tuple
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+if str(ROOT_DIR / "pipeline") not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR / "pipeline"))
+
+import analyze  # noqa: E402
+
+
+def redact_credit_cards(text: str) -> str:
+    def replacer(match: re.Match[str]) -> str:
+        raw = match.group(0)
+        digits = "".join(ch for ch in raw if ch.isdigit())
+        if analyze.luhn_check(digits):
+            return "[REDACTED_CARD]"
+        return raw
+
+    return analyze.CARD_RE.sub(replacer, text)
+
+
+def redact_regex_sequential(text: str) -> str:
+    """Implementación original de `analyze.redact_regex` con una pasada por patrón."""
+    text = analyze.EMAIL_RE.sub("[REDACTED_EMAIL]", text)
+    text = analyze.IPV4_RE.sub("[REDACTED_IP]", text)
+    text = analyze.SSN_RE.sub("[REDACTED_SSN]", text)
+    text = analyze.CIF_RE.sub("[REDACTED_CIF]", text)
+    text = analyze.DNI_RE.sub("[REDACTED_DNI]", text)
+    text = redact_credit_cards(text)
+    text = analyze.PHONE_RE.sub("[REDACTED_PHONE]", text)
+    text = analyze.CURRENCY_RE.sub("[REDACTED_MONEY]", text)
+    text = analyze.ZIP_RE.sub("[REDACTED_ZIP]", text)
+    text = analyze.DATE_RE.sub("[REDACTED_DATE]", text)
+
+    # Aplicar redacción contextual
+    for pattern, replacement in analyze.CONTEXTUAL_PATTERNS:
+        def replace_match(m):
+            return f"{m.group(1)}: {replacement}"
+        text = pattern.sub(replace_match, text)
+
+    return text
+
+
+def redact_entities_sequential(text: str, doc: Optional[Any]) -> str:
+    """Implementación original de la redacción por entidades (un `re.sub` por entidad)."""
+    redacted = text
+    if doc is not None:
+        try:
+            for ent in doc.ents:
+                if ent.label_ in analyze.REDACTION_ENTITY_LABELS:
+                    ent_text = ent.text.strip()
+                    if len(ent_text) >= 3:
+                        pattern = re.compile(re.escape(ent_text), re.IGNORECASE)
+                        redacted = pattern.sub(f"[REDACTED_{ent.label_}]", redacted)
+        except Exception as e:
+            analyze.logger.debug("Error al aplicar redacción por entidades: %s", e)
+    return redacted
+
+
+def heuristic_sentiment_sequential(text: str) -> Tuple[str, float]:
+    """Implementación original de `analyze.heuristic_sentiment` con el léxico fijo en el código."""
+    # Palabras clave extendidas para español
+    positive_words = {
+        "bueno", "excelente", "maravilloso", "positivo", "satisfactorio",
+        "bien", "genial", "perfecto", "óptimo", "fantástico", "magnífico",
+        "agradable", "hermoso", "beneficio", "éxito", "victoria"
+    }
+    negative_words = {
+        "malo", "terrible", "pésimo", "negativo", "riesgo", "fracaso",
+        "mal", "horrible", "desastre", "catastrófico", "problema", "delito",
+        "crimen", "peligro", "amenaza", "riesgoso", "perjudicial", "daño",
+        "sanción", "castigo", "ilegal", "prohibido", "violación"
+    }
+    lower = text.lower()
+
+    # Contar palabras completas (no subcadenas) para mayor precisión
+    pos_count = sum(1 for word in positive_words if f" {word} " in f" {lower} " or f" {word}." in f" {lower} ")
+    neg_count = sum(1 for word in negative_words if f" {word} " in f" {lower} " or f" {word}." in f" {lower} ")
+
+    total = pos_count + neg_count
+    if total == 0:
+        return ("NEUTRAL", 0.5)
+
+    score = pos_count / total
+    label = "POSITIVE" if score >= 0.5 else "NEGATIVE"
+    return (label, round(score, 4))
+
+
+def generate_cognitive_tags_sequential(text: str, doc: Optional[Any]) -> List[str]:
+    """Implementación original de `analyze.generate_cognitive_tags` con el léxico fijo en el código."""
+    tags: List[str] = []
+    lower = text.lower()
+
+    # Palabras clave expandidas
+    idea_keywords = {"idea", "innovación", "concepto", "teoría", "hipótesis", "propuesta", "pensamiento"}
+    risk_keywords = {"riesgo", "amenaza", "peligro", "problema", "delito", "crimen", "ilegalidad", "sanción"}
+    legal_keywords = {"legal", "ley", "normativa", "regulación", "jurídico", "artículo", "código", "derecho"}
+    project_keywords = {"proyecto", "implementación", "desarrollo", "ejecución", "plan", "programa"}
+    viability_keywords = {"viable", "viabilidad", "factible", "realizable", "posible"}
+    emotion_keywords = {"feliz", "triste", "emocionado", "enojado", "satisfecho", "preocupado", "esperanzado"}
+    intuition_keywords = {"intuición", "presentimiento", "corazonada", "instinto", "sensación"}
+    action_keywords = {"pendiente", "por hacer", "tarea", "accionar", "deber", "debe", "necesario"}
+
+    # Verificar palabras clave (búsqueda aproximada para mayor cobertura)
+    if any(word in lower for word in idea_keywords):
+        tags.append("idea")
+    if any(word in lower for word in risk_keywords):
+        tags.append("riesgo")
+    if any(word in lower for word in legal_keywords):
+        tags.append("legal")
+    if any(word in lower for word in project_keywords):
+        tags.append("proyecto")
+    if any(word in lower for word in viability_keywords):
+        tags.append("viabilidad")
+    if any(word in lower for word in emotion_keywords):
+        tags.append("emoción")
+    if any(word in lower for word in intuition_keywords):
+        tags.append("intuición")
+    if any(word in lower for word in action_keywords):
+        tags.append("acción pendiente")
+
+    return analyze.add_entity_tags(tags, doc)
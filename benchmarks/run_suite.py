@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+benchmarks/run_suite.py
+-----------------------
+
+Suite de benchmarks de los caminos críticos del análisis sobre corpus
+sintéticos en castellano (`corpus.py`) con datos personales sembrados.
+Mide, para cada tamaño de documento:
+
+* `redact_regex`, `redact_text` (con las entidades sembradas como doc),
+  `generate_cognitive_tags` y `heuristic_sentiment` sobre un documento;
+* `generate_record` sobre un corpus de `--docs` archivos (con redacción);
+* `analyze.py` de principio a fin sobre el mismo corpus.
+
+Cada caso se ejecuta en un subproceso propio, de modo que el pico de
+memoria (RSS máximo del proceso, vía `os.wait4`) es el de ese caso y no
+el acumulado de la suite. El análisis completo se lanza sin modelos
+(`COGNITIVE_FAST_MODE`) salvo que se indique `--with-models`.
+
+Los resultados se guardan en un JSON (por defecto
+`benchmarks/results/<commit>.json`) con el commit, la plataforma y, por
+caso, el mejor tiempo, el rendimiento (docs/s y MB/s) y el pico de RSS.
+Con `--compare` se contrasta con un resultado anterior y el script
+termina con código 1 si algún caso es más lento que `--threshold` veces
+el de referencia.
+
+Uso:
+
+```
+python benchmarks/run_suite.py --sizes 1000,10000 --docs 50
+python benchmarks/run_suite.py --compare benchmarks/results/abc1234.json
+```
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+BENCH_DIR = Path(__file__).resolve().parent
+ROOT_DIR = BENCH_DIR.parent
+sys.path.insert(0, str(ROOT_DIR / "pipeline"))
+
+import corpus  # noqa: E402
+
+DOCUMENT_CASES = ("redact_regex", "redact_text", "generate_cognitive_tags", "heuristic_sentiment")
+CORPUS_CASES = ("generate_record", "analyze_e2e")
+CASES = DOCUMENT_CASES + CORPUS_CASES
+TRACE = {"run_id": "benchmark", "actor": "benchmark", "env": "prod"}
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def timed_runs(func: Callable[..., Any], repeat: int, make_input: Optional[Callable[[], Any]] = None) -> List[float]:
+    """Tiempos de `repeat` ejecuciones; `make_input` prepara la entrada fuera de la medición."""
+    timings = []
+    for _ in range(max(1, repeat)):
+        args = (make_input(),) if make_input is not None else ()
+        start = time.perf_counter()
+        func(*args)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def run_document_case(case: str, words: int, repeat: int, seed: int) -> Dict[str, Any]:
+    """Mide una función del análisis sobre un documento sintético (en este proceso)."""
+    import analyze
+
+    text, ents, seeded = corpus.make_document(words, random.Random(seed))
+    doc = corpus.SyntheticDoc(text, ents)
+    funcs: Dict[str, Callable[[str], Any]] = {
+        "redact_regex": analyze.redact_regex,
+        "redact_text": lambda value: analyze.redact_text(value, doc),
+        "generate_cognitive_tags": lambda value: analyze.generate_cognitive_tags(value, None),
+        "heuristic_sentiment": analyze.heuristic_sentiment,
+    }
+    # Un objeto de texto nuevo en cada repetición: `KeywordIndex` memoriza el último texto analizado
+    timings = timed_runs(funcs[case], repeat, lambda: "".join([text, ""]))
+    return {"docs": 1, "bytes": len(text.encode("utf-8")), "seeded_pii": sum(seeded.values()), "timings": timings}
+
+
+def run_corpus_case(case: str, corpus_dir: Path, repeat: int, with_models: bool) -> Dict[str, Any]:
+    """Mide `generate_record` en este proceso o `analyze.py` en un subproceso hijo."""
+    paths = sorted(corpus_dir.glob("*.txt"))
+    size = sum(p.stat().st_size for p in paths)
+    if case == "generate_record":
+        import analyze
+
+        def run() -> None:
+            for path in paths:
+                analyze.generate_record(path, None, None, True, "bench", "prod", TRACE)
+
+        return {"docs": len(paths), "bytes": size, "timings": timed_runs(run, repeat)}
+
+    env = dict(os.environ)
+    if not with_models:
+        env["COGNITIVE_FAST_MODE"] = "1"
+    timings = []
+    with tempfile.TemporaryDirectory() as tmp:
+        env["COGNITIVE_AUDIT_LOG"] = str(Path(tmp) / "audit.jsonl")
+        command = [
+            sys.executable, str(ROOT_DIR / "pipeline" / "analyze.py"),
+            "--input", str(corpus_dir),
+            "--output", str(Path(tmp) / "insights" / "analysis.jsonl"),
+            "--no-cache",
+        ]
+        for _ in range(max(1, repeat)):
+            start = time.perf_counter()
+            subprocess.run(command, env=env, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            timings.append(time.perf_counter() - start)
+    return {"docs": len(paths), "bytes": size, "timings": timings}
+
+
+def child_main(args: argparse.Namespace) -> None:
+    if args.case in DOCUMENT_CASES:
+        result = run_document_case(args.case, args.words, args.repeat, args.seed)
+    else:
+        result = run_corpus_case(args.case, Path(args.corpus), args.repeat, args.with_models)
+    print(json.dumps(result))
+
+
+def run_child(argv: List[str]) -> Dict[str, Any]:
+    """Ejecuta un caso en un subproceso y devuelve su resultado con el pico de RSS."""
+    command = [sys.executable, str(Path(__file__).resolve())] + argv
+    proc = subprocess.Popen(command, stdout=subprocess.PIPE, cwd=ROOT_DIR)
+    output = proc.stdout.read() if proc.stdout is not None else b""
+    peak_rss_kb: Optional[int] = None
+    if hasattr(os, "wait4"):
+        _, status, usage = os.wait4(proc.pid, 0)
+        proc.returncode = os.waitstatus_to_exitcode(status)
+        # ru_maxrss está en KiB en Linux y en bytes en macOS
+        peak_rss_kb = usage.ru_maxrss // 1024 if sys.platform == "darwin" else usage.ru_maxrss
+    else:
+        proc.wait()
+    if proc.returncode != 0:
+        raise RuntimeError(f"El caso {' '.join(argv)} terminó con código {proc.returncode}")
+    result = json.loads(output.decode("utf-8").strip().splitlines()[-1])
+    result["peak_rss_kb"] = peak_rss_kb
+    return result
+
+
+def summarize(case: str, words: int, result: Dict[str, Any]) -> Dict[str, Any]:
+    timings = result["timings"]
+    best = min(timings)
+    return {
+        "case": case,
+        "words": words,
+        "docs": result["docs"],
+        "bytes": result["bytes"],
+        "repeat": len(timings),
+        "best_s": round(best, 6),
+        "mean_s": round(sum(timings) / len(timings), 6),
+        "docs_per_s": round(result["docs"] / best, 2) if best else None,
+        "mb_per_s": round(result["bytes"] / best / 1e6, 3) if best else None,
+        "peak_rss_kb": result.get("peak_rss_kb"),
+    }
+
+
+def compare(results: List[Dict[str, Any]], baseline: Dict[str, Any], threshold: float) -> List[Dict[str, Any]]:
+    """Compara el mejor tiempo de cada caso con el de un resultado anterior."""
+    previous = {(r["case"], r["words"]): r for r in baseline.get("results", [])}
+    rows = []
+    for result in results:
+        before = previous.get((result["case"], result["words"]))
+        if before is None or not before.get("best_s"):
+            continue
+        ratio = result["best_s"] / before["best_s"]
+        rows.append({
+            "case": result["case"],
+            "words": result["words"],
+            "baseline_s": before["best_s"],
+            "current_s": result["best_s"],
+            "ratio": round(ratio, 3),
+            "regression": ratio > threshold,
+        })
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Suite de benchmarks del pipeline de análisis')
+    parser.add_argument('--sizes', default='1000,10000,50000', help='Palabras por documento, separadas por comas')
+    parser.add_argument('--docs', type=int, default=50, help='Documentos del corpus para generate_record y analyze.py')
+    parser.add_argument('--repeat', type=int, default=3, help='Repeticiones por caso (se informa el mejor tiempo)')
+    parser.add_argument('--seed', type=int, default=1, help='Semilla del corpus sintético')
+    parser.add_argument('--cases', default=','.join(CASES), help='Casos a ejecutar, separados por comas')
+    parser.add_argument('--with-models', action='store_true', help='Carga spaCy y transformers en analyze.py')
+    parser.add_argument('--output', default='', help='Archivo JSON de resultados (por defecto benchmarks/results/<commit>.json)')
+    parser.add_argument('--compare', default='', help='Resultado anterior con el que comparar')
+    parser.add_argument('--threshold', type=float, default=1.2, help='Ratio de tiempo a partir del cual hay regresión')
+    # Uso interno: ejecución de un único caso en un subproceso
+    parser.add_argument('--case', help=argparse.SUPPRESS)
+    parser.add_argument('--words', type=int, default=0, help=argparse.SUPPRESS)
+    parser.add_argument('--corpus', default='', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.case:
+        child_main(args)
+        return
+
+    sizes = [int(size) for size in args.sizes.split(',') if size.strip()]
+    cases = [case.strip() for case in args.cases.split(',') if case.strip()]
+    unknown = sorted(set(cases) - set(CASES))
+    if unknown:
+        parser.error(f"casos desconocidos: {', '.join(unknown)}")
+
+    results: List[Dict[str, Any]] = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for words in sizes:
+            corpus_dir = Path(tmp) / f"corpus_{words}"
+            if any(case in CORPUS_CASES for case in cases):
+                corpus.write_corpus(corpus_dir, args.docs, words, args.seed)
+            for case in cases:
+                argv = ['--case', case, '--words', str(words), '--repeat', str(args.repeat), '--seed', str(args.seed)]
+                if case in CORPUS_CASES:
+                    argv += ['--corpus', str(corpus_dir)]
+                if args.with_models:
+                    argv.append('--with-models')
+                summary = summarize(case, words, run_child(argv))
+                results.append(summary)
+                print(f"  {case:<24} {words:>7} palabras  {summary['best_s']:>9.4f} s  "
+                      f"{summary['mb_per_s']} MB/s  RSS {summary['peak_rss_kb']} KiB", file=sys.stderr)
+
+    commit = git_commit()
+    report: Dict[str, Any] = {
+        "benchmark": "analysis_suite",
+        "commit": commit,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "seed": args.seed,
+        "with_models": args.with_models,
+        "results": results,
+    }
+    regressions: List[Dict[str, Any]] = []
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text(encoding="utf-8"))
+        report["baseline_commit"] = baseline.get("commit", "")
+        report["comparison"] = compare(results, baseline, args.threshold)
+        regressions = [row for row in report["comparison"] if row["regression"]]
+
+    output = Path(args.output) if args.output else BENCH_DIR / "results" / f"{commit}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+    print(f"💾 Resultados: {output}")
+    if regressions:
+        for row in regressions:
+            print(f"❌ Regresión en {row['case']} ({row['words']} palabras): x{row['ratio']}", file=sys.stderr)
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
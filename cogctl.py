@@ -11,7 +11,9 @@ son:
 
 - ``init``    → Crear la estructura básica de carpetas.
 - ``ingest``  → Ingerir un archivo específico mediante el módulo de ingesta.
-- ``analyze`` → Ejecutar el pipeline de análisis sobre los textos ingeridos.
+- ``analyze`` → Ejecutar el pipeline de análisis sobre los textos ingeridos
+  (a través del servicio de análisis si está levantado).
+- ``serve``   → Levantar el servicio de análisis con los modelos en memoria.
 - ``deploy``  → Levantar los servicios definidos en ``docker-compose.yml``.
 - ``status``  → Mostrar el estado de los contenedores Docker.
 - ``verify``  → Validar el progreso de un Lab (evidencia y seguridad).
@@ -22,21 +24,52 @@ Uso:
 python cogctl.py init
 python cogctl.py ingest nombre_archivo.ext
 python cogctl.py analyze
+python cogctl.py serve
 python cogctl.py deploy
 python cogctl.py status
 ```
 """
 
 import argparse
+import json
+import os
 import subprocess
 import sys
+import urllib.error
+import urllib.request
 from pathlib import Path
+from typing import Any, Dict, Optional
+
+from pipeline.records import iter_records, resolve_analysis_path
 
 
 BASE_DIR = Path(__file__).resolve().parent
 INPUT_DIR = BASE_DIR / 'data' / 'input'
 RAW_DIR = BASE_DIR / 'outputs' / 'raw'
 INSIGHTS_DIR = BASE_DIR / 'outputs' / 'insights'
+SERVICE_URL = os.getenv('COGNITIVE_SERVICE_URL', 'http://127.0.0.1:8765')
+# Las mismas que ``analyze.REDACTION_ENV_VARS``: se envían al servicio con cada trabajo
+REDACTION_ENV_VARS = ('COGNITIVE_ENV', 'COGNITIVE_REDACT', 'COGNITIVE_HASH_SALT')
+
+
+def service_request(path: str, payload: Optional[Dict[str, Any]] = None, timeout: Optional[float] = None) -> Dict[str, Any]:
+    """Llama a la API JSON del servicio de análisis (``pipeline/service.py``)."""
+    data = json.dumps(payload).encode('utf-8') if payload is not None else None
+    request = urllib.request.Request(
+        SERVICE_URL.rstrip('/') + path,
+        data=data,
+        headers={'Content-Type': 'application/json'}
+    )
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        return json.loads(response.read().decode('utf-8'))
+
+
+def service_available() -> bool:
+    """Indica si el servicio de análisis responde en ``SERVICE_URL``."""
+    try:
+        return service_request('/health', timeout=0.5).get('status') == 'ok'
+    except (OSError, ValueError):
+        return False
 
 
 def cmd_init(args: argparse.Namespace) -> None:
@@ -71,21 +104,68 @@ def cmd_ingest(args: argparse.Namespace) -> None:
 
 
 def cmd_analyze(args: argparse.Namespace) -> None:
-    """Ejecuta el análisis cognitivo sobre los textos ingeridos."""
+    """Ejecuta el análisis cognitivo sobre los textos ingeridos.
+
+    Si el servicio de análisis está levantado, el trabajo se le envía y se
+    reutilizan sus modelos ya cargados; si no, se lanza ``analyze.py``. El
+    entorno, la redacción y el salt definidos en este proceso se envían con
+    el trabajo: el servicio los usa para reforzar su propia redacción (un
+    servicio en ``prod`` redacta siempre).
+    """
     INSIGHTS_DIR.mkdir(parents=True, exist_ok=True)
+    if not args.local and service_available():
+        print(f'🛰️  Usando el servicio de análisis en {SERVICE_URL}')
+        try:
+            summary = service_request('/jobs', {
+                'input': str(RAW_DIR),
+                'output': str(INSIGHTS_DIR / 'analysis.json'),
+                'no_cache': args.no_cache,
+                'workers': args.workers,
+                'redaction': {key: os.environ[key] for key in REDACTION_ENV_VARS if os.getenv(key)},
+            })
+        except urllib.error.HTTPError as e:
+            print(f'❌ Error en el análisis: {e.read().decode("utf-8", errors="replace")}')
+            raise SystemExit(1)
+        except OSError as e:
+            print(f'❌ Error en el análisis: {e}')
+            raise SystemExit(1)
+        print(f"✅ Análisis completado: {summary['file_count']} archivos, {summary['error_count']} errores "
+              f"({summary['duration_ms']} ms)")
+        print(f"💾 Resultados: {summary['output_file']}")
+        return
+    command = [
+        sys.executable,
+        str(BASE_DIR / 'pipeline' / 'analyze.py'),
+        '--input', str(RAW_DIR),
+        '--output', str(INSIGHTS_DIR / 'analysis.json'),
+        '--schema', str(BASE_DIR / 'schemas' / 'insight.schema.json')
+    ]
+    if args.no_cache:
+        command.append('--no-cache')
+    if args.workers:
+        command.extend(['--workers', str(args.workers)])
     try:
-        subprocess.run([
-            sys.executable,
-            str(BASE_DIR / 'pipeline' / 'analyze.py'),
-            '--input', str(RAW_DIR),
-            '--output', str(INSIGHTS_DIR / 'analysis.json'),
-            '--schema', str(BASE_DIR / 'schemas' / 'insight.schema.json')
-        ], check=True)
+        subprocess.run(command, check=True)
     except subprocess.CalledProcessError as e:
         print(f'❌ Error en el análisis: {e}')
         raise SystemExit(1)
 
 
+def cmd_serve(args: argparse.Namespace) -> None:
+    """Levanta el servicio de análisis con los modelos residentes en memoria."""
+    # El servicio solo puede leer y escribir bajo outputs/ (donde ``analyze`` deja sus rutas)
+    command = [sys.executable, str(BASE_DIR / 'pipeline' / 'service.py'), '--data-root', str(BASE_DIR / 'outputs')]
+    if args.port:
+        command.extend(['--port', str(args.port)])
+    try:
+        subprocess.run(command, check=True)
+    except KeyboardInterrupt:
+        pass
+    except subprocess.CalledProcessError as e:
+        print(f'❌ Error en el servicio de análisis: {e}')
+        raise SystemExit(1)
+
+
 def cmd_deploy(args: argparse.Namespace) -> None:
     """Despliega los servicios definidos en docker-compose."""
     print('🚀 Desplegando servicios...')
@@ -101,29 +181,33 @@ def cmd_verify(args: argparse.Namespace) -> None:
     """Valida la evidencia generada durante un Lab."""
     print("🔍 Validando Lab 01 - Línea base de pipeline seguro...")
 
-    # Check analysis.json
-    analysis_file = INSIGHTS_DIR / 'analysis.json'
+    # Check analysis.json / analysis.jsonl
+    analysis_file = resolve_analysis_path(INSIGHTS_DIR)
     if not analysis_file.exists():
         print("❌ ERROR: No se encontró 'analysis.json'. ¿Has ejecutado 'python cogctl.py analyze'?")
         return
 
-    import json
     try:
-        data = json.loads(analysis_file.read_text(encoding='utf-8'))
-        if not data:
-            print("⚠️ ADVERTENCIA: 'analysis.json' está vacío. No hay archivos procesados.")
+        total = 0
+        redacted_count = 0
+        has_entities = False
+        for r in iter_records(analysis_file):
+            total += 1
+            redacted_count += 1 if r.get('redacted') else 0
+            has_entities = has_entities or bool(r.get('entities'))
+        if not total:
+            print(f"⚠️ ADVERTENCIA: '{analysis_file.name}' está vacío. No hay archivos procesados.")
         else:
-            print(f"✅ 'analysis.json' encontrado con {len(data)} registros.")
+            print(f"✅ '{analysis_file.name}' encontrado con {total} registros.")
 
             # Check for redaction
-            redacted_count = sum(1 for r in data if r.get('redacted'))
             if redacted_count > 0:
                 print(f"✅ Seguridad: {redacted_count} registros están correctamente REDACTADOS.")
             else:
                 print("⚠️ Seguridad: Ningún registro está redactado. Prueba con $env:COGNITIVE_REDACT='1' para pasar el Lab en modo 'Secure'.")
 
             # Check for entities (AI Power-ups)
-            if any(r.get('entities') for r in data):
+            if has_entities:
                 print("✅ IA: Se han detectado entidades mediante spaCy.")
             else:
                 print("⚠️ IA: No se han detectado entidades. ¿Has instalado spaCy y su modelo de español?")
@@ -150,8 +234,16 @@ def build_parser() -> argparse.ArgumentParser:
 
     # analyze
     parser_analyze = subparsers.add_parser('analyze', help='Ejecuta el análisis cognitivo')
+    parser_analyze.add_argument('--no-cache', action='store_true', help='Reanaliza todos los archivos ignorando la caché')
+    parser_analyze.add_argument('--workers', type=int, default=0, help='Procesos de análisis en paralelo (por defecto, el de analyze.py)')
+    parser_analyze.add_argument('--local', action='store_true', help='Ejecuta analyze.py aunque el servicio de análisis esté levantado')
     parser_analyze.set_defaults(func=cmd_analyze)
 
+    # serve
+    parser_serve = subparsers.add_parser('serve', help='Levanta el servicio de análisis con modelos en memoria')
+    parser_serve.add_argument('--port', type=int, default=0, help='Puerto HTTP (por defecto 8765)')
+    parser_serve.set_defaults(func=cmd_serve)
+
     # deploy
     parser_deploy = subparsers.add_parser('deploy', help='Despliega servicios con docker-compose')
     parser_deploy.set_defaults(func=cmd_deploy)
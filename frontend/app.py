@@ -17,18 +17,26 @@ python frontend/app.py
 ```
 """
 
-import json
+import sys
 from pathlib import Path
 
+ROOT_DIR = Path(__file__).resolve().parent.parent
+if str(ROOT_DIR) not in sys.path:
+    sys.path.append(str(ROOT_DIR))
+
+try:
+    from records import iter_records, resolve_analysis_path  # copiado junto a la app en la imagen Docker
+except ImportError:
+    from pipeline.records import iter_records, resolve_analysis_path  # noqa: E402
+
 
 def main() -> None:
-    analysis_file = Path('outputs/insights/analysis.json')
+    analysis_file = resolve_analysis_path(Path('outputs/insights'))
     if not analysis_file.exists():
         print('⚠️  No se encontró el archivo de análisis. Ejecuta primero el comando de análisis.')
         return
-    data = json.loads(analysis_file.read_text(encoding='utf-8'))
     print('📊 Resultados del análisis cognitivo:')
-    for report in data:
+    for report in iter_records(analysis_file):
         print(f"\n📄 Archivo: {report.get('file')}")
         print(f"   Palabras: {report.get('word_count')}")
         print(f"   Caracteres: {report.get('char_count')}")
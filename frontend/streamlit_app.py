@@ -18,15 +18,24 @@ streamlit run frontend/streamlit_app.py --server.headless true --server.port 850
 
 Al ejecutar dentro del contenedor Docker de ``frontend`` se utiliza
 ``streamlit run`` en el ``CMD``.
+
+Con ``COGNITIVE_UI_METRICS_PORT`` la aplicación expone ``/metrics`` en
+formato Prometheus (``pipeline/telemetry.py``): tiempo de carga de cada
+página y eventos auditados de la interfaz.
+
+La tabla muestra como mucho ``COGNITIVE_UI_MAX_RECORDS`` registros (5000
+por defecto, 0 sin límite); un ``analysis.jsonl`` se lee solo hasta ese
+límite.
 """
 
 import hashlib
 import json
 import os
 import subprocess
+import time
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 
 import pandas as pd  # type: ignore
 import streamlit as st  # type: ignore
@@ -43,6 +52,19 @@ try:
 except ImportError:
     GamificationEngine = None
 
+try:
+    import telemetry  # copiado junto a la app en la imagen Docker
+except ImportError:
+    try:
+        from pipeline import telemetry
+    except ImportError:
+        telemetry = None
+
+try:
+    from records import DEFAULT_UI_MAX_RECORDS, read_records, resolve_analysis_path  # copiado junto a la app en la imagen Docker
+except ImportError:
+    from pipeline.records import DEFAULT_UI_MAX_RECORDS, read_records, resolve_analysis_path
+
 ROLE_PERMS = {
     "viewer": {"view_details": False, "view_entities": False, "view_file": False},
     "analyst": {"view_details": True, "view_entities": True, "view_file": False},
@@ -50,14 +72,15 @@ ROLE_PERMS = {
 }
 
 
-def load_data(path: Path) -> List[Dict[str, Any]]:
-    """Carga el archivo de análisis JSON y devuelve una lista de registros."""
+def load_data(path: Path) -> Tuple[List[Dict[str, Any]], bool]:
+    """Carga hasta `COGNITIVE_UI_MAX_RECORDS` registros; indica si se han truncado."""
     if not path.exists():
-        return []
+        return [], False
+    limit = int(os.getenv("COGNITIVE_UI_MAX_RECORDS", str(DEFAULT_UI_MAX_RECORDS)) or 0)
     try:
-        return json.loads(path.read_text(encoding="utf-8"))
+        return read_records(path, limit)
     except Exception:
-        return []
+        return [], False
 
 
 def now_iso() -> str:
@@ -93,6 +116,8 @@ def write_audit_event(event: Dict[str, Any], audit_path: Path) -> None:
             handle.write(json.dumps(event, ensure_ascii=False) + "\n")
     except Exception:
         pass
+    if telemetry is not None:
+        telemetry.record_event(event)
 
 
 def load_auth_tokens() -> Dict[str, str]:
@@ -283,8 +308,8 @@ def main() -> None:
         st.session_state.pop("access_logged", None)
         st.experimental_rerun()
 
-    analysis_path = base / "insights" / "analysis.json"
-    data = load_data(analysis_path)
+    analysis_path = resolve_analysis_path(base / "insights")
+    data, truncated = load_data(analysis_path)
     if not data:
         msg = (
             f"No se encontró el archivo de análisis en: {analysis_path}."
@@ -292,6 +317,11 @@ def main() -> None:
         )
         st.warning(msg)
         return
+    if truncated:
+        st.info(
+            f"Se muestran los primeros {len(data)} registros de {analysis_path.name}; "
+            "ajusta COGNITIVE_UI_MAX_RECORDS para ver más."
+        )
     if not st.session_state.get("access_logged"):
         write_audit_event(
             {
@@ -412,5 +442,24 @@ def main() -> None:
         else:
             st.error("Error: Gamification Engine no disponible.")
 
+
+def run_page() -> None:
+    """Renderiza la página midiendo su tiempo de carga para las métricas."""
+    if telemetry is None:
+        main()
+        return
+    port = int(os.getenv("COGNITIVE_UI_METRICS_PORT", "0") or 0)
+    if port:
+        try:
+            telemetry.start_http_server(port)
+        except OSError as exc:
+            logging.warning("No se pudo exponer las métricas en el puerto %s: %s", port, exc)
+    started = time.perf_counter()
+    try:
+        main()
+    finally:
+        telemetry.UI_PAGE_LOAD_SECONDS.observe(time.perf_counter() - started, page="analysis")
+
+
 if __name__ == "__main__":
-    main()
+    run_page()
@@ -17,21 +17,33 @@ python frontend/tui.py
 ```
 """
 
-import json
+import os
+import sys
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple
 
 from rich.console import Console
 from rich.table import Table
 
+ROOT_DIR = Path(__file__).resolve().parent.parent
+if str(ROOT_DIR) not in sys.path:
+    sys.path.append(str(ROOT_DIR))
 
-def load_data(path: Path) -> List[Dict[str, Any]]:
+try:
+    from records import DEFAULT_UI_MAX_RECORDS, read_records, resolve_analysis_path  # copiado junto a la app en la imagen Docker
+except ImportError:
+    from pipeline.records import DEFAULT_UI_MAX_RECORDS, read_records, resolve_analysis_path  # noqa: E402
+
+
+def load_data(path: Path) -> Tuple[List[Dict[str, Any]], bool]:
+    """Carga hasta `COGNITIVE_UI_MAX_RECORDS` registros; indica si se han truncado."""
     if not path.exists():
-        return []
+        return [], False
+    limit = int(os.getenv("COGNITIVE_UI_MAX_RECORDS", str(DEFAULT_UI_MAX_RECORDS)) or 0)
     try:
-        return json.loads(path.read_text(encoding="utf-8"))
+        return read_records(path, limit)
     except Exception:
-        return []
+        return [], False
 
 
 def display_table(data: List[Dict[str, Any]], console: Console, tags_filter: List[str]) -> None:
@@ -59,11 +71,13 @@ def display_table(data: List[Dict[str, Any]], console: Console, tags_filter: Lis
 
 def main() -> None:
     console = Console()
-    analysis_path = Path("outputs/insights/analysis.json")
-    data = load_data(analysis_path)
+    analysis_path = resolve_analysis_path(Path("outputs/insights"))
+    data, truncated = load_data(analysis_path)
     if not data:
         console.print("[bold red]⚠️  No se encontró el archivo de análisis. Ejecuta primero el pipeline.")
         return
+    if truncated:
+        console.print(f"[yellow]Se muestran los primeros {len(data)} registros (COGNITIVE_UI_MAX_RECORDS).")
     # Mostrar etiquetas disponibles
     all_tags = sorted({tag for rec in data for tag in rec.get("intent_tags", [])})
     console.print("Etiquetas disponibles: " + ", ".join(all_tags))
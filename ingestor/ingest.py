@@ -19,63 +19,371 @@ python ingestor/ingest.py /ruta/al/archivo --output outputs/raw
 
 Para ingerir un directorio completo de archivos, simplemente proporcione la
 ruta del directorio; todos los archivos serán procesados recursivamente.
+
+Los archivos con extensión desconocida (o sin extensión) se reconocen por
+sus primeros bytes: los PDF, DOCX, audio y vídeo van a su extractor y el
+texto se copia. El resto de binarios no se vuelcan en base64: se escribe
+una ficha con nombre, tipo MIME y tamaño que el análisis reconoce y omite.
+
+La ingesta es incremental: un manifiesto (por defecto
+`<salida>/../cache/ingest/manifest.json`, o `--manifest` /
+`COGNITIVE_INGEST_MANIFEST`) guarda por cada fuente su tamaño, `mtime`,
+SHA-256 y el texto generado, y las fuentes sin cambios se omiten en las
+siguientes ejecuciones (`--force` reingiere todo). Con `--workers N` (o
+`COGNITIVE_INGEST_WORKERS`) los documentos se convierten en un pool de
+procesos, y el audio y el vídeo en un pool aparte limitado por
+`--media-workers` (`COGNITIVE_INGEST_MEDIA_WORKERS`, 1 por defecto)
+porque cada transcripción con Whisper ocupa un modelo en memoria:
+
+```
+python ingestor/ingest.py data/input --output outputs/raw --workers 8
+```
+
+El modelo de Whisper se carga una sola vez por proceso y se reutiliza
+para toda la cola de audio y vídeo; el tamaño se elige con
+`--whisper-model` (`COGNITIVE_WHISPER_MODEL`, `base` por defecto). Cada
+entrada del manifiesto guarda el tiempo de conversión (`elapsed_ms`) y,
+para audio y vídeo, el modelo usado, de modo que cambiar de modelo vuelve
+a transcribir las grabaciones.
+
+Los PDF se extraen página a página directamente al archivo de salida, sin
+reunir todo el texto en memoria. Con `--pdf-workers N`
+(`COGNITIVE_INGEST_PDF_WORKERS`) los PDF de al menos
+`--pdf-parallel-min-pages` páginas (200 por defecto) se reparten en
+rangos entre N procesos, cada uno con su propia apertura del documento.
+Al final se informa de las páginas por segundo.
+
+Los DOCX también se extraen en streaming: el XML de cada parte (cabeceras,
+cuerpo, notas y pies) se lee por bloques desde el zip y cada párrafo o
+fila de tabla se escribe en cuanto se completa.
+
+Con `--store` (`COGNITIVE_RAW_STORE=1`) el directorio de salida es un
+almacén direccionado por contenido: cada texto se guarda una vez en
+`objects/<aa>/<bb>/<sha256>.txt` (`.txt.zst` con `--compression zstd`) y
+`index.json` relaciona cada fuente con su hash. Las fuentes duplicadas
+ocupan un solo objeto y `analyze.py` analiza cada contenido una sola vez.
 """
 
 import argparse
+import codecs
+import hashlib
 import html
+import json
+import os
 import re
+import time
 import zipfile
+from collections import deque
+from datetime import datetime, timezone
 from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Incrementar cuando cambien los extractores para invalidar el manifiesto
+INGEST_VERSION = "3"
+DEFAULT_WHISPER_MODEL = "base"
+# Páginas a partir de las cuales un PDF se reparte entre procesos
+DEFAULT_PDF_PARALLEL_MIN_PAGES = 200
+TEXT_SUFFIXES = {'.txt', '.md', '.json', '.yaml', '.yml'}
+AUDIO_SUFFIXES = {'.mp3', '.wav', '.aac', '.flac', '.m4a', '.ogg'}
+VIDEO_SUFFIXES = {'.mp4', '.mov', '.mkv', '.avi', '.flv', '.wmv'}
+MEDIA_SUFFIXES = AUDIO_SUFFIXES | VIDEO_SUFFIXES
+SUFFIX_FORMATS = dict(
+    [(suffix, 'text') for suffix in TEXT_SUFFIXES]
+    + [(suffix, 'audio') for suffix in AUDIO_SUFFIXES]
+    + [(suffix, 'video') for suffix in VIDEO_SUFFIXES]
+    + [('.pdf', 'pdf'), ('.docx', 'docx')]
+)
+# Bytes iniciales que se inspeccionan para reconocer el formato de un archivo
+SNIFF_BYTES = 4096
+# Primera línea de la ficha de un binario; el análisis la reconoce y no la procesa
+BINARY_STUB_MARKER = "[archivo binario]"
+W_MAIN_NS = 'http://schemas.openxmlformats.org/wordprocessingml/2006/main'
+# Índice del almacén por contenido; su presencia es la que detecta el análisis
+RAW_STORE_INDEX = 'index.json'
+RAW_STORE_VERSION = 1
+ZSTD_LEVEL = 10
+# Frecuencia con la que se guarda el manifiesto durante una ingesta larga
+MANIFEST_SAVE_EVERY = 200
+
+# Modelos de Whisper cargados en este proceso, por nombre
+_WHISPER_MODELS: Dict[str, Any] = {}
+# Configuración de la ingesta en este proceso; los workers la reciben al arrancar
+SETTINGS: Dict[str, Any] = {
+    'whisper_model': os.getenv('COGNITIVE_WHISPER_MODEL', DEFAULT_WHISPER_MODEL),
+    'pdf_workers': 1,
+    'pdf_parallel_min_pages': DEFAULT_PDF_PARALLEL_MIN_PAGES,
+    'store': '',
+    'store_compression': 'none',
+}
+
+
+def docx_parts(names: Iterable[str]) -> List[str]:
+    """Partes con texto de un DOCX en orden de lectura: cabeceras, cuerpo, notas y pies."""
+    names = set(names)
+
+    def numbered(prefix: str) -> List[str]:
+        found = [name for name in names if re.fullmatch(rf'word/{prefix}\d*\.xml', name)]
+        return sorted(found, key=lambda name: int(re.sub(r'\D', '', name) or 0))
+
+    notes = [name for name in ('word/footnotes.xml', 'word/endnotes.xml') if name in names]
+    parts = numbered('header') + ['word/document.xml'] + notes + numbered('footer')
+    return [name for name in parts if name in names]
+
+
+def docx_token_pattern(prefix: str) -> Any:
+    """Etiquetas que importan para el texto (párrafos, texto, tablas) y el texto que las sigue."""
+    return re.compile(
+        rf'<(/?)({re.escape(prefix)}:(?:p|tr|tc|t|tab|br|cr)|\w+:Fallback)(?=[\s/>])([^>]*)>([^<]*)'
+    )
+
+
+def iter_docx_xml_paragraphs(handle: Any, chunk_size: int = 1 << 16) -> Iterator[str]:
+    """Recorre un XML de WordprocessingML por bloques y devuelve cada párrafo.
+
+    El texto de un párrafo es el de sus `w:t`, con `w:tab` como tabulador y
+    `w:br`/`w:cr` como salto de línea. Las celdas de una fila de tabla se
+    unen con ` | ` y la fila se devuelve como un solo párrafo; se ignora la
+    copia alternativa de los cuadros de texto (`mc:Fallback`). Cada bloque
+    se procesa hasta su último `<`, así que ninguna etiqueta ni texto queda
+    partido, y la memoria depende del bloque y del párrafo en curso, no del
+    tamaño del documento. Solo se inspeccionan las etiquetas relevantes (un
+    documento de Word está lleno de propiedades de formato), lo que resulta
+    bastante más rápido que un parser con una llamada por elemento.
+    """
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    buffer = ''
+    token = None
+    paragraphs: List[List[str]] = []
+    rows: List[List[str]] = []
+    cells: List[List[str]] = []
+    fallback = 0
+    while True:
+        chunk = handle.read(chunk_size)
+        buffer += decoder.decode(chunk, final=not chunk)
+        if token is None:
+            # El prefijo del espacio de nombres principal se toma de la declaración del documento
+            match = re.search(r'xmlns:(\w+)="' + re.escape(W_MAIN_NS) + '"', buffer)
+            if match is None and chunk:
+                continue
+            token = docx_token_pattern(match.group(1) if match else 'w')
+        cut = max(buffer.rfind('<'), 0) if chunk else len(buffer)
+        for closing, name, attrs, text in token.findall(buffer, 0, cut):
+            tag = name.rsplit(':', 1)[1]
+            empty = attrs.endswith('/')
+            if tag == 'Fallback':
+                fallback += -1 if closing else 1
+                continue
+            if fallback:
+                continue
+            if tag == 't':
+                if not closing and not empty and text and paragraphs:
+                    paragraphs[-1].append(html.unescape(text) if '&' in text else text)
+            elif tag == 'p':
+                if not closing:
+                    paragraphs.append([])
+                if closing or empty:
+                    content = ''.join(paragraphs.pop()).strip() if paragraphs else ''
+                    if content and cells:
+                        cells[-1].append(content)
+                    elif content:
+                        yield content
+            elif tag in ('tab', 'br', 'cr'):
+                # Las tabulaciones con atributos son definiciones de tabuladores del párrafo
+                if not closing and paragraphs and (tag != 'tab' or attrs.strip() in ('', '/')):
+                    paragraphs[-1].append('\t' if tag == 'tab' else '\n')
+            elif tag == 'tc':
+                if not closing:
+                    cells.append([])
+                if (closing or empty) and cells:
+                    content = ' '.join(cells.pop())
+                    if rows:
+                        rows[-1].append(content)
+            elif tag == 'tr':
+                if not closing:
+                    rows.append([])
+                if (closing or empty) and rows:
+                    row = ' | '.join(cell for cell in rows.pop() if cell)
+                    if row and cells:
+                        cells[-1].append(row)
+                    elif row:
+                        yield row
+        if not chunk:
+            break
+        buffer = buffer[cut:]
+
+
+def iter_docx_paragraphs(file_path: Path) -> Iterator[str]:
+    """Devuelve los párrafos de un DOCX (cabeceras, cuerpo, tablas, notas y pies) sin cargarlo entero."""
+    with zipfile.ZipFile(file_path) as zf:
+        for name in docx_parts(zf.namelist()):
+            with zf.open(name) as handle:
+                yield from iter_docx_xml_paragraphs(handle)
+
+
+def write_docx_text(file_path: Path, out_path: Path) -> int:
+    """Escribe en `out_path` los párrafos de un DOCX a medida que se leen; devuelve cuántos."""
+    count = 0
+    with out_path.open('w', encoding='utf-8') as handle:
+        for text in iter_docx_paragraphs(file_path):
+            if count:
+                handle.write('\n')
+            handle.write(text)
+            count += 1
+    return count
 
 
 def extract_docx_text(file_path: Path) -> str:
     """Extrae texto de un archivo DOCX sin dependencias externas."""
     try:
-        with zipfile.ZipFile(file_path) as zf:
-            data = zf.read('word/document.xml').decode('utf-8')
-        # Reemplazar etiquetas XML por saltos de línea
-        text = re.sub('<[^<]+?>', '\n', data)
-        text = html.unescape(text)
-        lines = [line.strip() for line in text.splitlines() if line.strip()]
-        return '\n'.join(lines)
+        return '\n'.join(iter_docx_paragraphs(file_path))
     except Exception:
         return ''
 
 
-def extract_pdf_text(file_path: Path) -> str:
-    """Extrae texto de un PDF. Primero intenta con PyMuPDF (fitz) y luego con PyPDF2."""
+def pdf_page_count(file_path: Path) -> int:
+    """Número de páginas de un PDF (PyMuPDF o PyPDF2); 0 si no se puede abrir."""
+    try:
+        import fitz  # type: ignore
+        with fitz.open(str(file_path)) as doc:
+            return doc.page_count
+    except ImportError:
+        pass
+    except Exception:
+        return 0
+    try:
+        from PyPDF2 import PdfReader  # type: ignore
+        return len(PdfReader(str(file_path)).pages)
+    except Exception:
+        return 0
+
+
+def iter_pdf_pages(file_path: Path, start: int = 0, stop: Optional[int] = None) -> Iterator[str]:
+    """Devuelve el texto de las páginas `[start, stop)` de un PDF, una a una.
+
+    Primero intenta con PyMuPDF (fitz) y, si no está instalado o no extrae
+    texto, con PyPDF2. Solo se mantiene en memoria la página en curso.
+    """
     # Intentar con PyMuPDF para extraer texto de cada página
+    found = False
     try:
         import fitz  # type: ignore
-        doc = fitz.open(str(file_path))
-        content = []
-        for page in doc:
-            text = page.get_text("text")
-            if text:
-                content.append(text)
-        if content:
-            return '\n'.join(content)
+        with fitz.open(str(file_path)) as doc:
+            for number in range(start, doc.page_count if stop is None else min(stop, doc.page_count)):
+                text = doc.load_page(number).get_text("text")
+                if text:
+                    found = True
+                    yield text
+        if found:
+            return
     except ImportError:
         pass  # Fallback a PyPDF2
     except Exception as e:
         print(f"⚠️ Error extrayendo con PyMuPDF: {e}")
+    if found:
+        return
 
     # Fallback a PyPDF2
     try:
         from PyPDF2 import PdfReader  # type: ignore
         reader = PdfReader(str(file_path))
-        content = []
-        for page in reader.pages:
-            text = page.extract_text() or ''
-            content.append(text)
-        if any(content):
-            return '\n'.join(content)
+        for page in reader.pages[start:stop]:
+            yield page.extract_text() or ''
     except ImportError:
         print("❌ Error: No se encontró PyMuPDF ni PyPDF2. Instala las dependencias con 'pip install -r requirements.txt'")
     except Exception as e:
         print(f"⚠️ Error extrayendo con PyPDF2: {e}")
 
-    return ''
+
+def write_pdf_pages(file_path: Path, out_path: Path, start: int = 0, stop: Optional[int] = None) -> Tuple[int, int]:
+    """Escribe en `out_path` el texto de un rango de páginas; devuelve (páginas, caracteres)."""
+    pages = 0
+    chars = 0
+    with out_path.open('w', encoding='utf-8') as handle:
+        for text in iter_pdf_pages(file_path, start, stop):
+            if pages:
+                handle.write('\n')
+            handle.write(text)
+            pages += 1
+            chars += len(text)
+    return pages, chars
+
+
+def write_pdf_text(file_path: Path, out_path: Path, workers: int = 1, min_pages: int = DEFAULT_PDF_PARALLEL_MIN_PAGES) -> int:
+    """Extrae un PDF a `out_path` página a página; devuelve el número de páginas.
+
+    Con `workers > 1` y al menos `min_pages` páginas, el documento se divide
+    en rangos contiguos que procesan varios procesos (cada uno abre el PDF
+    por su cuenta y escribe su rango en un archivo parcial); después se
+    concatenan en orden. El texto completo nunca se carga en memoria.
+    """
+    page_count = pdf_page_count(file_path) if workers > 1 else 0
+    if page_count < max(2, min_pages):
+        return write_pdf_pages(file_path, out_path)[0]
+
+    import shutil
+    from concurrent.futures import ProcessPoolExecutor
+
+    step = -(-page_count // workers)
+    ranges = [(start, min(start + step, page_count)) for start in range(0, page_count, step)]
+    parts = [out_path.with_name(f"{out_path.name}.part{idx}") for idx in range(len(ranges))]
+    try:
+        with ProcessPoolExecutor(max_workers=min(workers, len(ranges))) as pool:
+            futures = [
+                pool.submit(write_pdf_pages, file_path, part, start, stop)
+                for part, (start, stop) in zip(parts, ranges)
+            ]
+            written = [future.result() for future in futures]
+        pages = 0
+        with out_path.open('w', encoding='utf-8') as handle:
+            for part, (part_pages, _) in zip(parts, written):
+                if not part_pages:
+                    continue
+                if pages:
+                    handle.write('\n')
+                with part.open('r', encoding='utf-8') as chunk:
+                    shutil.copyfileobj(chunk, handle)
+                pages += part_pages
+        return pages
+    finally:
+        for part in parts:
+            if part.exists():
+                part.unlink()
+
+
+def extract_pdf_text(file_path: Path) -> str:
+    """Extrae texto de un PDF. Primero intenta con PyMuPDF (fitz) y luego con PyPDF2."""
+    return '\n'.join(iter_pdf_pages(file_path))
+
+
+def configure(settings: Dict[str, Any]) -> None:
+    """Actualiza la configuración de la ingesta de este proceso."""
+    SETTINGS.update({key: value for key, value in settings.items() if value})
+
+
+def init_worker(settings: Dict[str, Any], preload_whisper: bool = False) -> None:
+    """Inicializa un worker del pool; los de audio/vídeo cargan Whisper antes de la primera tarea."""
+    configure(settings)
+    if preload_whisper:
+        load_whisper_model()
+
+
+def load_whisper_model(model_name: str = '') -> Optional[Any]:
+    """Devuelve el modelo de Whisper cacheado en el proceso; lo carga la primera vez.
+
+    Devuelve None si Whisper no está instalado o el modelo no se puede cargar.
+    """
+    name = model_name or SETTINGS['whisper_model']
+    if name in _WHISPER_MODELS:
+        return _WHISPER_MODELS[name]
+    try:
+        import whisper  # type: ignore
+        model = whisper.load_model(name)
+    except Exception as e:
+        print(f"⚠️ No se pudo cargar el modelo de Whisper '{name}': {e}")
+        model = None
+    # También se memoriza el fallo para no reintentarlo en cada archivo
+    _WHISPER_MODELS[name] = model
+    return model
 
 
 def extract_audio_text(file_path: Path) -> str:
@@ -85,12 +393,10 @@ def extract_audio_text(file_path: Path) -> str:
     variar según el modelo utilizado. Si Whisper no está instalado o hay algún
     error, se devuelve una cadena vacía para continuar el proceso de ingesta.
     """
-    try:
-        import whisper  # type: ignore
-    except Exception:
+    model = load_whisper_model()
+    if model is None:
         return ''
     try:
-        model = whisper.load_model("base")
         result = model.transcribe(str(file_path))
         return result.get("text", "") or ''
     except Exception:
@@ -128,24 +434,88 @@ def extract_video_text(file_path: Path) -> str:
     return text
 
 
-def ingest_file(in_path: Path, out_path: Path) -> bool:
-    """Convierte un archivo a texto plano y lo guarda en out_path."""
-    suffix = in_path.suffix.lower()
+def looks_like_text(head: bytes) -> bool:
+    """Indica si unos bytes parecen texto: sin NUL y casi sin caracteres de control."""
+    if b'\x00' in head:
+        return False
+    control = sum(1 for byte in head if byte < 32 and byte not in (9, 10, 12, 13))
+    return control <= len(head) // 100
+
+
+def sniff_format(file_path: Path) -> str:
+    """Reconoce el formato de un archivo por sus primeros bytes (magic bytes).
+
+    Devuelve `pdf`, `docx`, `audio`, `video`, `text` o `binary`.
+    """
+    with file_path.open('rb') as handle:
+        head = handle.read(SNIFF_BYTES)
+    if head.startswith(b'%PDF-'):
+        return 'pdf'
+    if head.startswith(b'PK\x03\x04'):
+        try:
+            with zipfile.ZipFile(file_path) as zf:
+                return 'docx' if 'word/document.xml' in zf.namelist() else 'binary'
+        except zipfile.BadZipFile:
+            return 'binary'
+    if head[4:8] == b'ftyp':
+        return 'audio' if head[8:12] in (b'M4A ', b'M4B ') else 'video'
+    if head.startswith(b'RIFF'):
+        return {b'WAVE': 'audio', b'AVI ': 'video'}.get(head[8:12], 'binary')
+    if head.startswith((b'ID3', b'fLaC', b'OggS')) or head[:2] in (b'\xff\xfb', b'\xff\xf3', b'\xff\xf1', b'\xff\xf9'):
+        return 'audio'
+    # Matroska/WebM, FLV y ASF (WMV)
+    if head.startswith((b'\x1a\x45\xdf\xa3', b'FLV\x01', b'\x30\x26\xb2\x75\x8e\x66\xcf\x11')):
+        return 'video'
+    return 'text' if looks_like_text(head) else 'binary'
+
+
+def write_binary_stub(file_path: Path, out_path: Path) -> None:
+    """Escribe una ficha breve de un binario sin extractor en lugar de su contenido."""
+    import mimetypes
+
+    mime = mimetypes.guess_type(file_path.name)[0] or 'application/octet-stream'
+    out_path.write_text(
+        f"{BINARY_STUB_MARKER}\n"
+        f"nombre: {file_path.name}\n"
+        f"tipo: {mime}\n"
+        f"tamaño: {file_path.stat().st_size} bytes\n",
+        encoding='utf-8'
+    )
+
+
+def ingest_file(in_path: Path, out_path: Path, stats: Optional[Dict[str, Any]] = None) -> bool:
+    """Convierte un archivo a texto plano y lo guarda en out_path.
+
+    El formato se decide por la extensión y, si no es conocida, por los
+    primeros bytes del archivo. Los binarios sin extractor se sustituyen
+    por una ficha (`write_binary_stub`). Si se pasa `stats`, se completa
+    con datos de la conversión (formato, páginas de un PDF...).
+    """
+    stats = stats if stats is not None else {}
     try:
-        if suffix in ['.txt', '.md', '.json', '.yaml', '.yml']:
-            content = in_path.read_text(encoding='utf-8', errors='ignore')
-        elif suffix == '.docx':
-            content = extract_docx_text(in_path)
-        elif suffix == '.pdf':
-            content = extract_pdf_text(in_path)
-        elif suffix in ['.mp3', '.wav', '.aac', '.flac', '.m4a', '.ogg']:
+        fmt = SUFFIX_FORMATS.get(in_path.suffix.lower()) or sniff_format(in_path)
+        stats['format'] = fmt
+        if fmt == 'binary':
+            out_path.parent.mkdir(parents=True, exist_ok=True)
+            write_binary_stub(in_path, out_path)
+            return True
+        if fmt == 'pdf':
+            # Los PDF y DOCX se escriben a medida que se leen, sin pasar por un único string
+            out_path.parent.mkdir(parents=True, exist_ok=True)
+            stats['pages'] = write_pdf_text(
+                in_path, out_path, SETTINGS['pdf_workers'], SETTINGS['pdf_parallel_min_pages']
+            )
+            return True
+        if fmt == 'docx':
+            out_path.parent.mkdir(parents=True, exist_ok=True)
+            stats['paragraphs'] = write_docx_text(in_path, out_path)
+            return True
+        if fmt == 'audio':
             content = extract_audio_text(in_path)
-        elif suffix in ['.mp4', '.mov', '.mkv', '.avi', '.flv', '.wmv']:
+        elif fmt == 'video':
             content = extract_video_text(in_path)
         else:
-            # Para formatos desconocidos, simplemente copiar el contenido binario a texto base64
-            import base64
-            content = base64.b64encode(in_path.read_bytes()).decode('utf-8')
+            content = in_path.read_text(encoding='utf-8', errors='ignore')
         out_path.parent.mkdir(parents=True, exist_ok=True)
         out_path.write_text(content, encoding='utf-8')
         return True
@@ -153,26 +523,447 @@ def ingest_file(in_path: Path, out_path: Path) -> bool:
         return False
 
 
+def file_sha256(path: Path) -> str:
+    """SHA-256 de un archivo leído por bloques, sin cargarlo entero en memoria."""
+    digest = hashlib.sha256()
+    with path.open('rb') as handle:
+        for block in iter(lambda: handle.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+class IngestManifest:
+    """Manifiesto de la ingesta incremental: fuente → tamaño, mtime, hash y salida.
+
+    Una fuente se considera al día si su entrada terminó bien, el texto de
+    salida existe y el tamaño y el `mtime` coinciden. Si solo cambia el
+    `mtime` (p. ej. una copia que conserva el contenido), se recalcula el
+    hash y, si es el mismo, se actualiza la entrada sin reingerir.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.entries: Dict[str, Dict[str, Any]] = {}
+
+    @staticmethod
+    def key(source: Path) -> str:
+        return str(source.resolve())
+
+    def load(self) -> None:
+        try:
+            data = json.loads(self.path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return
+        if data.get('version') == INGEST_VERSION:
+            self.entries = data.get('entries', {})
+
+    def is_current(self, source: Path, out_path: Path, whisper_model: str = '', store: bool = False) -> bool:
+        entry = self.entries.get(self.key(source))
+        # Las entradas del almacén por contenido llevan el hash del texto y su objeto como salida
+        if entry is None or not entry.get('ok') or bool(entry.get('text_sha256')) != store:
+            return False
+        output = Path(entry.get('output', ''))
+        if (not store and output != out_path) or not output.exists():
+            return False
+        if entry.get('whisper_model', '') != whisper_model:
+            return False
+        stat = source.stat()
+        if entry.get('size') != stat.st_size:
+            return False
+        if entry.get('mtime_ns') == stat.st_mtime_ns:
+            return True
+        if file_sha256(source) == entry.get('sha256'):
+            entry['mtime_ns'] = stat.st_mtime_ns
+            return True
+        return False
+
+    def record(self, result: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Registra el resultado de una ingesta; devuelve la entrada a la que sustituye."""
+        previous = self.entries.get(self.key(Path(result['source'])))
+        self.entries[self.key(Path(result['source']))] = {
+            'size': result['size'],
+            'mtime_ns': result['mtime_ns'],
+            'sha256': result['sha256'],
+            'output': result['output'],
+            'ok': result['ok'],
+            'elapsed_ms': result.get('elapsed_ms', 0.0),
+            'ingested_at': now_iso(),
+        }
+        for field in ('format', 'whisper_model', 'pages', 'paragraphs', 'text_sha256'):
+            if result.get(field):
+                self.entries[self.key(Path(result['source']))][field] = result[field]
+        return previous
+
+    def prune(self, root: Path, sources: Iterable[Path]) -> Dict[str, Dict[str, Any]]:
+        """Olvida las fuentes de `root` que ya no existen; devuelve las entradas eliminadas.
+
+        Las entradas de otros directorios de entrada que comparten el
+        manifiesto no se tocan.
+        """
+        root_path = Path(self.key(root))
+        keep = {self.key(source) for source in sources}
+        stale = [
+            key for key in self.entries
+            if key not in keep and Path(key).is_relative_to(root_path)
+        ]
+        return {key: self.entries.pop(key) for key in stale}
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(self.path.name + '.tmp')
+        tmp_path.write_text(
+            json.dumps({'version': INGEST_VERSION, 'entries': self.entries}, ensure_ascii=False),
+            encoding='utf-8'
+        )
+        os.replace(tmp_path, self.path)
+
+
+class RawStore:
+    """Almacén de textos ingeridos direccionado por su contenido.
+
+    Cada texto se guarda una sola vez en
+    `<raíz>/objects/<aa>/<bb>/<sha256>.txt` (o `.txt.zst` con compresión
+    zstd), donde el hash es el SHA-256 del texto en UTF-8; las fuentes con
+    el mismo texto comparten objeto. `index.json` relaciona cada fuente con
+    su hash y su objeto, y es lo que recorre el análisis para procesar
+    cada contenido una sola vez.
+    """
+
+    COMPRESSIONS = ('none', 'zstd')
+
+    def __init__(self, root: Path, compression: str = 'none') -> None:
+        self.root = root
+        self.compression = compression if compression in self.COMPRESSIONS else 'none'
+
+    @property
+    def index_path(self) -> Path:
+        return self.root / RAW_STORE_INDEX
+
+    def object_path(self, text_sha: str, compressed: bool = False) -> Path:
+        name = f"{text_sha}.txt.zst" if compressed else f"{text_sha}.txt"
+        return self.root / 'objects' / text_sha[:2] / text_sha[2:4] / name
+
+    def find(self, text_sha: str) -> Optional[Path]:
+        for compressed in (False, True):
+            path = self.object_path(text_sha, compressed)
+            if path.exists():
+                return path
+        return None
+
+    def tmp_path(self) -> Path:
+        """Ruta temporal única (por proceso) donde convertir una fuente antes de guardarla."""
+        tmp_dir = self.root / 'tmp'
+        tmp_dir.mkdir(parents=True, exist_ok=True)
+        return tmp_dir / f"{os.getpid()}-{time.monotonic_ns()}.txt"
+
+    def put(self, tmp_path: Path) -> Tuple[str, Path]:
+        """Mueve un texto convertido a su objeto (o lo descarta si ya existe); devuelve (hash, objeto)."""
+        text_sha = file_sha256(tmp_path)
+        existing = self.find(text_sha)
+        if existing is not None:
+            tmp_path.unlink()
+            return text_sha, existing
+        compressor = self._zstd_compressor() if self.compression == 'zstd' else None
+        object_path = self.object_path(text_sha, compressed=compressor is not None)
+        object_path.parent.mkdir(parents=True, exist_ok=True)
+        if compressor is not None:
+            packed = tmp_path.with_name(tmp_path.name + '.zst')
+            with tmp_path.open('rb') as source, packed.open('wb') as target:
+                compressor.copy_stream(source, target)
+            tmp_path.unlink()
+            tmp_path = packed
+        # Renombrado atómico: dos procesos con el mismo texto escriben el mismo objeto
+        os.replace(tmp_path, object_path)
+        return text_sha, object_path
+
+    @staticmethod
+    def _zstd_compressor() -> Optional[Any]:
+        try:
+            import zstandard  # type: ignore
+        except ImportError:
+            print("⚠️ zstandard no está instalado; los textos se guardan sin comprimir")
+            return None
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL)
+
+    def save_index(self, entries: Dict[str, Dict[str, Any]]) -> None:
+        """Escribe `index.json` (fuente → hash y objeto) a partir de las entradas del manifiesto."""
+        index = {
+            source: {
+                'sha256': entry['text_sha256'],
+                'object': Path(entry['output']).relative_to(self.root).as_posix(),
+            }
+            for source, entry in sorted(entries.items())
+            if entry.get('ok') and entry.get('text_sha256')
+        }
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.index_path.with_name(self.index_path.name + '.tmp')
+        tmp_path.write_text(
+            json.dumps({'version': RAW_STORE_VERSION, 'entries': index}, ensure_ascii=False, indent=1),
+            encoding='utf-8'
+        )
+        os.replace(tmp_path, self.index_path)
+
+    def gc(self, released: Iterable[Dict[str, Any]], entries: Dict[str, Dict[str, Any]]) -> int:
+        """Elimina los objetos de las entradas `released` que ya no referencia ninguna fuente.
+
+        Solo se consideran los objetos que dejaron de usar las entradas
+        eliminadas o sustituidas en esta ejecución; los del resto del
+        almacén (p. ej. de otros directorios de entrada) no se tocan.
+        Devuelve cuántos objetos se han borrado.
+        """
+        referenced = {Path(entry['output']) for entry in entries.values() if entry.get('text_sha256')}
+        objects_dir = self.root / 'objects'
+        candidates = {
+            Path(entry['output']) for entry in released
+            if entry.get('text_sha256') and Path(entry['output']).is_relative_to(objects_dir)
+        }
+        removed = 0
+        for path in sorted(candidates - referenced):
+            if path.exists():
+                path.unlink()
+                removed += 1
+        return removed
+
+
+def ingest_task(in_path: Path, out_path: Path) -> Dict[str, Any]:
+    """Ingiere una fuente y devuelve la información para el manifiesto (apta para un pool)."""
+    result: Dict[str, Any] = {
+        'source': str(in_path),
+        'output': str(out_path),
+        'ok': False,
+        'size': 0,
+        'mtime_ns': 0,
+        'sha256': '',
+    }
+    try:
+        stat = in_path.stat()
+        result['size'] = stat.st_size
+        result['mtime_ns'] = stat.st_mtime_ns
+        result['sha256'] = file_sha256(in_path)
+    except OSError:
+        return result
+    if in_path.suffix.lower() in MEDIA_SUFFIXES:
+        result['whisper_model'] = SETTINGS['whisper_model']
+    store = RawStore(Path(SETTINGS['store']), SETTINGS['store_compression']) if SETTINGS['store'] else None
+    target = store.tmp_path() if store is not None else out_path
+    stats: Dict[str, Any] = {}
+    start = time.perf_counter()
+    result['ok'] = ingest_file(in_path, target, stats)
+    if store is not None:
+        if result['ok']:
+            text_sha, object_path = store.put(target)
+            result['text_sha256'] = text_sha
+            result['output'] = str(object_path)
+        elif target.exists():
+            target.unlink()
+    result['elapsed_ms'] = round((time.perf_counter() - start) * 1000, 3)
+    result.update(stats)
+    return result
+
+
+def iter_jobs(input_path: Path, output_dir: Path) -> Iterator[Tuple[Path, Path]]:
+    """Pares (fuente, texto de salida) para un archivo o un directorio recursivo."""
+    if input_path.is_dir():
+        for p in sorted(input_path.rglob('*')):
+            if p.is_file():
+                # Mantener estructura relativa y cambiar extensión a .txt
+                rel = p.relative_to(input_path)
+                yield p, output_dir / rel.with_suffix('.txt')
+    else:
+        yield input_path, output_dir / input_path.with_suffix('.txt').name
+
+
+def run_jobs(
+    jobs: List[Tuple[Path, Path]],
+    workers: int,
+    media_workers: int,
+    settings: Optional[Dict[str, Any]] = None
+) -> Iterator[Dict[str, Any]]:
+    """Ejecuta las ingestas y devuelve sus resultados a medida que terminan.
+
+    Con un solo worker de cada tipo todo se procesa en este proceso. Si no,
+    los documentos van a un pool de `workers` procesos y el audio/vídeo a
+    otro de `media_workers`, con un número acotado de tareas en vuelo por
+    pool para no encolar decenas de miles de futuros. Cada worker de audio
+    carga Whisper al arrancar y transcribe con ese modelo toda la cola.
+    """
+    configure(settings or {})
+    if workers <= 1 and media_workers <= 1:
+        for in_path, out_path in jobs:
+            yield ingest_task(in_path, out_path)
+        return
+
+    # Importación diferida: la ingesta secuencial no necesita multiprocessing
+    from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+    queues = {
+        'docs': deque(job for job in jobs if job[0].suffix.lower() not in MEDIA_SUFFIXES),
+        'media': deque(job for job in jobs if job[0].suffix.lower() in MEDIA_SUFFIXES),
+    }
+    sizes = {'docs': max(1, workers), 'media': max(1, media_workers)}
+    pools: Dict[str, Any] = {}
+    running: Dict[Any, Tuple[str, Path, Path]] = {}
+    in_flight = {'docs': 0, 'media': 0}
+    try:
+        while any(queues.values()) or running:
+            for kind, queue in queues.items():
+                while queue and in_flight[kind] < sizes[kind] * 2:
+                    if kind not in pools:
+                        pools[kind] = ProcessPoolExecutor(
+                            max_workers=sizes[kind],
+                            initializer=init_worker,
+                            initargs=(dict(SETTINGS), kind == 'media')
+                        )
+                    in_path, out_path = queue.popleft()
+                    running[pools[kind].submit(ingest_task, in_path, out_path)] = (kind, in_path, out_path)
+                    in_flight[kind] += 1
+            done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+            for future in done:
+                kind, in_path, out_path = running.pop(future)
+                in_flight[kind] -= 1
+                try:
+                    yield future.result()
+                except Exception as e:
+                    print(f"⚠️ Error en el worker de ingesta para {in_path}: {e}")
+                    yield {'source': str(in_path), 'output': str(out_path), 'ok': False,
+                           'size': 0, 'mtime_ns': 0, 'sha256': ''}
+    finally:
+        for pool in pools.values():
+            pool.shutdown(cancel_futures=True)
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(description='Ingesta de archivos a texto plano')
     parser.add_argument('input', help='Archivo o directorio de entrada')
     parser.add_argument('--output', '-o', default='outputs/raw', help='Directorio de salida para los textos')
+    parser.add_argument(
+        '--manifest',
+        default=os.getenv('COGNITIVE_INGEST_MANIFEST', ''),
+        help='Manifiesto de la ingesta incremental (por defecto: <salida>/../cache/ingest/manifest.json)'
+    )
+    parser.add_argument('--force', action='store_true', help='Reingiere todas las fuentes aunque no hayan cambiado')
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=int(os.getenv('COGNITIVE_INGEST_WORKERS', '1')),
+        help='Procesos para convertir documentos (PDF, DOCX, texto)'
+    )
+    parser.add_argument(
+        '--media-workers',
+        type=int,
+        default=int(os.getenv('COGNITIVE_INGEST_MEDIA_WORKERS', '1')),
+        help='Transcripciones de audio/vídeo simultáneas (cada una carga Whisper)'
+    )
+    parser.add_argument(
+        '--whisper-model',
+        default=os.getenv('COGNITIVE_WHISPER_MODEL', DEFAULT_WHISPER_MODEL),
+        help='Tamaño del modelo de Whisper (tiny, base, small, medium, large...)'
+    )
+    parser.add_argument(
+        '--pdf-workers',
+        type=int,
+        default=int(os.getenv('COGNITIVE_INGEST_PDF_WORKERS', '1')),
+        help='Procesos entre los que se reparten las páginas de un PDF grande'
+    )
+    parser.add_argument(
+        '--pdf-parallel-min-pages',
+        type=int,
+        default=int(os.getenv('COGNITIVE_INGEST_PDF_PARALLEL_MIN_PAGES', str(DEFAULT_PDF_PARALLEL_MIN_PAGES))),
+        help='Páginas mínimas para repartir un PDF entre procesos'
+    )
+    parser.add_argument(
+        '--store',
+        action='store_true',
+        default=os.getenv('COGNITIVE_RAW_STORE', '').strip().lower() in {'1', 'true', 'yes'},
+        help='Guarda los textos en un almacén por contenido dentro de --output (objects/ e index.json)'
+    )
+    parser.add_argument(
+        '--compression',
+        choices=RawStore.COMPRESSIONS,
+        default=os.getenv('COGNITIVE_RAW_STORE_COMPRESSION', 'none'),
+        help='Compresión de los objetos del almacén (zstd requiere el paquete zstandard)'
+    )
     args = parser.parse_args()
 
     input_path = Path(args.input)
-    output_dir = Path(args.output)
+    output_dir = Path(args.output).resolve() if args.store else Path(args.output)
     output_dir.mkdir(parents=True, exist_ok=True)
+    store = RawStore(output_dir, args.compression) if args.store else None
+    manifest = IngestManifest(
+        Path(args.manifest) if args.manifest else output_dir.parent / 'cache' / 'ingest' / 'manifest.json'
+    )
+    if not args.force:
+        manifest.load()
 
+    settings = {
+        'whisper_model': args.whisper_model,
+        'pdf_workers': max(1, args.pdf_workers),
+        'pdf_parallel_min_pages': args.pdf_parallel_min_pages,
+        'store': str(output_dir) if store is not None else '',
+        'store_compression': args.compression,
+    }
+    configure(settings)
+    jobs = list(iter_jobs(input_path, output_dir))
+    pending = [
+        (source, out_path) for source, out_path in jobs
+        if args.force or not manifest.is_current(
+            source,
+            out_path,
+            SETTINGS['whisper_model'] if source.suffix.lower() in MEDIA_SUFFIXES else '',
+            store=store is not None
+        )
+    ]
+    # Entradas eliminadas o sustituidas: sus objetos son los únicos candidatos a `RawStore.gc`
+    released: List[Dict[str, Any]] = []
     if input_path.is_dir():
-        for p in input_path.rglob('*'):
-            if p.is_file():
-                # Mantener estructura relativa y cambiar extensión a .txt
-                rel = p.relative_to(input_path)
-                out_file = output_dir / rel.with_suffix('.txt')
-                ingest_file(p, out_file)
-    else:
-        out_file = output_dir / input_path.with_suffix('.txt').name
-        ingest_file(input_path, out_file)
+        released.extend(manifest.prune(input_path, (source for source, _ in jobs)).values())
+
+    start = time.perf_counter()
+    ingested = 0
+    failed = 0
+    media_ms = 0.0
+    media_files = 0
+    pdf_ms = 0.0
+    pdf_pages = 0
+    for done, result in enumerate(run_jobs(pending, args.workers, args.media_workers, settings), start=1):
+        previous = manifest.record(result)
+        if previous is not None:
+            released.append(previous)
+        if result.get('whisper_model'):
+            media_ms += result.get('elapsed_ms', 0.0)
+            media_files += 1
+        if result.get('pages'):
+            pdf_ms += result.get('elapsed_ms', 0.0)
+            pdf_pages += result['pages']
+        if result['ok']:
+            ingested += 1
+        else:
+            failed += 1
+            print(f"⚠️ No se pudo ingerir: {result['source']}")
+        if done % MANIFEST_SAVE_EVERY == 0:
+            manifest.save()
+    manifest.save()
+    if store is not None:
+        store.save_index(manifest.entries)
+        store.gc(released, manifest.entries)
+
+    elapsed = time.perf_counter() - start
+    print(f"📥 Ingesta: {ingested} convertidos, {len(jobs) - len(pending)} sin cambios, "
+          f"{failed} con error ({elapsed:.1f} s)")
+    if store is not None:
+        hashes = {entry['text_sha256'] for entry in manifest.entries.values() if entry.get('text_sha256')}
+        print(f"🗃️ Almacén: {len(hashes)} textos únicos para "
+              f"{sum(1 for entry in manifest.entries.values() if entry.get('text_sha256'))} fuentes")
+    if pdf_pages:
+        print(f"📄 PDF: {pdf_pages} páginas, {pdf_pages / (pdf_ms / 1000):.1f} páginas/s" if pdf_ms else
+              f"📄 PDF: {pdf_pages} páginas")
+    if media_files:
+        print(f"🎙️ Transcripción ({SETTINGS['whisper_model']}): {media_files} archivos, "
+              f"{media_ms / media_files / 1000:.1f} s de media por archivo")
 
 
 if __name__ == '__main__':
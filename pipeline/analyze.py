@@ -9,19 +9,16 @@ Cognitive Suite. A diferencia de la versión inicial basada en reglas
 heurísticas, esta iteración aprovecha modelos de PLN para extraer
 información estructurada de los textos ingeridos. Concretamente:
 
-* Se utiliza **spaCy** para tokenización, extracción de entidades y
-  anotaciones lingüísticas. Se intenta cargar un modelo en español
-  (`es_core_news_md`), aunque se vuelve al modelo inglés por defecto si
-  no está disponible en el entorno.
+* Se utiliza **spaCy** para la extracción de entidades. Se intenta cargar
+  un modelo en español (`es_core_news_md`), aunque se vuelve al modelo
+  inglés por defecto si no está disponible en el entorno.
 * Para la clasificación de sentimientos se recurre a la API de
-  HuggingFace (`transformers.pipeline`) con el modelo
-  `distilbert-base-uncased-finetuned-sst-2-english`. Si la carga falla,
-  se aplica una heurística sencilla que determina el sentimiento en
-  función de palabras positivas o negativas.
+  HuggingFace (`transformers.pipeline`) con el modelo multilingüe
+  `lxyuan/distilbert-base-multilingual-cased-sentiments-student`. Si la
+  carga falla, se aplica una heurística basada en el léxico activo.
 * Se generan etiquetas cognitivas (idea, proyecto, riesgo, legal,
   viabilidad, emoción, intuición, acción pendiente, otros) combinando
-  reglas simples con el análisis de entidades y la predicción de
-  sentimiento.
+  el léxico (`pipeline/lexicons/`) con el análisis de entidades.
 * El resultado para cada archivo se ajusta al esquema de insights
   definido en `schemas/insight.schema.json`, manteniendo los campos
   historicos del esquema semantico y agregando trazabilidad GitOps.
@@ -33,33 +30,37 @@ manera:
 python pipeline/analyze.py --input outputs/raw --output outputs/insights/analysis.json
 ```
 
+Las opciones de rendimiento, caché, redacción, casi duplicados y
+telemetría se describen en `--help` y en `docs/ops/analysis-pipeline.md`.
+
 El parametro `--schema` indica la ubicacion de un archivo con la
 definicion del esquema. En esta version se carga unicamente para
 verificar su existencia, ya que la definicion de campos esta codificada
 en el codigo.
 """
 
+import time
+
+# Inicio de la importación del módulo, para `--profile-startup`
+_IMPORT_STARTED = time.perf_counter()
+
 import argparse
 import hashlib
+import importlib
 import json
 import logging
 import os
+import platform
 import re
-import time
+import sys
+import textwrap
 import uuid
+from contextlib import contextmanager, nullcontext
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
-
-try:
-    import spacy  # type: ignore
-except ImportError:
-    spacy = None  # type: ignore
+from typing import Any, Callable, ContextManager, Dict, Iterable, Iterator, List, Optional, Set, Tuple
 
-try:
-    from transformers import pipeline as hf_pipeline  # type: ignore
-except ImportError:
-    hf_pipeline = None  # type: ignore
+import telemetry
 
 # Configurar logging
 logging.basicConfig(
@@ -93,6 +94,66 @@ CONTEXTUAL_PATTERNS = [
     (re.compile(r"(Calle|Avenida|C/|Plaza|Dirección|Domicilio|Madrid|Barcelona|Valencia):\s*([^\n,.]+)", re.IGNORECASE), "[REDACTED_LOC]"),
 ]
 
+ANALYZABLE_SUFFIXES = {".txt", ".json", ".md"}
+# Índice del almacén por contenido de la ingesta (`ingest.py --store`)
+RAW_STORE_INDEX = "index.json"
+# Primera línea de las fichas que escribe la ingesta para archivos binarios
+BINARY_STUB_MARKER = "[archivo binario]"
+# Guardia de contenido no lingüístico: caracteres inspeccionados y umbrales
+NON_LINGUISTIC_SAMPLE_CHARS = 20000
+DEFAULT_MIN_LETTER_RATIO = 0.5
+MAX_MEAN_TOKEN_LENGTH = 25
+# Detección de casi duplicados (MinHash + LSH): similitud de Jaccard mínima,
+# permutaciones de la firma, bandas del índice y palabras por shingle
+DEFAULT_NEAR_DUPLICATE_THRESHOLD = 0.9
+MINHASH_PERMUTATIONS = 128
+MINHASH_BANDS = 16
+SHINGLE_WORDS = 5
+DEFAULT_BATCH_SIZE = 32
+DEFAULT_SENTIMENT_BATCH_SIZE = 16
+SENTIMENT_MODEL_NAME = "lxyuan/distilbert-base-multilingual-cased-sentiments-student"
+# Incrementar cuando cambie la lógica de generación de registros para invalidar cachés
+PIPELINE_VERSION = "2"
+SENTIMENT_MAX_CHARS = 512
+# Backend del clasificador: PyTorch en precisión completa u ONNX Runtime con int8 dinámico
+SENTIMENT_BACKENDS = ("pytorch", "onnx")
+# Directorio donde se exporta y cuantiza el modelo ONNX (una sola vez por máquina)
+DEFAULT_ONNX_DIR = Path("outputs") / "cache" / "onnx"
+ONNX_QUANTIZED_FILE = "model_quantized.onnx"
+# Sentimiento: solo el inicio del texto (`head`) o segmentos agregados (`segments`)
+SENTIMENT_MODES = ("head", "segments")
+SENTIMENT_AGGREGATIONS = ("mean", "weighted", "worst")
+DEFAULT_SENTIMENT_MAX_SEGMENTS = 8
+OUTPUT_FORMATS = ("json", "jsonl")
+# spaCy y transformers (que arrastra torch) se importan solo al cargar un modelo
+HEAVY_MODULES = ("spacy", "transformers", "torch")
+# Presupuesto de importación del módulo en el camino rápido (sin modelos)
+FAST_IMPORT_BUDGET_MS = 250
+# Tamaño máximo (en caracteres) de cada fragmento enviado a spaCy
+DEFAULT_CHUNK_CHARS = 100_000
+# Perfiles de carga de spaCy: componentes excluidos en cada uno. El análisis
+# solo usa `doc.ents`, así que por defecto se omiten parser, lematizador, etc.
+SPACY_PROFILES: Dict[str, Tuple[str, ...]] = {
+    "full": (),
+    "ner": ("parser", "lemmatizer", "trainable_lemmatizer", "attribute_ruler", "morphologizer", "tagger", "senter"),
+    "tokenizer": (
+        "parser", "lemmatizer", "trainable_lemmatizer", "attribute_ruler", "morphologizer", "tagger", "senter",
+        "ner", "entity_ruler", "tok2vec", "transformer",
+    ),
+}
+DEFAULT_SPACY_PROFILE = "ner"
+# Léxico de etiquetas y sentimiento por defecto (ver `KeywordIndex`)
+DEFAULT_LEXICON_PATH = Path(__file__).resolve().parent / "lexicons" / "es.json"
+# Fases del análisis medidas por `StageTimer` (en este orden en la auditoría)
+ANALYSIS_STAGES = (
+    "dedup", "read", "spacy", "sentiment", "tags", "entities", "legal", "author", "redaction", "hashing", "serialization",
+)
+TRACE_FORMATS = ("chrome", "speedscope")
+# Variables que deciden la redacción y el hash de identificadores de una ejecución
+REDACTION_ENV_VARS = ("COGNITIVE_ENV", "COGNITIVE_REDACT", "COGNITIVE_HASH_SALT")
+# Origen del `content_hash`: texto redactado o bytes originales (solo sin redacción)
+HASH_SOURCES = ("redacted", "raw")
+
 
 def should_skip_models() -> bool:
     """Indica si se deben omitir cargas de modelos pesados (modo playground/CI)."""
@@ -103,6 +164,24 @@ def should_skip_models() -> bool:
     return False
 
 
+_OPTIONAL_MODULES: Dict[str, Any] = {}
+
+
+def import_optional(name: str) -> Optional[Any]:
+    """Importa un módulo opcional la primera vez que se necesita.
+
+    Devuelve `None` si no está instalado. Así, en modo rápido
+    (`COGNITIVE_SKIP_MODELS`/`COGNITIVE_FAST_MODE`) nunca se importan
+    spaCy, transformers ni torch.
+    """
+    if name not in _OPTIONAL_MODULES:
+        try:
+            _OPTIONAL_MODULES[name] = importlib.import_module(name)
+        except ImportError:
+            _OPTIONAL_MODULES[name] = None
+    return _OPTIONAL_MODULES[name]
+
+
 def now_iso() -> str:
     return datetime.now(timezone.utc).isoformat()
 
@@ -117,6 +196,28 @@ def normalize_env(value: str) -> str:
     return "dev"
 
 
+def redaction_settings(overrides: Optional[Dict[str, str]] = None) -> Tuple[str, bool, str]:
+    """Entorno, redacción forzada y salt a partir de `REDACTION_ENV_VARS`.
+
+    `overrides` (las variables del cliente de un trabajo del servicio) solo
+    puede reforzar la redacción del proceso, nunca relajarla: el entorno es
+    `prod` si lo es cualquiera de los dos, la redacción forzada se suma y
+    un salt del cliente solo sustituye al del proceso si no está vacío.
+    """
+    values = {key: os.getenv(key, "") for key in REDACTION_ENV_VARS}
+    client = {
+        key: str(value) for key, value in (overrides or {}).items()
+        if key in REDACTION_ENV_VARS and str(value).strip()
+    }
+    env = normalize_env(values["COGNITIVE_ENV"])
+    if "COGNITIVE_ENV" in client and normalize_env(client["COGNITIVE_ENV"]) == "prod":
+        env = "prod"
+    force_redact = any(
+        source.get("COGNITIVE_REDACT", "").strip().lower() in {"1", "true", "yes"} for source in (values, client)
+    )
+    return env, force_redact, client.get("COGNITIVE_HASH_SALT") or values["COGNITIVE_HASH_SALT"]
+
+
 def hash_identifier(value: str, salt: str) -> str:
     payload = f"{salt}{value}".encode("utf-8")
     return hashlib.sha256(payload).hexdigest()[:12]
@@ -142,67 +243,304 @@ def luhn_check(number: str) -> bool:
     return checksum % 10 == 0
 
 
-def redact_credit_cards(text: str) -> str:
-    def replacer(match: re.Match[str]) -> str:
-        raw = match.group(0)
-        digits = "".join(ch for ch in raw if ch.isdigit())
-        if luhn_check(digits):
-            return "[REDACTED_CARD]"
-        return raw
+# Detectores en orden de prioridad (el mismo que aplicaba la versión secuencial)
+REDACTION_DETECTORS: List[Tuple[str, "re.Pattern[str]", str]] = [
+    ("EMAIL", EMAIL_RE, "[REDACTED_EMAIL]"),
+    ("IP", IPV4_RE, "[REDACTED_IP]"),
+    ("SSN", SSN_RE, "[REDACTED_SSN]"),
+    ("CIF", CIF_RE, "[REDACTED_CIF]"),
+    ("DNI", DNI_RE, "[REDACTED_DNI]"),
+    ("CARD", CARD_RE, "[REDACTED_CARD]"),
+    ("PHONE", PHONE_RE, "[REDACTED_PHONE]"),
+    ("MONEY", CURRENCY_RE, "[REDACTED_MONEY]"),
+    ("ZIP", ZIP_RE, "[REDACTED_ZIP]"),
+    ("DATE", DATE_RE, "[REDACTED_DATE]"),
+]
+# Literales imprescindibles para que un detector pueda coincidir; si no
+# aparece ninguno en el texto, el detector se omite sin escanear.
+REDACTION_PREFILTERS: Dict[str, Tuple[str, ...]] = {
+    "EMAIL": ("@",),
+    "IP": (".",),
+    "SSN": ("-",),
+    "MONEY": ("€", "$", "USD", "EUR"),
+}
+DIGIT_RE = re.compile(r"\d")
+WORD_CHAR_RE = re.compile(r"\w")
+# Etiquetas (en minúsculas, con ":") de cada patrón de CONTEXTUAL_PATTERNS, en el mismo orden
+CONTEXTUAL_PREFILTERS: List[Tuple[str, ...]] = [
+    ("razón social:", "empresa:", "sociedad:"),
+    ("nombre y apellidos:", "trabajador:", "persona:", "representado por:", "representada por:"),
+    ("en calidad de:", "cargo:", "puesto:"),
+    ("dni:", "nif:", "nie:"),
+    ("cif:",),
+    ("calle:", "avenida:", "c/:", "plaza:", "dirección:", "domicilio:", "madrid:", "barcelona:", "valencia:"),
+]
+# Caracteres que `re.IGNORECASE` equipara a una letra de las etiquetas pero
+# cuyo `str.lower()` es otro ("İ" → "i̇"); el filtro nunca debe ser más estricto que el patrón
+CONTEXTUAL_CASE_VARIANTS = (("i\u0307", "i"), ("ı", "i"), ("ſ", "s"))
+
+# Span de redacción: (inicio, fin, detector, texto de reemplazo)
+RedactionSpan = Tuple[int, int, str, str]
+
+
+def _iter_gaps(spans: List[RedactionSpan], length: int) -> Iterator[Tuple[int, int]]:
+    """Devuelve los tramos del texto no cubiertos por `spans` (ordenados)."""
+    cursor = 0
+    for start, end, _, _ in spans:
+        if start > cursor:
+            yield cursor, start
+        cursor = end
+    if cursor < length:
+        yield cursor, length
+
+
+def find_regex_spans(text: str) -> List[RedactionSpan]:
+    """Localiza los datos sensibles detectados por expresiones regulares sin reescribir el texto.
+
+    Los detectores se evalúan en orden de prioridad y cada uno solo explora
+    los tramos que aún no han sido reclamados por un detector anterior, lo
+    que reproduce exactamente la semántica de las sustituciones encadenadas
+    (un marcador `[REDACTED_*]` actúa como separador, sin caracteres de
+    palabra). Los detectores cuyos literales imprescindibles no aparecen en
+    el texto se omiten. Devuelve spans ordenados y sin solapamientos.
+    """
+    spans: List[RedactionSpan] = []
+    length = len(text)
+    has_digits = DIGIT_RE.search(text) is not None
+    for name, pattern, placeholder in REDACTION_DETECTORS:
+        required = REDACTION_PREFILTERS.get(name)
+        if required is not None and not any(literal in text for literal in required):
+            continue
+        if name != "EMAIL" and not has_digits:
+            continue
+        found: List[RedactionSpan] = []
+        for gap_start, gap_end in _iter_gaps(spans, length):
+            # Con `pos` el regex vería el carácter real anterior al tramo; si es
+            # de palabra, se recorta para que el límite se comporte como tras un marcador.
+            if gap_start == 0 or not WORD_CHAR_RE.match(text, gap_start - 1):
+                matches = pattern.finditer(text, gap_start, gap_end)
+                offset = 0
+            else:
+                matches = pattern.finditer(text[gap_start:gap_end])
+                offset = gap_start
+            for match in matches:
+                if name == "CARD":
+                    digits = "".join(ch for ch in match.group() if ch.isdigit())
+                    if not luhn_check(digits):
+                        continue
+                found.append((match.start() + offset, match.end() + offset, name, placeholder))
+        if found:
+            spans = sorted(spans + found)
+    return spans
+
+
+def redact_contextual(text: str) -> str:
+    """Aplica la redacción contextual (`etiqueta: valor`) de `CONTEXTUAL_PATTERNS`.
+
+    Antes de ejecutar cada patrón se comprueba con búsquedas literales sobre
+    el texto en minúsculas (con las variantes de `CONTEXTUAL_CASE_VARIANTS`
+    unificadas, como hace `re.IGNORECASE`) si alguna de sus etiquetas
+    aparece; los patrones sin etiqueta presente se omiten. Los que sí aplican se ejecutan
+    encadenados y en su orden original, porque cada sustitución puede cambiar
+    dónde termina el valor del siguiente patrón.
+    """
+    if ":" not in text:
+        return text
+    folded = text.lower()
+    if not folded.isascii():
+        for variant, letter in CONTEXTUAL_CASE_VARIANTS:
+            if variant in folded:
+                folded = folded.replace(variant, letter)
+    for (pattern, replacement), labels in zip(CONTEXTUAL_PATTERNS, CONTEXTUAL_PREFILTERS):
+        if not any(label in folded for label in labels):
+            continue
+
+        def replace_match(m: re.Match[str], replacement: str = replacement) -> str:
+            return f"{m.group(1)}: {replacement}"
+
+        text = pattern.sub(replace_match, text)
+    return text
+
 
-    return CARD_RE.sub(replacer, text)
+def apply_spans(text: str, spans: List[RedactionSpan]) -> str:
+    """Materializa el texto redactado a partir de spans ordenados y sin solapamientos."""
+    if not spans:
+        return text
+    parts: List[str] = []
+    cursor = 0
+    for start, end, _, replacement in spans:
+        parts.append(text[cursor:start])
+        parts.append(replacement)
+        cursor = end
+    parts.append(text[cursor:])
+    return "".join(parts)
 
 
 def redact_regex(text: str) -> str:
-    text = EMAIL_RE.sub("[REDACTED_EMAIL]", text)
-    text = IPV4_RE.sub("[REDACTED_IP]", text)
-    text = SSN_RE.sub("[REDACTED_SSN]", text)
-    text = CIF_RE.sub("[REDACTED_CIF]", text)
-    text = DNI_RE.sub("[REDACTED_DNI]", text)
-    text = redact_credit_cards(text)
-    text = PHONE_RE.sub("[REDACTED_PHONE]", text)
-    text = CURRENCY_RE.sub("[REDACTED_MONEY]", text)
-    text = ZIP_RE.sub("[REDACTED_ZIP]", text)
-    text = DATE_RE.sub("[REDACTED_DATE]", text)
-
-    # Aplicar redacción contextual
-    for pattern, replacement in CONTEXTUAL_PATTERNS:
-        def replace_match(m):
-            return f"{m.group(1)}: {replacement}"
-        text = pattern.sub(replace_match, text)
+    """Redacta datos sensibles detectados por expresiones regulares.
 
-    return text
+    Los diez detectores se resuelven como una lista de spans
+    (`find_regex_spans`) y el texto redactado se materializa una sola vez,
+    en lugar de reconstruirlo tras cada `re.sub`. Después se aplica la
+    redacción contextual sobre el resultado. La salida es idéntica a la de
+    la versión secuencial original (`benchmarks/reference.py`).
+    """
+    redacted = apply_spans(text, find_regex_spans(text))
+    return redact_contextual(redacted)
 
 
-def redact_text(text: str, doc: Optional[Any]) -> str:
-    redacted = text
-    if doc is not None:
+def build_trie_pattern(words: Iterable[str]) -> str:
+    """Construye una expresión regular equivalente a un trie de literales.
+
+    Cada nodo con varias continuaciones se convierte en una alternancia por
+    carácter, por lo que el motor de `re` avanza como un autómata sin probar
+    cada literal en cada posición. Los cuantificadores son voraces, así que
+    en cada posición gana el literal más largo. Las cadenas lineales del
+    trie se compactan para no anidar un grupo por carácter.
+    """
+    trie: Dict[str, Any] = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def render(node: Dict[str, Any]) -> str:
+        parts: List[str] = []
+        terminal = False
+        for ch in sorted(node):
+            if ch == "":
+                terminal = True
+                continue
+            child = node[ch]
+            chain = re.escape(ch)
+            # Compactar cadenas sin bifurcaciones ni finales intermedios
+            while len(child) == 1 and "" not in child:
+                (next_ch, next_child), = child.items()
+                chain += re.escape(next_ch)
+                child = next_child
+            parts.append(chain + render(child))
+        if not parts:
+            return ""
+        body = parts[0] if len(parts) == 1 else "(?:" + "|".join(parts) + ")"
+        if terminal:
+            return body + "?" if len(parts) == 1 and len(body) == 1 else "(?:" + body + ")?"
+        return body
+
+    return render(trie)
+
+
+class EntityMatcher:
+    """Redacta en una sola pasada todas las entidades sensibles de un doc de spaCy.
+
+    Reúne los textos distintos de las entidades con etiqueta en
+    `REDACTION_ENTITY_LABELS` (al menos 3 caracteres) y los compila en un
+    único patrón tipo trie sin distinguir mayúsculas. Cada aparición se
+    sustituye por `[REDACTED_<etiqueta>]`, usando la etiqueta de la primera
+    entidad con ese texto. Si dos entidades se solapan gana la coincidencia
+    más a la izquierda y, a igualdad, la más larga.
+    """
+
+    def __init__(self, doc: Optional[Any]) -> None:
+        self.labels: Dict[str, str] = {}
+        self.pattern: Optional["re.Pattern[str]"] = None
+        if doc is None:
+            return
         try:
             for ent in doc.ents:
                 if ent.label_ in REDACTION_ENTITY_LABELS:
                     ent_text = ent.text.strip()
                     if len(ent_text) >= 3:
-                        pattern = re.compile(re.escape(ent_text), re.IGNORECASE)
-                        redacted = pattern.sub(f"[REDACTED_{ent.label_}]", redacted)
+                        self.labels.setdefault(ent_text.lower(), ent.label_)
         except Exception as e:
             logger.debug("Error al aplicar redacción por entidades: %s", e)
-    return redact_regex(redacted)
+        if self.labels:
+            self.pattern = re.compile(build_trie_pattern(self.labels), re.IGNORECASE)
+
+    def find_spans(self, text: str) -> List[RedactionSpan]:
+        """Devuelve los spans de entidades encontrados en `text`."""
+        if self.pattern is None:
+            return []
+        spans: List[RedactionSpan] = []
+        for match in self.pattern.finditer(text):
+            label = self.labels.get(match.group().lower())
+            placeholder = f"[REDACTED_{label}]" if label else "[REDACTED]"
+            spans.append((match.start(), match.end(), label or "ENTITY", placeholder))
+        return spans
+
+    def redact(self, text: str) -> str:
+        return apply_spans(text, self.find_spans(text))
+
+
+def redact_text(text: str, doc: Optional[Any], matcher: Optional[EntityMatcher] = None) -> str:
+    """Redacta entidades de spaCy y datos detectados por expresiones regulares.
+
+    Puede recibir un `EntityMatcher` ya construido para reutilizarlo entre
+    varios textos del mismo documento.
+    """
+    if matcher is None:
+        matcher = EntityMatcher(doc)
+    return redact_regex(matcher.redact(text))
+
+
+class DocumentRedaction:
+    """Resultado de redacción de un documento, calculado una sola vez y reutilizado.
+
+    Construye el `EntityMatcher` del doc una única vez y redacta el texto
+    completo de forma perezosa (solo si alguien lo pide, p. ej. para el
+    `content_hash`). Los fragmentos del registro (resumen, resumen de idea)
+    se redactan con el mismo matcher y se memorizan, de modo que textos
+    repetidos no se procesan dos veces. `counts` acumula cuántos datos de
+    cada detector se han redactado en el texto completo, para la auditoría.
+    """
+
+    def __init__(self, text: str, doc: Optional[Any]) -> None:
+        self.source = text
+        self.matcher = EntityMatcher(doc)
+        self.counts: Dict[str, int] = {}
+        self._text: Optional[str] = None
+        self._fragments: Dict[str, str] = {}
+
+    @property
+    def text(self) -> str:
+        """Texto completo redactado (equivale a `redact_text(texto, doc)`)."""
+        if self._text is None:
+            entity_spans = self.matcher.find_spans(self.source)
+            partial = apply_spans(self.source, entity_spans)
+            regex_spans = find_regex_spans(partial)
+            for _, _, name, _ in entity_spans + regex_spans:
+                self.counts[name] = self.counts.get(name, 0) + 1
+            self._text = redact_contextual(apply_spans(partial, regex_spans))
+        return self._text
+
+    def redact(self, fragment: str) -> str:
+        """Redacta un fragmento del documento reutilizando el matcher de entidades."""
+        if fragment == self.source:
+            return self.text
+        redacted = self._fragments.get(fragment)
+        if redacted is None:
+            redacted = redact_text(fragment, None, self.matcher)
+            self._fragments[fragment] = redacted
+        return redacted
 
 
 def redact_record(
     record: Dict[str, Any],
     doc: Optional[Any],
     hash_salt: str,
-    env: str
+    env: str,
+    redaction: Optional[DocumentRedaction] = None
 ) -> Dict[str, Any]:
+    if redaction is None:
+        redaction = DocumentRedaction("", doc)
     redacted = dict(record)
     file_name = Path(record.get("file", "")).name
     file_hash = hash_identifier(file_name or record.get("uuid", ""), hash_salt)
     redacted["uuid"] = hash_identifier(record.get("uuid", ""), hash_salt)
     redacted["file"] = f"file_{file_hash}"
     redacted["title"] = f"document_{file_hash}"
-    redacted["summary"] = redact_text(record.get("summary", ""), doc)
-    redacted["idea_summary"] = redact_text(record.get("idea_summary", ""), doc)
+    redacted["summary"] = redaction.redact(record.get("summary", ""))
+    redacted["idea_summary"] = redaction.redact(record.get("idea_summary", ""))
     redacted["entities"] = [
         (label, "[REDACTED]") for label, _ in record.get("entities", [])
     ]
@@ -288,9 +626,373 @@ def write_audit_event(event: Dict[str, Any], audit_path: Path) -> None:
             handle.write(json.dumps(event, ensure_ascii=False) + "\n")
     except Exception as e:
         logger.warning("No se pudo escribir auditoría: %s", e)
+    telemetry.record_event(event)
+
+
+class StageTimer:
+    """Acumula la duración de cada fase del análisis, por ejecución y por archivo.
+
+    `totals` suma los milisegundos de cada fase en toda la ejecución y
+    `files` los de cada archivo hasta que se recogen con `pop_file`. Con
+    `record_events` se guarda además cada medición con su instante de
+    inicio (`time.perf_counter`, comparable entre procesos de la misma
+    máquina) para exportarla como traza de Chrome o de speedscope.
+    """
+
+    def __init__(self, record_events: bool = False) -> None:
+        self.totals: Dict[str, float] = {}
+        self.files: Dict[str, Dict[str, float]] = {}
+        self.events: Optional[List[Tuple[str, float, float, str, int]]] = [] if record_events else None
+        self.pid = os.getpid()
+
+    @contextmanager
+    def stage(self, name: str, file: str = "") -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, start, (time.perf_counter() - start) * 1000, file)
+
+    def add(self, name: str, start: float, elapsed_ms: float, file: str = "", pid: int = 0) -> None:
+        self.totals[name] = self.totals.get(name, 0.0) + elapsed_ms
+        if file:
+            stages = self.files.setdefault(file, {})
+            stages[name] = stages.get(name, 0.0) + elapsed_ms
+        if self.events is not None:
+            self.events.append((name, start, elapsed_ms, file, pid or self.pid))
+
+    def merge(self, events: Iterable[Tuple[str, float, float, str, int]]) -> None:
+        """Incorpora las mediciones de otro proceso (p. ej. un worker del pool)."""
+        for name, start, elapsed_ms, file, pid in events:
+            self.add(name, start, elapsed_ms, file, pid)
+
+    def total(self, name: str) -> float:
+        return self.totals.get(name, 0.0)
+
+    @staticmethod
+    def _ordered(stages: Dict[str, float]) -> Dict[str, float]:
+        names = [n for n in ANALYSIS_STAGES if n in stages] + sorted(set(stages) - set(ANALYSIS_STAGES))
+        return {name: round(stages[name], 3) for name in names}
+
+    def pop_file(self, file: str) -> Dict[str, float]:
+        """Devuelve (y olvida) las fases medidas para un archivo, en ms."""
+        return self._ordered(self.files.pop(file, {}))
+
+    def summary(self) -> Dict[str, float]:
+        """Milisegundos acumulados por fase en toda la ejecución."""
+        return self._ordered(self.totals)
+
+    def chrome_trace(self) -> Dict[str, Any]:
+        """Traza en el formato de eventos de Chrome (`chrome://tracing`, Perfetto)."""
+        events = self.events or []
+        origin = min((start for _, start, _, _, _ in events), default=0.0)
+        return {
+            "displayTimeUnit": "ms",
+            "traceEvents": [
+                {
+                    "name": name,
+                    "cat": "analysis",
+                    "ph": "X",
+                    "ts": round((start - origin) * 1e6, 1),
+                    "dur": round(elapsed_ms * 1000, 1),
+                    "pid": pid,
+                    "tid": pid,
+                    "args": {"file": file} if file else {},
+                }
+                for name, start, elapsed_ms, file, pid in events
+            ],
+        }
+
+    def speedscope(self, name: str = "analysis") -> Dict[str, Any]:
+        """Perfil en formato speedscope, un perfil con eventos por proceso.
+
+        Las fases que se solapan en el tiempo (p. ej. la lectura que ocurre
+        mientras `nlp.pipe` pide documentos) se desplazan para que los
+        eventos queden secuenciales, como exige el formato.
+        """
+        events = sorted(self.events or [], key=lambda event: event[1])
+        origin = events[0][1] if events else 0.0
+        frames: Dict[str, int] = {}
+        profiles: Dict[int, Dict[str, Any]] = {}
+        for stage_name, start, elapsed_ms, _, pid in events:
+            frame = frames.setdefault(stage_name, len(frames))
+            profile = profiles.setdefault(pid, {
+                "type": "evented",
+                "name": f"pid {pid}",
+                "unit": "milliseconds",
+                "startValue": 0.0,
+                "endValue": 0.0,
+                "events": [],
+            })
+            opened = max((start - origin) * 1000, profile["endValue"])
+            closed = opened + elapsed_ms
+            profile["events"].append({"type": "O", "frame": frame, "at": round(opened, 3)})
+            profile["events"].append({"type": "C", "frame": frame, "at": round(closed, 3)})
+            profile["endValue"] = round(closed, 3)
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": name,
+            "shared": {"frames": [{"name": frame_name} for frame_name in frames]},
+            "profiles": list(profiles.values()),
+        }
+
+    def write_trace(self, path: Path, trace_format: str = "chrome") -> None:
+        data = self.speedscope() if trace_format == "speedscope" else self.chrome_trace()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(data), encoding="utf-8")
+
+
+def timed_stage(timer: Optional[StageTimer], name: str, file: str = "") -> ContextManager[Any]:
+    """`timer.stage(...)` o un contexto vacío si no se están midiendo fases."""
+    return timer.stage(name, file) if timer is not None else nullcontext()
+
+
+def spacy_model_id(nlp_model: Optional[Any]) -> str:
+    """Devuelve un identificador `lang_nombre-version` del modelo spaCy cargado."""
+    if nlp_model is None:
+        return ""
+    meta = getattr(nlp_model, "meta", None) or {}
+    return f"{meta.get('lang', '')}_{meta.get('name', '')}-{meta.get('version', '')}"
+
+
+def sentiment_model_id(classifier: Optional[Any]) -> str:
+    """Devuelve el nombre del modelo de sentimientos cargado, o cadena vacía."""
+    if classifier is None:
+        return ""
+    model = getattr(classifier, "model", None)
+    if type(model).__name__.startswith("ORT"):
+        # Modelos de optimum: el backend forma parte de la huella de la caché
+        return f"onnx-int8:{SENTIMENT_MODEL_NAME}"
+    return getattr(model, "name_or_path", "") or SENTIMENT_MODEL_NAME
+
+
+def pipeline_fingerprint(
+    nlp_model: Optional[Any],
+    sentiment_classifier: Optional[Any],
+    redact: bool,
+    hash_salt: str,
+    env: str,
+    hash_source: str = "redacted",
+    chunk_chars: int = DEFAULT_CHUNK_CHARS,
+    sentiment_options: Optional[Dict[str, Any]] = None
+) -> str:
+    """Calcula una huella de la configuración que determina el contenido de un registro.
+
+    Incluye la versión del pipeline, los modelos cargados y los ajustes de
+    redacción y de hash. El salt se incorpora como hash para no persistirlo
+    en claro.
+    """
+    payload = {
+        "pipeline_version": PIPELINE_VERSION,
+        "spacy_model": spacy_model_id(nlp_model),
+        "spacy_components": list(getattr(nlp_model, "pipe_names", []) or []),
+        "sentiment_model": sentiment_model_id(sentiment_classifier),
+        "redact": redact,
+        "env": env,
+        "hash_source": hash_source,
+        "chunk_chars": chunk_chars,
+        "sentiment": sentiment_options or {"mode": "head"},
+        "lexicon": get_keyword_index().digest,
+        "hash_salt": hashlib.sha256(hash_salt.encode("utf-8")).hexdigest(),
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+class AnalysisCache:
+    """Caché persistente de registros de análisis en disco.
+
+    Cada archivo de entrada tiene una entrada JSON propia en
+    `<directorio>/<xx>/<sha256(ruta)>.json` con el hash SHA-256 de su
+    contenido y el registro generado, de modo que la memoria usada no crece
+    con el corpus. La caché completa se invalida si cambia la huella del
+    pipeline (`pipeline_fingerprint`). Al guardar se eliminan las entradas
+    que no se han consultado ni añadido durante la ejecución, de modo que
+    los archivos eliminados desaparecen. Por eso `main` usa un
+    subdirectorio por directorio de entrada (`namespace`): así un análisis
+    de otra entrada con el mismo `--cache-dir` no borra sus entradas.
+    """
+
+    def __init__(self, path: Path, fingerprint: str) -> None:
+        self.path = path
+        self.fingerprint = fingerprint
+        self.seen: Set[str] = set()
+        self.hits = 0
+        self.misses = 0
+
+    def _entry_path(self, key: str) -> Path:
+        return self.path / key[:2] / f"{key}.json"
+
+    @staticmethod
+    def _key(file_path: Path) -> str:
+        return hashlib.sha256(str(file_path).encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def namespace(input_dir: Path) -> str:
+        """Devuelve el subdirectorio de caché propio de un directorio de entrada."""
+        return hashlib.sha256(str(input_dir.resolve()).encode("utf-8")).hexdigest()[:16]
+
+    def load(self) -> None:
+        fingerprint_file = self.path / "fingerprint"
+        try:
+            current = fingerprint_file.read_text(encoding="utf-8").strip()
+        except OSError:
+            current = ""
+        if current == self.fingerprint:
+            return
+        if current:
+            logger.debug("La huella del pipeline ha cambiado; se descarta la caché.")
+        self._prune(keep=set())
+        try:
+            self.path.mkdir(parents=True, exist_ok=True)
+            fingerprint_file.write_text(self.fingerprint, encoding="utf-8")
+        except Exception as e:
+            logger.warning(f"No se pudo inicializar la caché de análisis {self.path}: {e}")
+
+    def get(self, file_path: Path, content_sha: str) -> Optional[Dict[str, Any]]:
+        key = self._key(file_path)
+        try:
+            entry = json.loads(self._entry_path(key).read_text(encoding="utf-8"))
+        except Exception:
+            entry = None
+        if entry is not None and entry.get("sha256") == content_sha:
+            self.hits += 1
+            self.seen.add(key)
+            return entry.get("record")
+        self.misses += 1
+        return None
+
+    def put(self, file_path: Path, content_sha: str, record: Dict[str, Any]) -> None:
+        key = self._key(file_path)
+        entry_path = self._entry_path(key)
+        try:
+            entry_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = entry_path.with_name(entry_path.name + ".tmp")
+            tmp_path.write_text(
+                json.dumps({"sha256": content_sha, "record": record}, ensure_ascii=False),
+                encoding="utf-8"
+            )
+            os.replace(tmp_path, entry_path)
+            self.seen.add(key)
+        except Exception as e:
+            logger.warning(f"No se pudo guardar la entrada de caché de {file_path}: {e}")
+
+    def track(self, file_path: Path, hit: bool, keep: bool = True) -> None:
+        """Contabiliza una consulta hecha en otro proceso (modo `--workers`).
+
+        Con `keep` la entrada se conserva al guardar, igual que tras `get`
+        con acierto o tras `put`.
+        """
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+        if keep:
+            self.seen.add(self._key(file_path))
+
+    def save(self) -> None:
+        self._prune(keep=self.seen)
+
+    def _prune(self, keep: Set[str]) -> None:
+        if not self.path.is_dir():
+            return
+        for entry_path in self.path.glob("*/*.json"):
+            if entry_path.stem not in keep:
+                try:
+                    entry_path.unlink()
+                except OSError as e:
+                    logger.debug(f"No se pudo eliminar la entrada de caché {entry_path}: {e}")
+
+
+def refresh_trace(record: Dict[str, Any], trace_context: Dict[str, str]) -> Dict[str, Any]:
+    """Actualiza la trazabilidad GitOps de un registro reutilizado desde caché."""
+    refreshed = dict(record)
+    trace = dict(refreshed.get("gitops_trace", {}))
+    trace["run_id"] = trace_context.get("run_id", "")
+    trace["actor"] = trace_context.get("actor", "unknown")
+    trace["git"] = {
+        "commit": trace_context.get("git_commit", ""),
+        "ref": trace_context.get("git_ref", ""),
+    }
+    trace["cached"] = True
+    refreshed["gitops_trace"] = trace
+    return refreshed
+
+
+class RecordWriter:
+    """Escritura incremental de registros de análisis en JSON o JSON Lines.
+
+    Cada registro se escribe en disco en cuanto se genera, sobre un archivo
+    `<salida>.partial` que se renombra de forma atómica al cerrar el
+    escritor. En formato `json` el resultado es idéntico al de
+    `json.dump(registros, indent=2)`; en formato `jsonl` hay un registro por
+    línea. Si la ejecución se interrumpe, el archivo parcial conserva los
+    registros ya escritos y la salida anterior no se modifica.
+    """
+
+    def __init__(self, path: Path, fmt: str = "json") -> None:
+        if fmt not in OUTPUT_FORMATS:
+            raise ValueError(f"Formato de salida no soportado: {fmt}")
+        self.path = path
+        self.fmt = fmt
+        self.partial_path = path.with_name(path.name + ".partial")
+        self.count = 0
+        self._handle: Optional[Any] = None
+
+    def __enter__(self) -> "RecordWriter":
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._handle = self.partial_path.open("w", encoding="utf-8")
+        return self
+
+    def write(self, record: Dict[str, Any]) -> None:
+        if self._handle is None:
+            raise RuntimeError("RecordWriter no está abierto")
+        if self.fmt == "jsonl":
+            self._handle.write(json.dumps(record, ensure_ascii=False) + "\n")
+            self._handle.flush()
+        else:
+            body = json.dumps(record, indent=2, ensure_ascii=False)
+            self._handle.write("[\n" if self.count == 0 else ",\n")
+            self._handle.write(textwrap.indent(body, "  "))
+        self.count += 1
+
+    def __exit__(self, exc_type: Any, exc: Any, tb: Any) -> None:
+        if self._handle is None:
+            return
+        if exc_type is not None:
+            self._handle.close()
+            self._handle = None
+            logger.warning(f"Análisis interrumpido; registros parciales en {self.partial_path}")
+            return
+        if self.fmt == "json":
+            self._handle.write("[]" if self.count == 0 else "\n]")
+        self._handle.close()
+        self._handle = None
+        os.replace(self.partial_path, self.path)
+
+
+def resolve_output_format(output_file: Path, fmt: Optional[str]) -> Tuple[Path, str]:
+    """Determina el formato de salida y ajusta la extensión del archivo si es necesario.
+
+    Sin formato explícito se deduce de la extensión (`.jsonl` → `jsonl`).
+    Con `jsonl` explícito y salida `.json`, se escribe en `<nombre>.jsonl`.
+    """
+    if not fmt:
+        return output_file, "jsonl" if output_file.suffix.lower() == ".jsonl" else "json"
+    if fmt == "jsonl" and output_file.suffix.lower() == ".json":
+        return output_file.with_suffix(".jsonl"), fmt
+    return output_file, fmt
+
+
+def resolve_spacy_profile(profile: str = "") -> str:
+    """Devuelve el perfil de spaCy indicado, el de `COGNITIVE_SPACY_PROFILE` o el por defecto."""
+    value = (profile or os.getenv("COGNITIVE_SPACY_PROFILE") or DEFAULT_SPACY_PROFILE).strip().lower()
+    if value not in SPACY_PROFILES:
+        logger.warning("Perfil de spaCy desconocido: %s. Se usa '%s'.", value, DEFAULT_SPACY_PROFILE)
+        return DEFAULT_SPACY_PROFILE
+    return value
 
 
-def load_spacy_model() -> Optional[Any]:
+def load_spacy_model(profile: str = "") -> Optional[Any]:
     """Carga un modelo spaCy en español o inglés.
 
     Intenta cargar `es_core_news_md` porque el proyecto está orientado a
@@ -298,21 +1000,27 @@ def load_spacy_model() -> Optional[Any]:
     `es_core_news_sm`. En última instancia, recurre al modelo
     `en_core_web_sm` que suele estar presente en muchas instalaciones.
 
+    El perfil (`SPACY_PROFILES`) decide qué componentes no se cargan:
+    `ner` (por defecto) deja solo lo necesario para las entidades,
+    `tokenizer` solo tokeniza y `full` carga el modelo completo.
+
     Devuelve `None` si no se puede cargar ningún modelo.
     """
     if should_skip_models():
         logger.warning("COGNITIVE_SKIP_MODELS habilitado; se omite la carga de spaCy.")
         return None
 
+    spacy = import_optional("spacy")
     if spacy is None:
         logger.warning("spaCy no está instalado. La extracción de entidades estará deshabilitada.")
         return None
 
+    exclude = list(SPACY_PROFILES[resolve_spacy_profile(profile)])
     for model_name in ["es_core_news_md", "es_core_news_sm", "en_core_web_sm"]:
         try:
             logger.debug(f"Intenta cargar: {model_name}")
-            model = spacy.load(model_name)
-            logger.debug(f"✓ Modelo cargado: {model_name}")
+            model = spacy.load(model_name, exclude=exclude)
+            logger.debug(f"✓ Modelo cargado: {model_name} ({', '.join(model.pipe_names) or 'solo tokenizador'})")
             return model
         except OSError:
             logger.debug(f"Modelo no disponible: {model_name}")
@@ -322,23 +1030,97 @@ def load_spacy_model() -> Optional[Any]:
     return None
 
 
-def load_sentiment_classifier() -> Optional[Any]:
+def onnx_model_dir(model_name: str = SENTIMENT_MODEL_NAME) -> Path:
+    """Directorio del modelo ONNX cuantizado (`COGNITIVE_ONNX_DIR` o `outputs/cache/onnx`)."""
+    base = Path(os.getenv("COGNITIVE_ONNX_DIR") or DEFAULT_ONNX_DIR)
+    return base / f"{model_name.replace('/', '--')}-int8"
+
+
+def export_onnx_sentiment_model(model_name: str, output_dir: Path) -> Path:
+    """Exporta el modelo a ONNX y lo cuantiza a int8 dinámico.
+
+    La exportación solo se hace la primera vez: si `output_dir` ya contiene
+    `model_quantized.onnx` se reutiliza. La cuantización es dinámica (pesos
+    en int8, activaciones cuantizadas en tiempo de inferencia), por lo que
+    no necesita datos de calibración.
+    """
+    if (output_dir / ONNX_QUANTIZED_FILE).exists():
+        return output_dir
+    transformers = importlib.import_module("transformers")
+    ort = importlib.import_module("optimum.onnxruntime")
+    configuration = importlib.import_module("optimum.onnxruntime.configuration")
+
+    logger.info(f"Exportando {model_name} a ONNX con cuantización int8 en {output_dir}")
+    fp32_dir = output_dir / "fp32"
+    model = ort.ORTModelForSequenceClassification.from_pretrained(model_name, export=True)
+    model.save_pretrained(fp32_dir)
+    transformers.AutoTokenizer.from_pretrained(model_name).save_pretrained(output_dir)
+
+    if platform.machine().lower() in {"arm64", "aarch64"}:
+        qconfig = configuration.AutoQuantizationConfig.arm64(is_static=False, per_channel=False)
+    else:
+        qconfig = configuration.AutoQuantizationConfig.avx2(is_static=False, per_channel=False)
+    quantizer = ort.ORTQuantizer.from_pretrained(fp32_dir)
+    quantizer.quantize(save_dir=output_dir, quantization_config=qconfig)
+    return output_dir
+
+
+def load_onnx_sentiment_classifier() -> Optional[Any]:
+    """Carga el clasificador de sentimientos cuantizado servido por ONNX Runtime.
+
+    Requiere `optimum[onnxruntime]`. Devuelve un pipeline de transformers con
+    la misma interfaz que el de PyTorch, o `None` si no se puede cargar.
+    """
+    transformers = import_optional("transformers")
+    ort = import_optional("optimum.onnxruntime")
+    if transformers is None or ort is None:
+        logger.warning("optimum[onnxruntime] no está instalado; no se puede usar el backend ONNX.")
+        return None
+    try:
+        model_dir = export_onnx_sentiment_model(SENTIMENT_MODEL_NAME, onnx_model_dir())
+        import warnings
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            model = ort.ORTModelForSequenceClassification.from_pretrained(
+                model_dir,
+                file_name=ONNX_QUANTIZED_FILE
+            )
+            tokenizer = transformers.AutoTokenizer.from_pretrained(model_dir)
+            classifier = transformers.pipeline("sentiment-analysis", model=model, tokenizer=tokenizer)
+        logger.debug("✓ Modelo de sentimientos ONNX int8 cargado")
+        return classifier
+    except Exception as e:
+        logger.warning(f"No se pudo cargar el modelo ONNX: {e}")
+        return None
+
+
+def load_sentiment_classifier(backend: str = "") -> Optional[Any]:
     """Carga un clasificador de sentimientos multilingüe basado en transformers.
 
-    Intenta cargar un modelo multilingüe que funciona bien con textos en español:
-    - `xlm-roberta-base` con fine-tuning para sentimientos (multilingüe, robusto)
-    - Si falla, recurre a la heurística que busca palabras clave en español
+    Carga `SENTIMENT_MODEL_NAME`, un modelo multilingüe que funciona bien
+    con textos en español. Si falla, el análisis recurre a la heurística del
+    léxico activo.
 
-    NOTA: `distilbert-base-uncased-finetuned-sst-2-english` está limitado a inglés.
-    Usamos un modelo multilingüe para mejor precisión en textos españoles.
+    Con `backend="onnx"` (o `COGNITIVE_SENTIMENT_BACKEND=onnx`) se sirve el
+    mismo modelo cuantizado a int8 con ONNX Runtime; si no está disponible
+    se vuelve al backend de PyTorch.
     """
     if should_skip_models():
         logger.warning("COGNITIVE_SKIP_MODELS habilitado; se omite la carga de transformers.")
         return None
 
-    if hf_pipeline is None:
+    backend = backend or os.getenv("COGNITIVE_SENTIMENT_BACKEND") or "pytorch"
+    if backend == "onnx":
+        classifier = load_onnx_sentiment_classifier()
+        if classifier is not None:
+            return classifier
+        logger.warning("Backend ONNX no disponible. Se usará PyTorch.")
+
+    transformers = import_optional("transformers")
+    if transformers is None:
         logger.warning("transformers no está instalado. Se usará clasificación heurística.")
         return None
+    hf_pipeline = transformers.pipeline
     try:
         logger.debug("Cargando modelo de sentimientos (transformers)...")
         # Suprimir advertencias de transformers mientras se carga
@@ -347,7 +1129,7 @@ def load_sentiment_classifier() -> Optional[Any]:
             warnings.simplefilter("ignore")
             classifier = hf_pipeline(
                 "sentiment-analysis",
-                model="lxyuan/distilbert-base-multilingual-cased-sentiments-student",
+                model=SENTIMENT_MODEL_NAME,
                 device=-1  # CPU (cambiar a 0 si hay GPU disponible)
             )
         logger.debug("✓ Modelo de sentimientos cargado")
@@ -357,30 +1139,158 @@ def load_sentiment_classifier() -> Optional[Any]:
         return None
 
 
-def heuristic_sentiment(text: str) -> Tuple[str, float]:
-    """Clasificador de sentimientos por heurística (principalmente en español).
+class KeywordScan:
+    """Resultado de `KeywordIndex.scan`: etiquetas y palabras de sentimiento presentes."""
 
-    Cuenta apariciones de palabras positivas y negativas definidas y
-    devuelve una etiqueta y una puntuación entre 0 y 1. Esta función
-    sirve como respaldo cuando no se dispone de modelos de Transformer.
+    def __init__(self, tags: List[str], positive: Set[str], negative: Set[str]) -> None:
+        self.tags = tags
+        self.positive = positive
+        self.negative = negative
+
+
+class KeywordIndex:
+    """Índice precompilado de un léxico de etiquetas cognitivas y de sentimiento.
+
+    Todas las palabras clave del léxico se compilan en un único patrón tipo
+    trie (`build_trie_pattern`), de modo que una sola pasada sobre el texto
+    encuentra en cada posición la palabra clave más larga que empieza ahí. Las palabras clave que son prefijo de
+    la encontrada se resuelven con una tabla precalculada, por lo que el
+    coste por documento no depende del tamaño del léxico.
+
+    Las etiquetas se asignan por subcadena (`tag_match: substring`, como la
+    búsqueda aproximada original) o por palabra completa
+    (`tag_match: word`). Las palabras de sentimiento deben ir precedidas de
+    un espacio o del inicio del texto y seguidas de un espacio, un punto o
+    el final del texto.
     """
-    # Palabras clave extendidas para español
-    positive_words = {
-        "bueno", "excelente", "maravilloso", "positivo", "satisfactorio",
-        "bien", "genial", "perfecto", "óptimo", "fantástico", "magnífico",
-        "agradable", "hermoso", "beneficio", "éxito", "victoria"
-    }
-    negative_words = {
-        "malo", "terrible", "pésimo", "negativo", "riesgo", "fracaso",
-        "mal", "horrible", "desastre", "catastrófico", "problema", "delito",
-        "crimen", "peligro", "amenaza", "riesgoso", "perjudicial", "daño",
-        "sanción", "castigo", "ilegal", "prohibido", "violación"
-    }
-    lower = text.lower()
 
-    # Contar palabras completas (no subcadenas) para mayor precisión
-    pos_count = sum(1 for word in positive_words if f" {word} " in f" {lower} " or f" {word}." in f" {lower} ")
-    neg_count = sum(1 for word in negative_words if f" {word} " in f" {lower} " or f" {word}." in f" {lower} ")
+    def __init__(self, lexicon: Dict[str, Any], source: str = "") -> None:
+        self.source = source
+        self.language = lexicon.get("language", "")
+        self.tag_match = lexicon.get("tag_match", "substring")
+        if self.tag_match not in {"substring", "word"}:
+            raise ValueError(f"tag_match no soportado en el léxico: {self.tag_match}")
+        self.tag_order = list(lexicon.get("tags", {}))
+        sentiment = lexicon.get("sentiment", {})
+        # palabra clave -> (etiquetas, es positiva, es negativa)
+        self.keywords: Dict[str, Tuple[Set[str], bool, bool]] = {}
+        for tag, words in lexicon.get("tags", {}).items():
+            for word in words:
+                self._entry(word)[0].add(tag)
+        for polarity, flag in (("positive", 1), ("negative", 2)):
+            for word in sentiment.get(polarity, []):
+                tags, positive, negative = self._entry(word)
+                self.keywords[word.lower()] = (tags, positive or flag == 1, negative or flag == 2)
+        # Cada palabra clave con la lista de palabras clave que son prefijo suyo (incluida ella)
+        self.prefixes: Dict[str, List[str]] = {
+            word: [word[:end] for end in range(1, len(word) + 1) if word[:end] in self.keywords]
+            for word in self.keywords
+        }
+        self.pattern: Optional["re.Pattern[str]"] = None
+        if self.keywords:
+            # El primer carácter se consume con una clase (que `re` explora rápido) y la
+            # palabra clave se captura con una búsqueda anticipada desde ese mismo
+            # carácter, para encontrar también coincidencias solapadas
+            initials = "".join(sorted({word[0] for word in self.keywords}))
+            self.pattern = re.compile(
+                "[" + re.escape(initials) + "](?<=(?=(" + build_trie_pattern(self.keywords) + ")).)"
+            )
+        self.digest = hashlib.sha256(json.dumps(lexicon, sort_keys=True).encode("utf-8")).hexdigest()
+        self._last: Optional[Tuple[str, KeywordScan]] = None
+
+    def _entry(self, word: str) -> Tuple[Set[str], bool, bool]:
+        return self.keywords.setdefault(word.lower(), (set(), False, False))
+
+    @classmethod
+    def from_file(cls, path: Path) -> "KeywordIndex":
+        with path.open("r", encoding="utf-8") as handle:
+            return cls(json.load(handle), source=str(path))
+
+    def scan(self, text: str) -> KeywordScan:
+        """Recorre el texto una vez y devuelve etiquetas y palabras de sentimiento.
+
+        El último resultado se memoriza, de modo que etiquetado y sentimiento
+        heurístico del mismo texto comparten la pasada.
+        """
+        if self._last is not None and self._last[0] is text:
+            return self._last[1]
+        lower = text.lower()
+        length = len(lower)
+        found_tags: Set[str] = set()
+        positive: Set[str] = set()
+        negative: Set[str] = set()
+        if self.pattern is not None:
+            word_tags = self.tag_match == "word"
+            # Palabras clave ya resueltas: sus etiquetas están asignadas y, si
+            # son de sentimiento, ya se han contado; sus repeticiones se saltan
+            resolved: Set[str] = set()
+            for match in self.pattern.finditer(lower):
+                word = match.group(1)
+                if word in resolved:
+                    continue
+                start = match.start()
+                at_word_start = start == 0 or not _is_word_char(lower[start - 1])
+                after_space = start == 0 or lower[start - 1] == " "
+                done = True
+                for keyword in self.prefixes[word]:
+                    tags, is_positive, is_negative = self.keywords[keyword]
+                    end = start + len(keyword)
+                    following = lower[end] if end < length else ""
+                    if tags and not tags <= found_tags:
+                        if not word_tags or (at_word_start and not _is_word_char(following)):
+                            found_tags.update(tags)
+                        else:
+                            done = False
+                    if (is_positive or is_negative) and keyword not in positive and keyword not in negative:
+                        if after_space and following in ("", " ", "."):
+                            if is_positive:
+                                positive.add(keyword)
+                            if is_negative:
+                                negative.add(keyword)
+                        else:
+                            done = False
+                if done:
+                    resolved.add(word)
+        result = KeywordScan([tag for tag in self.tag_order if tag in found_tags], positive, negative)
+        self._last = (text, result)
+        return result
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch == "_"
+
+
+_KEYWORD_INDEX: Optional[KeywordIndex] = None
+
+
+def set_keyword_index(path: Optional[Path] = None) -> KeywordIndex:
+    """Carga el léxico indicado (o `COGNITIVE_LEXICON`, o el léxico en español por defecto)."""
+    global _KEYWORD_INDEX
+    if path is None:
+        path = Path(os.getenv("COGNITIVE_LEXICON") or DEFAULT_LEXICON_PATH)
+    _KEYWORD_INDEX = KeywordIndex.from_file(path)
+    logger.debug(f"Léxico cargado: {path} ({len(_KEYWORD_INDEX.keywords)} palabras clave)")
+    return _KEYWORD_INDEX
+
+
+def get_keyword_index() -> KeywordIndex:
+    """Devuelve el índice de palabras clave activo, cargándolo la primera vez."""
+    if _KEYWORD_INDEX is None:
+        return set_keyword_index()
+    return _KEYWORD_INDEX
+
+
+def heuristic_sentiment(text: str) -> Tuple[str, float]:
+    """Clasificador de sentimientos por heurística basado en el léxico activo.
+
+    Cuenta las palabras positivas y negativas distintas del léxico
+    presentes como palabra completa y devuelve una etiqueta y una
+    puntuación entre 0 y 1. Sirve como respaldo cuando no se dispone de
+    modelos de Transformer.
+    """
+    scan = get_keyword_index().scan(text)
+    pos_count = len(scan.positive)
+    neg_count = len(scan.negative)
 
     total = pos_count + neg_count
     if total == 0:
@@ -400,21 +1310,9 @@ def classify_sentiment(text: str, classifier: Optional[Any]) -> Tuple[str, float
     if classifier:
         try:
             # Limitar longitud para reducir carga computacional
-            result = classifier(text[:512])
+            result = classifier(text[:SENTIMENT_MAX_CHARS])
             if result and isinstance(result, list):
-                r = result[0]
-                label = r.get("label", "NEUTRAL")
-                score = float(r.get("score", 0.5))
-
-                # Normalizar etiquetas del modelo multilingüe (pueden ser LABEL_0, LABEL_1, etc.)
-                if label in {"LABEL_0", "NEGATIVE"}:
-                    label = "NEGATIVE"
-                elif label in {"LABEL_1", "POSITIVE"}:
-                    label = "POSITIVE"
-                else:
-                    label = "NEUTRAL"
-
-                return (label, score)
+                return normalize_sentiment_result(result[0])
         except Exception as e:
             logger.debug(f"Error al clasificar sentimiento con transformers: {e}")
 
@@ -422,6 +1320,158 @@ def classify_sentiment(text: str, classifier: Optional[Any]) -> Tuple[str, float
     return heuristic_sentiment(text)
 
 
+def normalize_sentiment_result(result: Dict[str, Any]) -> Tuple[str, float]:
+    """Convierte una predicción del pipeline de transformers en `(etiqueta, score)`."""
+    label = str(result.get("label", "NEUTRAL")).upper()
+    score = float(result.get("score", 0.5))
+
+    # Normalizar etiquetas del modelo multilingüe (pueden ser LABEL_0, LABEL_1 o
+    # minúsculas como `positive`/`negative`)
+    if label in {"LABEL_0", "NEGATIVE"}:
+        label = "NEGATIVE"
+    elif label in {"LABEL_1", "POSITIVE"}:
+        label = "POSITIVE"
+    else:
+        label = "NEUTRAL"
+
+    return (label, score)
+
+
+def sentiment_segments(text: str, max_segments: int = DEFAULT_SENTIMENT_MAX_SEGMENTS) -> List[str]:
+    """Divide un texto en segmentos de hasta `SENTIMENT_MAX_CHARS` para el clasificador.
+
+    Los cortes siguen los límites de párrafo y frase de `iter_text_chunks`.
+    Si salen más de `max_segments`, se toma una muestra equiespaciada que
+    incluye siempre el primero y el último, de modo que el coste por
+    documento está acotado.
+    """
+    segments = [chunk for _, chunk in iter_text_chunks(text, SENTIMENT_MAX_CHARS) if chunk.strip()]
+    if not segments:
+        return [text[:SENTIMENT_MAX_CHARS]]
+    max_segments = max(1, max_segments)
+    if len(segments) <= max_segments:
+        return segments
+    if max_segments == 1:
+        return segments[:1]
+    step = (len(segments) - 1) / (max_segments - 1)
+    return [segments[round(idx * step)] for idx in range(max_segments)]
+
+
+def aggregate_sentiment(
+    predictions: List[Tuple[str, float]],
+    weights: List[int],
+    aggregation: str = "mean"
+) -> Tuple[str, float]:
+    """Combina las predicciones de varios segmentos en una sola.
+
+    Cada predicción se convierte en probabilidad de positivo (`POSITIVE` →
+    score, `NEGATIVE` → 1 - score, `NEUTRAL` → 0.5) y se agrega con la
+    media (`mean`), la media ponderada por longitud (`weighted`) o el
+    segmento más negativo (`worst`). Devuelve la etiqueta resultante y su
+    confianza, como el clasificador.
+    """
+    if not predictions:
+        return ("NEUTRAL", 0.5)
+    if all(label == "NEUTRAL" for label, _ in predictions):
+        return ("NEUTRAL", round(sum(score for _, score in predictions) / len(predictions), 4))
+    positives = [
+        score if label == "POSITIVE" else (1 - score if label == "NEGATIVE" else 0.5)
+        for label, score in predictions
+    ]
+    if aggregation == "worst":
+        positive = min(positives)
+    elif aggregation == "weighted" and sum(weights) > 0:
+        positive = sum(p * w for p, w in zip(positives, weights)) / sum(weights)
+    else:
+        positive = sum(positives) / len(positives)
+    if positive >= 0.5:
+        return ("POSITIVE", round(positive, 4))
+    return ("NEGATIVE", round(1 - positive, 4))
+
+
+def classify_sentiment_batch(
+    texts: List[str],
+    classifier: Optional[Any],
+    batch_size: int = DEFAULT_SENTIMENT_BATCH_SIZE,
+    mode: str = "head",
+    aggregation: str = "mean",
+    max_segments: int = DEFAULT_SENTIMENT_MAX_SEGMENTS
+) -> List[Tuple[str, float]]:
+    """Clasifica el sentimiento de varios textos con una sola llamada al pipeline.
+
+    El pipeline de transformers agrupa los textos en lotes de `batch_size`
+    con padding y truncado a la longitud máxima del modelo, lo que amortiza
+    el coste por llamada en documentos cortos. Los resultados se devuelven
+    en el mismo orden que `texts`. Si la llamada en lote falla, cada texto
+    se clasifica por separado con `classify_sentiment`.
+
+    Con `mode="head"` solo se clasifican los primeros `SENTIMENT_MAX_CHARS`
+    caracteres de cada texto. Con `mode="segments"` cada texto se divide en
+    hasta `max_segments` segmentos (`sentiment_segments`), todos los
+    segmentos del lote se clasifican en la misma llamada y se combinan con
+    `aggregate_sentiment`.
+    """
+    if not texts:
+        return []
+    if classifier and mode == "segments":
+        try:
+            return classify_segmented_sentiment(texts, classifier, batch_size, aggregation, max_segments)
+        except Exception as e:
+            logger.debug(f"Error al clasificar sentimiento por segmentos con transformers: {e}")
+    elif classifier:
+        try:
+            results = classifier(
+                [text[:SENTIMENT_MAX_CHARS] for text in texts],
+                batch_size=max(1, batch_size),
+                padding=True,
+                truncation=True,
+            )
+            if isinstance(results, list) and len(results) == len(texts):
+                sentiments: List[Tuple[str, float]] = []
+                for text, result in zip(texts, results):
+                    if isinstance(result, list):
+                        result = result[0] if result else None
+                    if isinstance(result, dict):
+                        sentiments.append(normalize_sentiment_result(result))
+                    else:
+                        sentiments.append(heuristic_sentiment(text))
+                return sentiments
+        except Exception as e:
+            logger.debug(f"Error al clasificar sentimiento en lote con transformers: {e}")
+
+    return [classify_sentiment(text, classifier) for text in texts]
+
+
+def classify_segmented_sentiment(
+    texts: List[str],
+    classifier: Any,
+    batch_size: int,
+    aggregation: str,
+    max_segments: int
+) -> List[Tuple[str, float]]:
+    """Clasifica todos los segmentos de `texts` en una llamada y agrega por texto."""
+    segmented = [sentiment_segments(text, max_segments) for text in texts]
+    flat = [segment for segments in segmented for segment in segments]
+    results = classifier(flat, batch_size=max(1, batch_size), padding=True, truncation=True)
+    if not isinstance(results, list) or len(results) != len(flat):
+        raise ValueError("El clasificador no devolvió una predicción por segmento")
+    sentiments: List[Tuple[str, float]] = []
+    cursor = 0
+    for text, segments in zip(texts, segmented):
+        predictions: List[Tuple[str, float]] = []
+        for result in results[cursor:cursor + len(segments)]:
+            if isinstance(result, list):
+                result = result[0] if result else None
+            if isinstance(result, dict):
+                predictions.append(normalize_sentiment_result(result))
+        cursor += len(segments)
+        if len(predictions) == len(segments):
+            sentiments.append(aggregate_sentiment(predictions, [len(s) for s in segments], aggregation))
+        else:
+            sentiments.append(heuristic_sentiment(text))
+    return sentiments
+
+
 def extract_legal_entities(doc: Optional[Any], text: str) -> List[Tuple[str, str]]:
     """Extrae entidades que son referencias legales basándose en etiquetas y palabras clave.
 
@@ -472,43 +1522,8 @@ def extract_entities(doc: Optional[Any]) -> List[Tuple[str, str]]:
     return entities
 
 
-def generate_cognitive_tags(text: str, doc: Optional[Any]) -> List[str]:
-    """Genera etiquetas cognitivas combinando reglas heurísticas y entidades.
-
-    Analiza el texto en busca de palabras clave relacionadas con conceptos
-    cognitivos: idea, riesgo, legalidad, proyecto, viabilidad, emociones, etc.
-    """
-    tags: List[str] = []
-    lower = text.lower()
-
-    # Palabras clave expandidas
-    idea_keywords = {"idea", "innovación", "concepto", "teoría", "hipótesis", "propuesta", "pensamiento"}
-    risk_keywords = {"riesgo", "amenaza", "peligro", "problema", "delito", "crimen", "ilegalidad", "sanción"}
-    legal_keywords = {"legal", "ley", "normativa", "regulación", "jurídico", "artículo", "código", "derecho"}
-    project_keywords = {"proyecto", "implementación", "desarrollo", "ejecución", "plan", "programa"}
-    viability_keywords = {"viable", "viabilidad", "factible", "realizable", "posible"}
-    emotion_keywords = {"feliz", "triste", "emocionado", "enojado", "satisfecho", "preocupado", "esperanzado"}
-    intuition_keywords = {"intuición", "presentimiento", "corazonada", "instinto", "sensación"}
-    action_keywords = {"pendiente", "por hacer", "tarea", "accionar", "deber", "debe", "necesario"}
-
-    # Verificar palabras clave (búsqueda aproximada para mayor cobertura)
-    if any(word in lower for word in idea_keywords):
-        tags.append("idea")
-    if any(word in lower for word in risk_keywords):
-        tags.append("riesgo")
-    if any(word in lower for word in legal_keywords):
-        tags.append("legal")
-    if any(word in lower for word in project_keywords):
-        tags.append("proyecto")
-    if any(word in lower for word in viability_keywords):
-        tags.append("viabilidad")
-    if any(word in lower for word in emotion_keywords):
-        tags.append("emoción")
-    if any(word in lower for word in intuition_keywords):
-        tags.append("intuición")
-    if any(word in lower for word in action_keywords):
-        tags.append("acción pendiente")
-
+def add_entity_tags(tags: List[str], doc: Optional[Any]) -> List[str]:
+    """Completa las etiquetas con las entidades del doc y asigna "otros" si no hay ninguna."""
     # Analizar entidades si disponible
     if doc is not None:
         try:
@@ -529,12 +1544,486 @@ def generate_cognitive_tags(text: str, doc: Optional[Any]) -> List[str]:
     return tags
 
 
+def generate_cognitive_tags(text: str, doc: Optional[Any]) -> List[str]:
+    """Genera etiquetas cognitivas combinando el léxico activo y las entidades.
+
+    Las palabras clave de cada etiqueta (idea, riesgo, legal, proyecto,
+    viabilidad, emoción, intuición, acción pendiente) se buscan en una sola
+    pasada con el `KeywordIndex` cargado.
+    """
+    return add_entity_tags(list(get_keyword_index().scan(text).tags), doc)
+
+
 def generate_summary(text: str, max_chars: int = 200) -> str:
     """Devuelve un resumen simple de los primeros caracteres del texto."""
     clean = re.sub(r"\s+", " ", text.strip())
     return clean[:max_chars] + ("..." if len(clean) > max_chars else "")
 
 
+def decode_input_bytes(raw: bytes) -> str:
+    """Decodifica bytes como UTF-8 con saltos de línea universales (como `read_text`)."""
+    text = raw.decode('utf-8', errors='ignore')
+    return text.replace('\r\n', '\n').replace('\r', '\n')
+
+
+def read_input(file_path: Path) -> Tuple[str, str]:
+    """Lee un archivo de entrada y devuelve `(texto, sha256 de los bytes originales)`.
+
+    Los objetos `.zst` del almacén por contenido se descomprimen antes, de
+    modo que el hash es el del texto (el nombre del objeto).
+    """
+    raw = file_path.read_bytes()
+    if file_path.suffix.lower() == ".zst":
+        try:
+            import zstandard  # type: ignore
+        except ImportError as e:
+            raise RuntimeError(f"Se necesita el paquete zstandard para leer {file_path.name}") from e
+        raw = zstandard.ZstdDecompressor().decompressobj().decompress(raw)
+    return decode_input_bytes(raw), hashlib.sha256(raw).hexdigest()
+
+
+def input_suffix(file_path: Path) -> str:
+    """Extensión del contenido de un archivo de entrada, sin la de compresión."""
+    suffixes = [suffix for suffix in file_path.suffixes if suffix.lower() != ".zst"]
+    return suffixes[-1].lstrip('.') if suffixes else ""
+
+
+def read_input_text(file_path: Path) -> str:
+    """Lee un archivo de entrada como texto UTF-8 ignorando bytes inválidos."""
+    return read_input(file_path)[0]
+
+
+def non_linguistic_reason(text: str, min_letter_ratio: float = DEFAULT_MIN_LETTER_RATIO) -> str:
+    """Motivo por el que un texto no es lenguaje natural, o cadena vacía si lo es.
+
+    Se descartan las fichas de archivos binarios de la ingesta y, mirando
+    solo el comienzo del texto, el contenido con pocas letras entre los
+    caracteres no blancos (binarios decodificados, volcados numéricos) o
+    sin palabras (base64, hexadecimal). Con `min_letter_ratio <= 0` solo
+    se descartan las fichas.
+    """
+    if text.startswith(BINARY_STUB_MARKER):
+        return "binary_stub"
+    if min_letter_ratio <= 0:
+        return ""
+    tokens = text[:NON_LINGUISTIC_SAMPLE_CHARS].split()
+    chars = sum(len(token) for token in tokens)
+    if not chars:
+        return ""
+    letters = sum(1 for token in tokens for ch in token if ch.isalpha())
+    if letters / chars < min_letter_ratio:
+        return "low_letter_ratio"
+    if chars / len(tokens) > MAX_MEAN_TOKEN_LENGTH:
+        return "no_words"
+    return ""
+
+
+# Máscaras deterministas que hacen de funciones hash independientes de la firma MinHash
+_MINHASH_MASKS = tuple(
+    int.from_bytes(hashlib.blake2b(f"minhash-{i}".encode("utf-8"), digest_size=8).digest(), "little")
+    for i in range(MINHASH_PERMUTATIONS)
+)
+_WORD_RE = re.compile(r"\w+")
+
+
+def minhash_signature(text: str) -> Tuple[int, ...]:
+    """Firma MinHash de los shingles de `SHINGLE_WORDS` palabras de un texto (vacía si no hay palabras).
+
+    Cada shingle se reduce a un hash de 64 bits y cada componente de la
+    firma es el mínimo de esos hashes combinados (XOR) con una máscara
+    distinta; la proporción de componentes iguales entre dos firmas estima
+    la similitud de Jaccard de sus conjuntos de shingles.
+    """
+    words = _WORD_RE.findall(text.lower())
+    if not words:
+        return ()
+    width = min(SHINGLE_WORDS, len(words))
+    shingles = {" ".join(words[i:i + width]) for i in range(len(words) - width + 1)}
+    hashes = [
+        int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "little")
+        for shingle in shingles
+    ]
+    return tuple(min(map(mask.__xor__, hashes)) for mask in _MINHASH_MASKS)
+
+
+class NearDuplicateIndex:
+    """Índice LSH de firmas MinHash para agrupar documentos casi idénticos.
+
+    Los documentos se añaden en orden: si alguno de los representantes ya
+    indexados comparte una banda de la firma y su similitud estimada
+    alcanza `threshold`, el documento es un duplicado de ese representante;
+    si no, pasa a ser representante. Así cada duplicado queda a menos de
+    `threshold` de su representante, sin encadenar grupos.
+    """
+
+    def __init__(self, threshold: float = DEFAULT_NEAR_DUPLICATE_THRESHOLD) -> None:
+        self.threshold = threshold
+        self.rows = MINHASH_PERMUTATIONS // MINHASH_BANDS
+        self.buckets: List[Dict[Tuple[int, ...], List[Any]]] = [{} for _ in range(MINHASH_BANDS)]
+        self.signatures: Dict[Any, Tuple[int, ...]] = {}
+
+    def add(self, key: Any, signature: Tuple[int, ...]) -> Optional[Tuple[Any, float]]:
+        """Añade un documento; devuelve `(representante, similitud)` si es un casi duplicado."""
+        if not signature:
+            return None
+        bands = [tuple(signature[i * self.rows:(i + 1) * self.rows]) for i in range(MINHASH_BANDS)]
+        best: Optional[Tuple[Any, float]] = None
+        checked: Set[Any] = set()
+        for buckets, band in zip(self.buckets, bands):
+            for candidate in buckets.get(band, ()):
+                if candidate in checked:
+                    continue
+                checked.add(candidate)
+                other = self.signatures[candidate]
+                similarity = sum(1 for a, b in zip(signature, other) if a == b) / len(signature)
+                if similarity >= self.threshold and (best is None or similarity > best[1]):
+                    best = (candidate, similarity)
+        if best is not None:
+            return best
+        self.signatures[key] = signature
+        for buckets, band in zip(self.buckets, bands):
+            buckets.setdefault(band, []).append(key)
+        return None
+
+
+def find_near_duplicates(
+    file_paths: Iterable[Path],
+    threshold: float = DEFAULT_NEAR_DUPLICATE_THRESHOLD,
+    min_letter_ratio: float = DEFAULT_MIN_LETTER_RATIO
+) -> Dict[Path, Tuple[Path, float, Dict[str, Any]]]:
+    """Devuelve los casi duplicados de `file_paths` como `{ruta: (representante, similitud, datos)}`.
+
+    El representante de cada grupo es su primer archivo en el orden de
+    entrada. `datos` son los del propio texto del duplicado (`sha256` de su
+    contenido, `word_count` y `char_count`), que `duplicate_record` no
+    hereda del representante. Los archivos ilegibles o no lingüísticos no
+    se agrupan: el análisis los trata como siempre.
+    """
+    index = NearDuplicateIndex(threshold)
+    duplicates: Dict[Path, Tuple[Path, float, Dict[str, Any]]] = {}
+    for file_path in file_paths:
+        try:
+            text, content_sha = read_input(file_path)
+        except Exception:
+            continue
+        if non_linguistic_reason(text, min_letter_ratio):
+            continue
+        match = index.add(file_path, minhash_signature(text))
+        if match is not None:
+            facts = {"sha256": content_sha, "word_count": len(re.findall(r"\w+", text)), "char_count": len(text)}
+            duplicates[file_path] = (match[0], match[1], facts)
+    return duplicates
+
+
+# Campos de un casi duplicado que describen su propio archivo y no el del representante
+DUPLICATE_OWN_FIELDS = (
+    "uuid", "file", "title", "content_type", "word_count", "char_count", "sources", "gitops_trace",
+    "duplicate_of", "near_duplicate_similarity", "near_duplicate_inherited",
+)
+
+
+def duplicate_record(
+    representative: Dict[str, Any],
+    file_path: Path,
+    similarity: float,
+    facts: Dict[str, Any],
+    redact_enabled: bool,
+    hash_salt: str,
+    hash_source: str = "redacted"
+) -> Dict[str, Any]:
+    """Registro de un casi duplicado: el análisis de su representante con su propia identidad.
+
+    La identidad, los recuentos y `gitops_trace.source` (ruta y hash) son
+    los del propio archivo (`facts` de `find_near_duplicates`). Como su
+    texto no se redacta, con redacción el hash de la traza es el SHA-256
+    de su contenido con salt (`hash_text`) en lugar del del texto
+    redactado. El resto de campos (etiquetas, sentimiento, entidades,
+    resúmenes...) se heredan del representante y se enumeran en
+    `near_duplicate_inherited`.
+    """
+    record = dict(representative)
+    record_uuid = str(uuid.uuid4())
+    if redact_enabled:
+        file_hash = hash_identifier(file_path.name, hash_salt)
+        record["uuid"] = hash_identifier(record_uuid, hash_salt)
+        record["file"] = f"file_{file_hash}"
+        record["title"] = f"document_{file_hash}"
+    else:
+        record["uuid"] = record_uuid
+        record["file"] = str(file_path)
+        record["title"] = file_path.stem
+    record["content_type"] = input_suffix(file_path)
+    record["word_count"] = facts["word_count"]
+    record["char_count"] = facts["char_count"]
+    record["duplicate_of"] = representative.get("file", "")
+    record["near_duplicate_similarity"] = round(similarity, 3)
+    record["near_duplicate_inherited"] = sorted(key for key in record if key not in DUPLICATE_OWN_FIELDS)
+    if hash_source == "raw" and not redact_enabled:
+        content_hash = facts["sha256"]
+    else:
+        content_hash = hash_text(facts["sha256"], hash_salt)
+    trace = dict(record.get("gitops_trace", {}))
+    trace["source"] = dict(trace.get("source", {}), path=record["file"], sha256=content_hash)
+    record["gitops_trace"] = trace
+    return record
+
+
+def load_raw_store(input_dir: Path) -> Optional[Dict[Path, List[str]]]:
+    """Objetos del almacén por contenido de la ingesta con sus fuentes, o None si no lo es.
+
+    `input_dir` es un almacén si contiene `index.json` (fuente → hash y
+    objeto). Cada objeto aparece una vez aunque lo compartan varias fuentes.
+    """
+    index_path = input_dir / RAW_STORE_INDEX
+    if not index_path.is_file():
+        return None
+    try:
+        entries = json.loads(index_path.read_text(encoding="utf-8")).get("entries", {})
+    except (OSError, ValueError) as e:
+        logger.warning(f"No se pudo leer el índice del almacén {index_path}: {e}")
+        return None
+    objects: Dict[Path, List[str]] = {}
+    for source, entry in entries.items():
+        objects.setdefault(input_dir / entry["object"], []).append(source)
+    return {path: sorted(sources) for path, sources in sorted(objects.items())}
+
+
+def iter_input_files(input_dir: Path) -> Iterator[Path]:
+    """Recorre `input_dir` y devuelve los archivos con extensiones analizables.
+
+    Si `input_dir` es un almacén por contenido devuelve sus objetos, uno
+    por contenido distinto.
+    """
+    store = load_raw_store(input_dir)
+    if store is not None:
+        yield from (path for path in store if path.is_file())
+        return
+    for p in input_dir.rglob('*'):
+        if p.is_file() and p.suffix.lower() in ANALYZABLE_SUFFIXES:
+            yield p
+
+
+class ChunkEntity:
+    """Entidad de un fragmento con offsets relativos al texto completo."""
+
+    def __init__(self, text: str, label: str, start_char: int, end_char: int) -> None:
+        self.text = text
+        self.label_ = label
+        self.start_char = start_char
+        self.end_char = end_char
+
+
+class ChunkedDoc:
+    """Resultado combinado del análisis por fragmentos de un documento largo.
+
+    Expone la parte del interfaz de `spacy.tokens.Doc` que usa el pipeline
+    (`text` y `ents`). Los docs de cada fragmento no se conservan: solo
+    se guardan sus entidades, con offsets desplazados al texto completo.
+    """
+
+    def __init__(self, text: str, ents: List[ChunkEntity], chunks: int) -> None:
+        self.text = text
+        self.ents = ents
+        self.chunks = chunks
+
+
+def iter_text_chunks(text: str, max_chars: int) -> Iterator[Tuple[int, str]]:
+    """Divide `text` en ventanas de como mucho `max_chars` caracteres.
+
+    Corta preferentemente en límites de párrafo (línea en blanco), después
+    en finales de frase o de línea y, en último caso, en un espacio o a
+    tamaño fijo. Devuelve pares `(offset, fragmento)`; la concatenación de
+    los fragmentos es el texto original.
+    """
+    max_chars = max(1, max_chars)
+    start = 0
+    length = len(text)
+    while length - start > max_chars:
+        limit = start + max_chars
+        cut = -1
+        for separator in ("\n\n", ". ", "? ", "! ", "\n", " "):
+            position = text.rfind(separator, start + 1, limit)
+            if position != -1:
+                cut = position + len(separator)
+                break
+        if cut <= start:
+            cut = limit
+        yield start, text[start:cut]
+        start = cut
+    if start < length or not text:
+        yield start, text[start:]
+
+
+def chunk_limit(nlp_model: Any, chunk_chars: int) -> int:
+    """Tamaño efectivo de fragmento: nunca por encima de `nlp.max_length`."""
+    max_length = getattr(nlp_model, "max_length", None)
+    if isinstance(max_length, int) and max_length > 0:
+        return min(chunk_chars, max_length)
+    return chunk_chars
+
+
+def process_chunked(
+    nlp_model: Any,
+    text: str,
+    chunk_chars: int = DEFAULT_CHUNK_CHARS,
+    batch_size: int = 1
+) -> ChunkedDoc:
+    """Procesa un texto largo fragmento a fragmento y combina sus entidades.
+
+    Los fragmentos se envían a `nlp.pipe` en lotes de `batch_size`; de cada
+    doc solo se extraen las entidades, de modo que la memoria del modelo
+    queda acotada por el tamaño de fragmento y no por el del documento.
+    """
+    chunks = (
+        (chunk, offset)
+        for offset, chunk in iter_text_chunks(text, chunk_limit(nlp_model, chunk_chars))
+    )
+    ents: List[ChunkEntity] = []
+    count = 0
+    for doc, offset in nlp_model.pipe(chunks, as_tuples=True, batch_size=max(1, batch_size)):
+        count += 1
+        for ent in doc.ents:
+            start = getattr(ent, "start_char", 0)
+            end = getattr(ent, "end_char", start + len(ent.text))
+            ents.append(ChunkEntity(ent.text, ent.label_, offset + start, offset + end))
+    return ChunkedDoc(text, ents, count)
+
+
+def process_text(
+    nlp_model: Any,
+    text: str,
+    chunk_chars: int = DEFAULT_CHUNK_CHARS,
+    batch_size: int = 1
+) -> Any:
+    """Aplica spaCy a un texto, por fragmentos si supera el tamaño de fragmento."""
+    if len(text) > chunk_limit(nlp_model, chunk_chars):
+        return process_chunked(nlp_model, text, chunk_chars, batch_size)
+    return nlp_model(text)
+
+
+def iter_docs(
+    file_paths: Iterable[Path],
+    nlp_model: Optional[Any],
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    n_process: int = 1,
+    lookup: Optional[Callable[[Path, str], Optional[Dict[str, Any]]]] = None,
+    chunk_chars: int = DEFAULT_CHUNK_CHARS,
+    timer: Optional[StageTimer] = None,
+    min_letter_ratio: float = DEFAULT_MIN_LETTER_RATIO
+) -> Iterator[Dict[str, Any]]:
+    """Lee los archivos y los procesa con spaCy en lotes mediante `nlp.pipe`.
+
+    Devuelve, en el mismo orden que `file_paths`, diccionarios con las claves
+    `path`, `text`, `sha256`, `doc`, `error`, `cached` y `skipped`. Los
+    archivos que no se pueden leer se emiten con `error` definido y texto
+    vacío, sin interrumpir el lote. Sin modelo spaCy, `doc` es siempre `None`.
+
+    Los textos que no son lenguaje natural (`non_linguistic_reason`) no se
+    envían al modelo: se emiten con el motivo en `skipped` y texto vacío.
+
+    Si se indica `lookup`, se consulta con la ruta y el hash del contenido;
+    cuando devuelve un registro, este se emite en `cached` y el texto no se
+    envía al modelo.
+
+    Los textos más largos que `chunk_chars` no entran en el lote: se
+    procesan por fragmentos con `process_chunked` y su `doc` es un
+    `ChunkedDoc`.
+
+    Con `timer`, la lectura y el procesamiento por fragmentos se miden por
+    archivo; el tiempo de `nlp.pipe` se mide por lote (sin la lectura que
+    ocurre mientras spaCy pide documentos) y solo cuenta en el total.
+    """
+    def read_all() -> Iterator[Tuple[str, Dict[str, Any]]]:
+        for file_path in file_paths:
+            item: Dict[str, Any] = {
+                "path": file_path,
+                "text": "",
+                "sha256": "",
+                "doc": None,
+                "error": None,
+                "cached": None,
+                "skipped": "",
+            }
+            try:
+                with timed_stage(timer, "read", str(file_path)):
+                    text, content_sha = read_input(file_path)
+            except Exception as e:
+                logger.error(f"Error al leer {file_path}: {e}")
+                item["error"] = e
+                yield "", item
+                continue
+            item["sha256"] = content_sha
+            item["skipped"] = non_linguistic_reason(text, min_letter_ratio)
+            if item["skipped"]:
+                yield "", item
+                continue
+            if lookup is not None:
+                item["cached"] = lookup(file_path, content_sha)
+                if item["cached"] is not None:
+                    yield "", item
+                    continue
+            if nlp_model is not None and len(text) > chunk_limit(nlp_model, chunk_chars):
+                try:
+                    with timed_stage(timer, "spacy", str(file_path)):
+                        item["doc"] = process_chunked(nlp_model, text, chunk_chars, batch_size)
+                except Exception as e:
+                    logger.warning(f"Error al procesar con spaCy para {file_path}: {e}")
+                item["text"] = text
+                yield "", item
+                continue
+            yield text, item
+
+    if nlp_model is None:
+        for text, item in read_all():
+            item["text"] = text
+            yield item
+        return
+
+    if hasattr(nlp_model, "set_error_handler"):
+        def on_error(proc_name: str, proc: Any, docs: List[Any], e: Exception) -> None:
+            logger.warning(f"Error en el componente spaCy '{proc_name}': {e}")
+
+        try:
+            nlp_model.set_error_handler(on_error)
+        except Exception as e:
+            logger.debug(f"No se pudo registrar el manejador de errores de spaCy: {e}")
+
+    docs = iter(nlp_model.pipe(
+        read_all(),
+        as_tuples=True,
+        batch_size=max(1, batch_size),
+        n_process=max(1, n_process),
+    ))
+    while True:
+        nested_before = timer.total("read") + timer.total("spacy") if timer is not None else 0.0
+        start = time.perf_counter()
+        try:
+            doc, item = next(docs)
+        except StopIteration:
+            break
+        if timer is not None:
+            # Solo el tiempo del modelo: se descuentan la lectura y los fragmentos medidos dentro
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            nested_ms = timer.total("read") + timer.total("spacy") - nested_before
+            timer.add("spacy", start, max(0.0, elapsed_ms - nested_ms))
+        if item["error"] is None and item["cached"] is None and not item["skipped"] and not item["text"]:
+            item["text"] = doc.text
+            item["doc"] = doc
+        yield item
+
+
+def iter_batches(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    """Agrupa un iterable en listas de como máximo `size` elementos."""
+    batch: List[Any] = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= max(1, size):
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
 def generate_record(
     file_path: Path,
     nlp_model: Optional[Any],
@@ -542,7 +2031,9 @@ def generate_record(
     redact: bool,
     hash_salt: str,
     env: str,
-    trace_context: Dict[str, str]
+    trace_context: Dict[str, str],
+    hash_source: str = "redacted",
+    chunk_chars: int = DEFAULT_CHUNK_CHARS
 ) -> Dict[str, Any]:
     """Procesa un archivo y devuelve un registro semántico conforme al esquema.
 
@@ -550,46 +2041,97 @@ def generate_record(
     y genera etiquetas cognitivas.
     """
     try:
-        text = file_path.read_text(encoding='utf-8', errors='ignore')
+        text, content_sha = read_input(file_path)
     except Exception as e:
         logger.error(f"Error al leer {file_path}: {e}")
         raise
 
-    # Procesar con spaCy si está disponible
+    # Procesar con spaCy si está disponible (por fragmentos si el texto es muy largo)
     doc = None
     if nlp_model is not None:
         try:
-            doc = nlp_model(text)
+            doc = process_text(nlp_model, text, chunk_chars)
         except Exception as e:
             logger.warning(f"Error al procesar con spaCy para {file_path}: {e}")
             doc = None
 
+    return build_record(
+        file_path,
+        text,
+        doc,
+        sentiment_classifier,
+        redact,
+        hash_salt,
+        env,
+        trace_context,
+        content_sha=content_sha,
+        hash_source=hash_source
+    )
+
+
+def build_record(
+    file_path: Path,
+    text: str,
+    doc: Optional[Any],
+    sentiment_classifier: Optional[Any],
+    redact: bool,
+    hash_salt: str,
+    env: str,
+    trace_context: Dict[str, str],
+    sentiment: Optional[Tuple[str, float]] = None,
+    content_sha: str = "",
+    hash_source: str = "redacted",
+    redaction: Optional[DocumentRedaction] = None,
+    timer: Optional[StageTimer] = None
+) -> Dict[str, Any]:
+    """Construye el registro semántico a partir del texto y su doc de spaCy ya calculado.
+
+    Permite reutilizar los docs producidos en lote por `iter_docs` sin volver
+    a ejecutar el modelo por cada archivo. Si se indica `sentiment` (por
+    ejemplo, calculado con `classify_sentiment_batch`), no se vuelve a
+    invocar el clasificador.
+
+    La redacción del documento se calcula una sola vez (`DocumentRedaction`)
+    y se reutiliza para el `content_hash` y para los resúmenes redactados.
+    Con `hash_source="raw"` y sin redacción, el hash es el SHA-256 de los
+    bytes originales (`content_sha`) y el texto no se redacta.
+
+    Con `timer`, cada fase (etiquetas, sentimiento, entidades, extracción
+    legal, firma de autor, redacción y hash) se mide bajo la ruta del archivo.
+    """
+    file_key = str(file_path)
     # Contar palabras y caracteres
     word_count = len(re.findall(r"\w+", text))
     char_count = len(text)
 
     # Etiquetas cognitivas
-    tags = generate_cognitive_tags(text, doc)
+    with timed_stage(timer, "tags", file_key):
+        tags = generate_cognitive_tags(text, doc)
 
     # Sentimiento
-    sentiment_label, sentiment_score = classify_sentiment(text, sentiment_classifier)
+    if sentiment is None:
+        with timed_stage(timer, "sentiment", file_key):
+            sentiment = classify_sentiment(text, sentiment_classifier)
+    sentiment_label, sentiment_score = sentiment
 
     # Entidades
-    entities = extract_entities(doc)
+    with timed_stage(timer, "entities", file_key):
+        entities = extract_entities(doc)
 
     # Entidades legales
-    legal_entities = extract_legal_entities(doc, text)
+    with timed_stage(timer, "legal", file_key):
+        legal_entities = extract_legal_entities(doc, text)
 
-    # Extraer flags de riesgo (palabras clave de riesgo en el texto)
-    risk_keywords = {"riesgo", "delito", "crimen", "peligro", "amenaza", "sanción", "pena", "castigo", "ilegal"}
-    risk_flags = [ent for ent in legal_entities if any(kw in ent[1].lower() for kw in risk_keywords)]
+        # Extraer flags de riesgo (palabras clave de riesgo en el texto)
+        risk_keywords = {"riesgo", "delito", "crimen", "peligro", "amenaza", "sanción", "pena", "castigo", "ilegal"}
+        risk_flags = [ent for ent in legal_entities if any(kw in ent[1].lower() for kw in risk_keywords)]
 
     # Rellenar campos del esquema semántico
     record: Dict[str, Any] = {
         "uuid": str(uuid.uuid4()),
         "file": str(file_path),
         "title": file_path.stem,
-        "content_type": file_path.suffix.lstrip('.'),
+        "content_type": input_suffix(file_path),
         "word_count": word_count,
         "char_count": char_count,
         "intent_tags": tags,
@@ -598,7 +2140,7 @@ def generate_record(
         "summary": generate_summary(text, 400),
     }
     record["redacted"] = False
-    record["redaction"] = {"enabled": False, "env": env}
+    record["redaction"] = {"enabled": False, "env": env, "hash_source": hash_source}
 
     # Campos adicionales basados en heurísticas
     record["idea_summary"] = record["summary"] if "idea" in tags else ""
@@ -606,19 +2148,20 @@ def generate_record(
     record["legal_reference"] = legal_entities if "legal" in tags else []
 
     # Firma de autor: buscar líneas que contengan "autor", "firma", "por", "escrito"
-    author = None
-    author_patterns = ["autor:", "firma:", "por:", "escrito por", "signed by"]
-    for line in text.splitlines():
-        line_lower = line.lower()
-        if any(pattern in line_lower for pattern in author_patterns):
-            # Extraer el texto después del patrón
-            for pattern in author_patterns:
-                if pattern in line_lower:
-                    author = line.split(pattern)[-1].strip()
-                    if author and len(author) > 2:
-                        break
-            if author:
-                break
+    with timed_stage(timer, "author", file_key):
+        author = None
+        author_patterns = ["autor:", "firma:", "por:", "escrito por", "signed by"]
+        for line in text.splitlines():
+            line_lower = line.lower()
+            if any(pattern in line_lower for pattern in author_patterns):
+                # Extraer el texto después del patrón
+                for pattern in author_patterns:
+                    if pattern in line_lower:
+                        author = line.split(pattern)[-1].strip()
+                        if author and len(author) > 2:
+                            break
+                if author:
+                    break
 
     record["author_signature"] = author or ""
 
@@ -635,11 +2178,21 @@ def generate_record(
 
     record["relevance_score"] = round(min(1.0, relevance), 3)
 
-    hash_source = redact_text(text, doc)
-    content_hash = hash_text(hash_source, hash_salt)
+    if redaction is None:
+        with timed_stage(timer, "redaction", file_key):
+            redaction = DocumentRedaction(text, doc)
+    if hash_source == "raw" and not redact:
+        with timed_stage(timer, "hashing", file_key):
+            content_hash = content_sha or hashlib.sha256(text.encode("utf-8")).hexdigest()
+    else:
+        with timed_stage(timer, "redaction", file_key):
+            redacted_text = redaction.text
+        with timed_stage(timer, "hashing", file_key):
+            content_hash = hash_text(redacted_text, hash_salt)
 
     if redact:
-        redacted_record = redact_record(record, doc, hash_salt, env)
+        with timed_stage(timer, "redaction", file_key):
+            redacted_record = redact_record(record, doc, hash_salt, env, redaction)
         attach_insight_sections(redacted_record, content_hash, trace_context)
         return redacted_record
 
@@ -647,13 +2200,340 @@ def generate_record(
     return record
 
 
-def main() -> None:
+# Estado de cada proceso del pool de `--workers` (modelos y ajustes del análisis)
+_WORKER_STATE: Dict[str, Any] = {}
+
+
+def init_worker(settings: Dict[str, Any]) -> None:
+    """Inicializador del pool: carga los modelos de PLN una sola vez por proceso.
+
+    La huella del pipeline se calcula en el propio worker con los modelos
+    que ha cargado; la caché se abre sin `load()`, que corresponde al
+    proceso principal.
+    """
+    _WORKER_STATE.clear()
+    _WORKER_STATE.update(settings)
+    if settings.get("lexicon_path"):
+        set_keyword_index(Path(settings["lexicon_path"]))
+    nlp_model = load_spacy_model(settings.get("spacy_profile", ""))
+    sentiment_classifier = load_sentiment_classifier(settings.get("sentiment_backend", ""))
+    fingerprint = pipeline_fingerprint(
+        nlp_model,
+        sentiment_classifier,
+        settings["redact"],
+        settings["hash_salt"],
+        settings["env"],
+        settings["hash_source"],
+        settings.get("chunk_chars", DEFAULT_CHUNK_CHARS),
+        settings.get("sentiment_options")
+    )
+    cache_path = settings.get("cache_path")
+    _WORKER_STATE["nlp_model"] = nlp_model
+    _WORKER_STATE["sentiment_classifier"] = sentiment_classifier
+    _WORKER_STATE["fingerprint"] = fingerprint
+    _WORKER_STATE["cache"] = AnalysisCache(Path(cache_path), fingerprint) if cache_path else None
+
+
+def worker_fingerprint() -> str:
+    """Devuelve la huella del pipeline calculada por un worker ya inicializado."""
+    return _WORKER_STATE["fingerprint"]
+
+
+def worker_spacy_components() -> List[str]:
+    """Devuelve los componentes de spaCy cargados por un worker ya inicializado."""
+    return list(getattr(_WORKER_STATE.get("nlp_model"), "pipe_names", []) or [])
+
+
+def analyze_file(file_path: Path) -> Dict[str, Any]:
+    """Analiza un archivo dentro de un worker del pool.
+
+    Devuelve un diccionario serializable con las claves `path`, `record`,
+    `cached` (`None` si no se consultó la caché), `error` (mensaje o
+    `None`), `skipped` (motivo si el texto no es lenguaje natural),
+    `redaction_counts` y `stage_events` (mediciones de
+    `StageTimer` para que el proceso principal las acumule). Las entradas
+    nuevas de caché se escriben desde el propio worker.
+    """
+    state = _WORKER_STATE
+    timer = StageTimer(record_events=True)
+    file_key = str(file_path)
+    result: Dict[str, Any] = {
+        "path": file_path,
+        "record": None,
+        "cached": None,
+        "error": None,
+        "skipped": "",
+        "redaction_counts": {},
+        "stage_events": timer.events,
+    }
+    try:
+        with timer.stage("read", file_key):
+            text, content_sha = read_input(file_path)
+        result["skipped"] = non_linguistic_reason(
+            text, state.get("min_letter_ratio", DEFAULT_MIN_LETTER_RATIO)
+        )
+        if result["skipped"]:
+            return result
+        cache = state.get("cache")
+        if cache is not None:
+            result["record"] = cache.get(file_path, content_sha)
+            result["cached"] = result["record"] is not None
+            if result["cached"]:
+                return result
+
+        doc = None
+        if state["nlp_model"] is not None:
+            try:
+                with timer.stage("spacy", file_key):
+                    doc = process_text(state["nlp_model"], text, state.get("chunk_chars", DEFAULT_CHUNK_CHARS))
+            except Exception as e:
+                logger.warning(f"Error al procesar con spaCy para {file_path}: {e}")
+
+        with timer.stage("redaction", file_key):
+            redaction = DocumentRedaction(text, doc)
+        with timer.stage("sentiment", file_key):
+            sentiment = classify_sentiment_batch(
+                [text], state["sentiment_classifier"], **state.get("sentiment_options", {})
+            )[0]
+        record = build_record(
+            file_path,
+            text,
+            doc,
+            state["sentiment_classifier"],
+            state["redact"],
+            state["hash_salt"],
+            state["env"],
+            state["trace_context"],
+            sentiment=sentiment,
+            content_sha=content_sha,
+            hash_source=state["hash_source"],
+            redaction=redaction,
+            timer=timer
+        )
+        if cache is not None:
+            with timer.stage("serialization", file_key):
+                cache.put(file_path, content_sha, record)
+        result["record"] = record
+        result["redaction_counts"] = redaction.counts
+    except Exception as e:
+        result["error"] = str(e) or type(e).__name__
+    return result
+
+
+def create_worker_pool(workers: int, settings: Dict[str, Any]) -> Any:
+    """Crea el pool de análisis; cada proceso ejecuta `init_worker` al arrancar."""
+    # Importación diferida: multiprocessing solo se necesita con --workers
+    from concurrent.futures import ProcessPoolExecutor
+
+    return ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(settings,))
+
+
+def iter_parallel_results(
+    executor: Any,
+    file_paths: List[Path],
+    workers: int
+) -> Iterator[Dict[str, Any]]:
+    """Reparte los archivos entre los workers y devuelve sus resultados en orden de entrada."""
+    chunksize = max(1, min(32, len(file_paths) // (workers * 4)))
+    yield from executor.map(analyze_file, file_paths, chunksize=chunksize)
+
+
+def profile_startup(lexicon_path: Path) -> Dict[str, Any]:
+    """Mide las fases de arranque del análisis sin procesar ningún archivo.
+
+    Informa del tiempo de importación de este módulo, de la carga del
+    léxico, de la importación de spaCy y transformers y de la carga de los
+    modelos, junto con los módulos pesados presentes en memoria. En el
+    camino rápido la importación debe quedar dentro de `FAST_IMPORT_BUDGET_MS`.
+    """
+    phases: Dict[str, float] = {"module_import": MODULE_IMPORT_MS}
+
+    def timed(name: str, func: Callable[[], Any]) -> None:
+        start = time.perf_counter()
+        func()
+        phases[name] = round((time.perf_counter() - start) * 1000, 1)
+
+    fast_path = should_skip_models()
+    timed("lexicon", lambda: set_keyword_index(lexicon_path))
+    if not fast_path:
+        timed("import_spacy", lambda: import_optional("spacy"))
+        timed("import_transformers", lambda: import_optional("transformers"))
+    timed("load_spacy_model", load_spacy_model)
+    timed("load_sentiment_classifier", load_sentiment_classifier)
+    return {
+        "event": "startup_profile",
+        "fast_path": fast_path,
+        "phases_ms": phases,
+        "total_ms": round(sum(phases.values()), 1),
+        "heavy_modules_loaded": [name for name in HEAVY_MODULES if name in sys.modules],
+        "import_budget_ms": FAST_IMPORT_BUDGET_MS,
+        "within_budget": not fast_path or MODULE_IMPORT_MS <= FAST_IMPORT_BUDGET_MS,
+    }
+
+
+def build_trace_context(env: str) -> Dict[str, str]:
+    """Crea el contexto de trazabilidad GitOps de una ejecución (run_id, actor, git)."""
+    return {
+        "run_id": str(uuid.uuid4()),
+        "actor": os.getenv("USER") or os.getenv("USERNAME") or "unknown",
+        "env": env,
+        "git_commit": os.getenv("GIT_COMMIT") or os.getenv("GITHUB_SHA") or "",
+        "git_ref": os.getenv("GIT_BRANCH") or os.getenv("GITHUB_REF_NAME") or "",
+        "schema_version": "1.0",
+    }
+
+
+def main(
+    argv: Optional[List[str]] = None,
+    models: Optional[Tuple[Optional[Any], Optional[Any]]] = None,
+    redaction: Optional[Dict[str, str]] = None
+) -> Dict[str, Any]:
+    """Ejecuta el análisis completo y devuelve un resumen de la ejecución.
+
+    `argv` sustituye a los argumentos de la línea de comandos y `models`
+    permite reutilizar un par `(nlp_model, sentiment_classifier)` ya
+    cargado (p. ej. desde `pipeline/service.py`) en lugar de cargarlo de
+    disco. Con `--workers` mayor que 1 los modelos se cargan en cada worker.
+    `redaction` sustituye a `COGNITIVE_ENV`, `COGNITIVE_REDACT` y
+    `COGNITIVE_HASH_SALT` (ver `redaction_settings`).
+    """
     parser = argparse.ArgumentParser(description='Análisis cognitivo avanzado')
     parser.add_argument('--input', default='outputs/raw', help='Directorio con archivos de texto')
     parser.add_argument('--output', default='outputs/insights/analysis.json', help='Archivo JSON de salida')
     parser.add_argument('--schema', default='schemas/insight.schema.json', help='Ruta al esquema de insights')
+    parser.add_argument(
+        '--batch-size',
+        type=int,
+        default=int(os.getenv("COGNITIVE_BATCH_SIZE", str(DEFAULT_BATCH_SIZE))),
+        help='Documentos por lote en nlp.pipe'
+    )
+    parser.add_argument(
+        '--n-process',
+        type=int,
+        default=int(os.getenv("COGNITIVE_N_PROCESS", "1")),
+        help='Procesos de spaCy para nlp.pipe (1 = en el proceso actual)'
+    )
+    parser.add_argument(
+        '--spacy-profile',
+        choices=tuple(SPACY_PROFILES),
+        default=resolve_spacy_profile(),
+        help='Componentes de spaCy a cargar: ner (solo entidades), tokenizer (sin modelos estadísticos) o full'
+    )
+    parser.add_argument(
+        '--sentiment-batch-size',
+        type=int,
+        default=int(os.getenv("COGNITIVE_SENTIMENT_BATCH_SIZE", str(DEFAULT_SENTIMENT_BATCH_SIZE))),
+        help='Textos por lote en el clasificador de sentimientos'
+    )
+    parser.add_argument(
+        '--sentiment-backend',
+        choices=SENTIMENT_BACKENDS,
+        default=os.getenv("COGNITIVE_SENTIMENT_BACKEND") or "pytorch",
+        help='pytorch: precisión completa; onnx: ONNX Runtime con cuantización int8 dinámica (requiere optimum[onnxruntime])'
+    )
+    parser.add_argument(
+        '--sentiment-mode',
+        choices=SENTIMENT_MODES,
+        default=os.getenv("COGNITIVE_SENTIMENT_MODE") or "head",
+        help=f'head: solo los primeros {SENTIMENT_MAX_CHARS} caracteres; segments: varios segmentos agregados en una llamada'
+    )
+    parser.add_argument(
+        '--sentiment-aggregation',
+        choices=SENTIMENT_AGGREGATIONS,
+        default=os.getenv("COGNITIVE_SENTIMENT_AGGREGATION") or "mean",
+        help='Agregación de segmentos: media, media ponderada por longitud o peor segmento'
+    )
+    parser.add_argument(
+        '--sentiment-max-segments',
+        type=int,
+        default=int(os.getenv("COGNITIVE_SENTIMENT_MAX_SEGMENTS", str(DEFAULT_SENTIMENT_MAX_SEGMENTS))),
+        help='Máximo de segmentos por documento en modo segments'
+    )
+    parser.add_argument(
+        '--cache-dir',
+        default=os.getenv("COGNITIVE_ANALYSIS_CACHE", ""),
+        help=(
+            'Directorio de la caché incremental de registros (por defecto: '
+            '<salida>/../cache/analysis); cada directorio de entrada usa un subdirectorio propio'
+        )
+    )
+    parser.add_argument(
+        '--chunk-chars',
+        type=int,
+        default=int(os.getenv("COGNITIVE_CHUNK_CHARS", str(DEFAULT_CHUNK_CHARS))),
+        help='Caracteres máximos por fragmento de spaCy; los textos más largos se procesan por fragmentos'
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=int(os.getenv("COGNITIVE_WORKERS", "1")),
+        help='Procesos que analizan archivos en paralelo (1 = análisis en lotes en el proceso actual)'
+    )
+    parser.add_argument('--no-cache', action='store_true', help='Reanaliza todos los archivos sin usar la caché')
+    parser.add_argument(
+        '--format',
+        choices=OUTPUT_FORMATS,
+        default=os.getenv("COGNITIVE_OUTPUT_FORMAT") or None,
+        help='Formato de salida: json (lista) o jsonl (un registro por línea, en streaming)'
+    )
+    parser.add_argument(
+        '--hash-source',
+        choices=HASH_SOURCES,
+        default=os.getenv("COGNITIVE_HASH_SOURCE") or "redacted",
+        help='Origen del content_hash: texto redactado o bytes originales (raw, solo sin redacción)'
+    )
+    parser.add_argument(
+        '--lexicon',
+        default=os.getenv("COGNITIVE_LEXICON", ""),
+        help='Léxico JSON de etiquetas y sentimiento (por defecto: pipeline/lexicons/es.json)'
+    )
+    parser.add_argument(
+        '--trace-file',
+        default=os.getenv("COGNITIVE_TRACE_FILE", ""),
+        help='Escribe las fases medidas de cada archivo como traza (Chrome trace o speedscope)'
+    )
+    parser.add_argument(
+        '--trace-format',
+        choices=TRACE_FORMATS,
+        default=os.getenv("COGNITIVE_TRACE_FORMAT") or "chrome",
+        help='Formato de --trace-file: chrome (chrome://tracing, Perfetto) o speedscope'
+    )
+    parser.add_argument(
+        '--metrics-file',
+        default=os.getenv("COGNITIVE_METRICS_FILE", ""),
+        help='Escribe las métricas de la ejecución en formato Prometheus (textfile collector) al terminar'
+    )
+    parser.add_argument(
+        '--metrics-port',
+        type=int,
+        default=int(os.getenv("COGNITIVE_METRICS_PORT", "0")),
+        help='Expone /metrics en 127.0.0.1:<puerto> mientras dura el análisis (0 = deshabilitado)'
+    )
+    parser.add_argument(
+        '--min-letter-ratio',
+        type=float,
+        default=float(os.getenv("COGNITIVE_MIN_LETTER_RATIO", str(DEFAULT_MIN_LETTER_RATIO))),
+        help='Proporción mínima de letras para analizar un texto como lenguaje natural (0 = sin filtro)'
+    )
+    parser.add_argument(
+        '--near-duplicates',
+        action='store_true',
+        default=os.getenv("COGNITIVE_NEAR_DUPLICATES", "").strip().lower() in {"1", "true", "yes"},
+        help='Agrupa los documentos casi idénticos (MinHash) y analiza solo un representante por grupo'
+    )
+    parser.add_argument(
+        '--near-duplicate-threshold',
+        type=float,
+        default=float(os.getenv("COGNITIVE_NEAR_DUPLICATE_THRESHOLD", str(DEFAULT_NEAR_DUPLICATE_THRESHOLD))),
+        help='Similitud de Jaccard mínima entre un documento y su representante'
+    )
+    parser.add_argument(
+        '--profile-startup',
+        action='store_true',
+        help='Mide las fases de arranque (importaciones, léxico, modelos), imprime un informe JSON y termina'
+    )
     parser.add_argument('--verbose', '-v', action='store_true', help='Mostrar logs detallados')
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
 
     # Ajustar nivel de logging según flag verbose
     verbose_env = os.getenv("COGNITIVE_VERBOSE", "").strip().lower() in {"1", "true", "yes"}
@@ -663,49 +2543,116 @@ def main() -> None:
     else:
         logger.setLevel(logging.WARNING)
 
-    env = normalize_env(os.getenv("COGNITIVE_ENV", "dev"))
-    force_redact = os.getenv("COGNITIVE_REDACT", "0").strip().lower() in {"1", "true", "yes"}
+    env, force_redact, hash_salt = redaction_settings(redaction)
     redact_enabled = env == "prod" or force_redact
-    hash_salt = os.getenv("COGNITIVE_HASH_SALT", "")
     audit_path = Path(os.getenv("COGNITIVE_AUDIT_LOG", "outputs/audit/analysis.jsonl"))
     redaction_mode = "env_prod" if env == "prod" else ("forced" if force_redact else "disabled")
 
     if env == "prod" and not hash_salt:
         logger.warning("COGNITIVE_HASH_SALT no definido; los IDs se hashearán sin salt.")
 
+    hash_source = args.hash_source
+    if hash_source == "raw" and redact_enabled:
+        logger.warning("--hash-source raw no se permite con redacción habilitada; se usa el texto redactado.")
+        hash_source = "redacted"
+
+    lexicon_path = Path(args.lexicon) if args.lexicon else DEFAULT_LEXICON_PATH
+    if args.profile_startup:
+        report = profile_startup(lexicon_path)
+        print(json.dumps(report, indent=2))
+        return report
+    keyword_index = set_keyword_index(lexicon_path)
+
     input_dir = Path(args.input)
-    output_file = Path(args.output)
+    output_file, output_format = resolve_output_format(Path(args.output), args.format)
 
     # Validar que el directorio de entrada existe
     if not input_dir.exists():
         logger.error(f"Directorio de entrada no existe: {input_dir}")
         raise FileNotFoundError(f"Directorio no encontrado: {input_dir}")
 
+    workers = max(1, args.workers)
+    sentiment_options: Dict[str, Any] = {"mode": args.sentiment_mode}
+    if args.sentiment_mode == "segments":
+        sentiment_options["aggregation"] = args.sentiment_aggregation
+        sentiment_options["max_segments"] = max(1, args.sentiment_max_segments)
+    cache_path: Optional[Path] = None
+    if not args.no_cache:
+        cache_root = Path(args.cache_dir) if args.cache_dir else (
+            output_file.parent.parent / "cache" / "analysis"
+        )
+        cache_path = cache_root / AnalysisCache.namespace(input_dir)
+
+    trace_context = build_trace_context(env)
+    run_id = trace_context["run_id"]
+    actor = trace_context["actor"]
+
     # Cargar modelos de PLN
+    metrics_server: Optional[Any] = None
+    if args.metrics_port:
+        metrics_server = telemetry.start_http_server(args.metrics_port)
+        print(f"📈 Métricas en http://{telemetry.DEFAULT_HOST}:{args.metrics_port}/metrics")
+
     print("🧠 Inicializando modelos de PLN...")
-    nlp_model = load_spacy_model()
-    sentiment_classifier = load_sentiment_classifier()
+    nlp_model = None
+    sentiment_classifier = None
+    pool: Optional[Any] = None
+    model_load_started = time.perf_counter()
+    if workers > 1:
+        # Con --workers los modelos se cargan una vez en cada worker, no en este proceso
+        pool = create_worker_pool(workers, {
+            "redact": redact_enabled,
+            "hash_salt": hash_salt,
+            "env": env,
+            "hash_source": hash_source,
+            "trace_context": trace_context,
+            "cache_path": str(cache_path) if cache_path is not None else "",
+            "lexicon_path": str(lexicon_path),
+            "chunk_chars": args.chunk_chars,
+            "sentiment_options": dict(sentiment_options, batch_size=args.sentiment_batch_size),
+            "sentiment_backend": args.sentiment_backend,
+            "spacy_profile": args.spacy_profile,
+            "min_letter_ratio": args.min_letter_ratio,
+        })
+        fingerprint = pool.submit(worker_fingerprint).result()
+        spacy_components = pool.submit(worker_spacy_components).result()
+    else:
+        if models is not None:
+            nlp_model, sentiment_classifier = models
+        else:
+            nlp_model = load_spacy_model(args.spacy_profile)
+            sentiment_classifier = load_sentiment_classifier(args.sentiment_backend)
+        fingerprint = pipeline_fingerprint(
+            nlp_model,
+            sentiment_classifier,
+            redact_enabled,
+            hash_salt,
+            env,
+            hash_source,
+            args.chunk_chars,
+            sentiment_options
+        )
+        spacy_components = list(getattr(nlp_model, "pipe_names", []) or [])
+    # Con modelos residentes (servicio) no hay carga que medir
+    model_load_ms = round((time.perf_counter() - model_load_started) * 1000, 1) if models is None else None
 
     if redact_enabled:
         print(f"🔒 Redacción habilitada (env={env}, modo={redaction_mode})")
 
-    results: List[Dict[str, Any]] = []
+    cache: Optional[AnalysisCache] = None
+    if cache_path is not None:
+        cache = AnalysisCache(cache_path, fingerprint)
+        cache.load()
+
     file_count = 0
     error_count = 0
     error_files: List[str] = []
-    run_id = str(uuid.uuid4())
+    skipped_count = 0
+    skipped_files: List[str] = []
+    near_duplicate_count = 0
+    redaction_counts: Dict[str, int] = {}
+    timer = StageTimer(record_events=bool(args.trace_file))
     start_time = time.time()
-    actor = os.getenv("USER") or os.getenv("USERNAME") or "unknown"
-    git_commit = os.getenv("GIT_COMMIT") or os.getenv("GITHUB_SHA") or ""
-    git_ref = os.getenv("GIT_BRANCH") or os.getenv("GITHUB_REF_NAME") or ""
-    trace_context = {
-        "run_id": run_id,
-        "actor": actor,
-        "env": env,
-        "git_commit": git_commit,
-        "git_ref": git_ref,
-        "schema_version": "1.0",
-    }
 
     write_audit_event(
         {
@@ -718,43 +2665,230 @@ def main() -> None:
             "redaction_mode": redaction_mode,
             "input_dir": str(input_dir),
             "output_file": str(output_file),
+            "output_format": output_format,
+            "batch_size": args.batch_size,
+            "n_process": args.n_process,
+            "sentiment_batch_size": args.sentiment_batch_size,
+            "sentiment": sentiment_options,
+            "sentiment_backend": args.sentiment_backend,
+            "spacy_profile": args.spacy_profile,
+            "spacy_components": spacy_components,
+            "cache_enabled": cache is not None,
+            "hash_source": hash_source,
+            "workers": workers,
+            "chunk_chars": args.chunk_chars,
+            "lexicon": keyword_index.source,
+            **({"model_load_ms": model_load_ms} if model_load_ms is not None else {}),
         },
         audit_path
     )
 
+    def file_label(p: Path) -> str:
+        return f"file_{hash_identifier(p.name, hash_salt)}" if redact_enabled else p.name
+
+    store_sources = load_raw_store(input_dir)
+
+    def with_sources(p: Path, record: Dict[str, Any]) -> Dict[str, Any]:
+        """Añade las fuentes de un objeto del almacén por contenido (fuera de la caché: pueden cambiar)."""
+        if store_sources is None:
+            return record
+        sources = store_sources.get(p, [])
+        record = dict(record)
+        if redact_enabled:
+            record["sources"] = [f"file_{hash_identifier(Path(source).name, hash_salt)}" for source in sources]
+        else:
+            record["sources"] = sources
+            if sources:
+                record["title"] = Path(sources[0]).stem
+        return record
+
+    def record_error(p: Path, error: Any) -> None:
+        nonlocal error_count
+        logger.error(f"Error procesando {p}: {error}")
+        error_count += 1
+        error_files.append(file_label(p))
+        timer.pop_file(str(p))
+        print(f"  ✗ {p.name} (error)")
+
+    duplicates: Dict[Path, Tuple[Path, float]] = {}
+    if args.near_duplicates:
+        print("🧬 Buscando documentos casi duplicados...")
+        with timer.stage("dedup"):
+            duplicates = find_near_duplicates(
+                iter_input_files(input_dir), args.near_duplicate_threshold, args.min_letter_ratio
+            )
+    representatives = {representative for representative, _, _ in duplicates.values()}
+    representative_records: Dict[Path, Dict[str, Any]] = {}
+
+    def analysis_inputs() -> Iterator[Path]:
+        return (p for p in iter_input_files(input_dir) if p not in duplicates)
+
+    def emit(p: Path, record: Dict[str, Any]) -> None:
+        writer.write(with_sources(p, record))
+        if p in representatives:
+            representative_records[p] = record
+
+    def record_skip(p: Path, reason: str) -> None:
+        nonlocal skipped_count
+        logger.debug(f"Contenido no lingüístico ({reason}): {p}")
+        skipped_count += 1
+        skipped_files.append(file_label(p))
+        timer.pop_file(str(p))
+        print(f"  ⤼ {p.name} (omitido: {reason})")
+
+    def record_file_timings(p: Path) -> None:
+        write_audit_event(
+            {
+                "event": "analysis_file",
+                "timestamp": now_iso(),
+                "run_id": run_id,
+                "file": file_label(p),
+                "stages_ms": timer.pop_file(str(p)),
+            },
+            audit_path
+        )
+
+    def add_redaction_counts(counts: Dict[str, int]) -> None:
+        for name, count in counts.items():
+            redaction_counts[name] = redaction_counts.get(name, 0) + count
+
+    def analyze_paths(file_paths: Iterable[Path]) -> None:
+        """Analiza `file_paths` con el pool o en este proceso y escribe sus registros."""
+        nonlocal file_count
+        if pool is not None:
+            # Los resultados llegan en el orden de entrada, sea cual sea el worker que los produjo
+            for result in iter_parallel_results(pool, list(file_paths), workers):
+                p = result["path"]
+                timer.merge(result["stage_events"])
+                if cache is not None and result["cached"] is not None:
+                    cache.track(p, result["cached"], keep=result["record"] is not None)
+                if result["error"] is not None:
+                    record_error(p, result["error"])
+                    continue
+                if result["skipped"]:
+                    record_skip(p, result["skipped"])
+                    continue
+                if result["cached"]:
+                    with timer.stage("serialization", str(p)):
+                        emit(p, refresh_trace(result["record"], trace_context))
+                    timer.pop_file(str(p))
+                    print(f"  ✓ {p.name} (caché)")
+                else:
+                    with timer.stage("serialization", str(p)):
+                        emit(p, result["record"])
+                    add_redaction_counts(result["redaction_counts"])
+                    record_file_timings(p)
+                    print(f"  ✓ {p.name}")
+                file_count += 1
+        else:
+            docs = iter_docs(
+                file_paths,
+                nlp_model,
+                batch_size=args.batch_size,
+                n_process=args.n_process,
+                lookup=cache.get if cache is not None else None,
+                chunk_chars=args.chunk_chars,
+                timer=timer,
+                min_letter_ratio=args.min_letter_ratio
+            )
+            for batch in iter_batches(docs, args.batch_size):
+                # El sentimiento se calcula en una sola llamada por lote de documentos
+                pending = [
+                    item for item in batch
+                    if item["error"] is None and item["cached"] is None and not item["skipped"]
+                ]
+                with timer.stage("sentiment"):
+                    sentiments = iter(classify_sentiment_batch(
+                        [item["text"] for item in pending],
+                        sentiment_classifier,
+                        batch_size=args.sentiment_batch_size,
+                        **sentiment_options
+                    ))
+                for item in batch:
+                    p = item["path"]
+                    try:
+                        if item["error"] is not None:
+                            raise item["error"]
+                        if item["skipped"]:
+                            record_skip(p, item["skipped"])
+                            continue
+                        if item["cached"] is not None:
+                            logger.debug(f"Reutilizado desde caché: {p}")
+                            with timer.stage("serialization"):
+                                emit(p, refresh_trace(item["cached"], trace_context))
+                            timer.pop_file(str(p))
+                            file_count += 1
+                            print(f"  ✓ {p.name} (caché)")
+                            continue
+                        logger.debug(f"Procesando: {p}")
+                        with timer.stage("redaction", str(p)):
+                            redaction = DocumentRedaction(item["text"], item["doc"])
+                        record = build_record(
+                            p,
+                            item["text"],
+                            item["doc"],
+                            sentiment_classifier,
+                            redact_enabled,
+                            hash_salt,
+                            env,
+                            trace_context,
+                            sentiment=next(sentiments),
+                            content_sha=item["sha256"],
+                            hash_source=hash_source,
+                            redaction=redaction,
+                            timer=timer
+                        )
+                        with timer.stage("serialization", str(p)):
+                            if cache is not None:
+                                cache.put(p, item["sha256"], record)
+                            emit(p, record)
+                        add_redaction_counts(redaction.counts)
+                        record_file_timings(p)
+                        file_count += 1
+                        print(f"  ✓ {p.name}")
+                    except Exception as e:
+                        record_error(p, e)
+                        continue
+
     # Procesar archivos de texto
     print(f"📂 Procesando archivos en {input_dir}...")
-    for p in input_dir.rglob('*'):
-        if p.is_file() and p.suffix.lower() in {'.txt', '.json', '.md'}:
-            try:
-                logger.debug(f"Procesando: {p}")
-                results.append(
-                    generate_record(
+    # Los registros se escriben en cuanto se generan para no acumular el corpus en memoria
+    with RecordWriter(output_file, output_format) as writer, (pool if pool is not None else nullcontext()):
+        analyze_paths(analysis_inputs())
+
+        # Los casi duplicados reciben el análisis de su representante, ya escrito arriba. Si el
+        # representante falló, su grupo se vuelve a agrupar: el siguiente miembro se analiza como
+        # nuevo representante y solo los cercanos a uno analizado con éxito se marcan como duplicados
+        while duplicates:
+            orphans = [
+                p for p, (representative, _, _) in duplicates.items() if representative not in representative_records
+            ]
+            for p, (representative, similarity, facts) in duplicates.items():
+                if representative not in representative_records:
+                    continue
+                with timer.stage("serialization", str(p)):
+                    emit(p, duplicate_record(
+                        representative_records[representative],
                         p,
-                        nlp_model,
-                        sentiment_classifier,
+                        similarity,
+                        facts,
                         redact_enabled,
                         hash_salt,
-                        env,
-                        trace_context
-                    )
-                )
+                        hash_source
+                    ))
+                timer.pop_file(str(p))
+                near_duplicate_count += 1
                 file_count += 1
-                print(f"  ✓ {p.name}")
-            except Exception as e:
-                logger.error(f"Error procesando {p}: {e}")
-                error_count += 1
-                if redact_enabled:
-                    error_files.append(f"file_{hash_identifier(p.name, hash_salt)}")
-                else:
-                    error_files.append(p.name)
-                print(f"  ✗ {p.name} (error)")
-                continue
+                print(f"  ≈ {p.name} (casi duplicado de {representative.name}, {similarity:.2f})")
+            if not orphans:
+                break
+            with timer.stage("dedup"):
+                duplicates = find_near_duplicates(orphans, args.near_duplicate_threshold, args.min_letter_ratio)
+            representatives.update(representative for representative, _, _ in duplicates.values())
+            analyze_paths([p for p in orphans if p not in duplicates])
 
-    # Guardar resultados
-    output_file.parent.mkdir(parents=True, exist_ok=True)
-    with output_file.open('w', encoding='utf-8') as f:
-        json.dump(results, f, indent=2, ensure_ascii=False)
+    if cache is not None:
+        cache.save()
 
     duration_ms = int((time.time() - start_time) * 1000)
     write_audit_event(
@@ -769,21 +2903,62 @@ def main() -> None:
             "file_count": file_count,
             "error_count": error_count,
             "error_files": error_files,
+            "skipped_count": skipped_count,
+            "skipped_files": skipped_files,
+            "near_duplicate_count": near_duplicate_count,
             "duration_ms": duration_ms,
+            "cache_hits": cache.hits if cache is not None else 0,
+            "cache_misses": cache.misses if cache is not None else 0,
+            "redaction_counts": redaction_counts,
+            "stages_ms": timer.summary(),
             "output_file": str(output_file),
         },
         audit_path
     )
+    if args.trace_file:
+        try:
+            timer.write_trace(Path(args.trace_file), args.trace_format)
+        except OSError as e:
+            logger.warning(f"No se pudo escribir la traza {args.trace_file}: {e}")
+    if args.metrics_file:
+        try:
+            telemetry.REGISTRY.write_textfile(Path(args.metrics_file))
+        except OSError as e:
+            logger.warning(f"No se pudo escribir las métricas {args.metrics_file}: {e}")
+    if metrics_server is not None:
+        telemetry.stop_http_server(metrics_server)
 
     # Resumen final
     print("\n" + "="*60)
     print(f"✅ Análisis completado")
     print(f"   📊 Archivos procesados: {file_count}")
+    if cache is not None and cache.hits:
+        print(f"   ♻️  Reutilizados desde caché: {cache.hits}")
+    if near_duplicate_count > 0:
+        print(f"   ≈  Casi duplicados (sin reanalizar): {near_duplicate_count}")
+    if skipped_count > 0:
+        print(f"   ⤼  Omitidos (no lingüísticos): {skipped_count}")
     if error_count > 0:
         print(f"   ⚠️  Errores: {error_count}")
     print(f"   💾 Resultados: {output_file.absolute()}")
     print("="*60)
 
+    return {
+        "run_id": run_id,
+        "file_count": file_count,
+        "error_count": error_count,
+        "error_files": error_files,
+        "skipped_count": skipped_count,
+        "near_duplicate_count": near_duplicate_count,
+        "cache_hits": cache.hits if cache is not None else 0,
+        "duration_ms": duration_ms,
+        "stages_ms": timer.summary(),
+        "output_file": str(output_file),
+    }
+
+
+MODULE_IMPORT_MS = round((time.perf_counter() - _IMPORT_STARTED) * 1000, 1)
+
 
 if __name__ == '__main__':
     main()
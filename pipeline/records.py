@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+pipeline/records.py
+-------------------
+
+Lectura de los resultados del análisis (`analysis.json` o
+`analysis.jsonl`), compartida por `cogctl.py`, las interfaces de
+`frontend/` y los verificadores de `scripts/verify/`. Solo usa la
+biblioteca estándar, de modo que puede copiarse junto a la interfaz en su
+imagen Docker igual que `telemetry.py`.
+
+Las interfaces cargan como mucho `COGNITIVE_UI_MAX_RECORDS` registros
+(`DEFAULT_UI_MAX_RECORDS` por defecto, 0 sin límite) con `read_records`.
+"""
+
+import itertools
+import json
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+DEFAULT_UI_MAX_RECORDS = 5000
+
+
+def resolve_analysis_path(insights_dir: Path) -> Path:
+    """Devuelve `analysis.json` o `analysis.jsonl`; si existen ambos, el más reciente."""
+    candidates = [
+        p for p in (insights_dir / "analysis.json", insights_dir / "analysis.jsonl") if p.exists()
+    ]
+    if not candidates:
+        return insights_dir / "analysis.json"
+    return max(candidates, key=lambda p: p.stat().st_mtime)
+
+
+def iter_records(path: Path) -> Iterator[Dict[str, Any]]:
+    """Itera los registros de análisis de un archivo JSON (lista) o JSON Lines.
+
+    En formato `.jsonl` los registros se leen línea a línea, sin cargar el
+    archivo completo en memoria.
+    """
+    if path.suffix.lower() == ".jsonl":
+        with path.open("r", encoding="utf-8") as handle:
+            for line in handle:
+                if line.strip():
+                    yield json.loads(line)
+    else:
+        yield from json.loads(path.read_text(encoding="utf-8"))
+
+
+def read_records(path: Path, limit: Optional[int] = None) -> Tuple[List[Dict[str, Any]], bool]:
+    """Lee como mucho `limit` registros e indica si el archivo tiene más.
+
+    En `.jsonl` la lectura se detiene al alcanzar el límite; un `.json` (lista)
+    se parsea completo y solo se descartan los registros sobrantes.
+    """
+    records_iter = iter_records(path)
+    try:
+        records = list(itertools.islice(records_iter, limit + 1 if limit else None))
+    finally:
+        records_iter.close()
+    if limit and len(records) > limit:
+        return records[:limit], True
+    return records, False
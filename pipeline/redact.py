@@ -6,13 +6,15 @@ pipeline/redact.py
 
 Script de redacción para el Lab 02.
 Este script actúa como un wrapper sobre analyze.py pero forzando
-el modo de redacción para proteger la soberanía de los datos.
+el modo de redacción para proteger la soberanía de los datos. El
+análisis se ejecuta en el mismo proceso (sin lanzar otro intérprete),
+por lo que spaCy y transformers solo se importan si hay que cargarlos.
 """
 
 import os
 import sys
 import argparse
-import subprocess
+import importlib.util
 from pathlib import Path
 
 def main():
@@ -31,11 +33,10 @@ def main():
     print("🛡️ Activando Escudo de Privacidad (Soberanía de Datos)...")
 
     # Configurar el entorno para forzar la redacción
-    env = os.environ.copy()
-    env["COGNITIVE_REDACT"] = "1"
-    env["COGNITIVE_ENV"] = "prod"
-    if "COGNITIVE_HASH_SALT" not in env:
-        env["COGNITIVE_HASH_SALT"] = "lab_secret_salt_2026"
+    os.environ["COGNITIVE_REDACT"] = "1"
+    os.environ["COGNITIVE_ENV"] = "prod"
+    if "COGNITIVE_HASH_SALT" not in os.environ:
+        os.environ["COGNITIVE_HASH_SALT"] = "lab_secret_salt_2026"
 
     # Determinar la ruta a analyze.py
     base_dir = Path(__file__).resolve().parent
@@ -45,28 +46,24 @@ def main():
         print(f"❌ Error: No se encuentra {analyze_script}")
         sys.exit(1)
 
-    # Verificar si spaCy está disponible en el entorno actual
-    try:
-        import spacy
-    except ImportError:
+    # Verificar si spaCy está disponible en el entorno actual (sin importarlo)
+    if importlib.util.find_spec("spacy") is None:
         print("⚠️ Advertencia: spaCy no está disponible en este entorno de Python.")
         print("💡 Consejo: Asegúrate de estar usando el entorno virtual (.venv)")
         print("   Ejecuta: .venv\\Scripts\\python.exe pipeline\\redact.py ...")
 
-    # Ejecutar el pipeline de análisis con redacción forzada
+    # Ejecutar el pipeline de análisis con redacción forzada en este mismo proceso
+    sys.path.insert(0, str(base_dir))
+    import analyze
+
     try:
-        subprocess.run([
-            sys.executable,
-            str(analyze_script),
-            '--input', args.input,
-            '--output', str(output_file)
-        ], env=env, check=True)
+        analyze.main(['--input', args.input, '--output', str(output_file)])
 
         print(f"\n✅ Redacción completada con éxito.")
         print(f"🔒 Los datos sensibles han sido enmascarados.")
         print(f"💾 Archivo seguro generado en: {output_file.absolute()}")
 
-    except subprocess.CalledProcessError as e:
+    except Exception as e:
         print(f"❌ Error durante el proceso de redacción: {e}")
         sys.exit(1)
 
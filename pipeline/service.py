@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+pipeline/service.py
+-------------------
+
+Servicio de análisis persistente. Carga los modelos de spaCy y de
+sentimiento una sola vez y los mantiene en memoria, de modo que cada
+análisis posterior se ahorra los segundos de arranque de `analyze.py`.
+Expone una pequeña API JSON por HTTP, escuchando solo en `127.0.0.1`
+por defecto:
+
+* `GET  /health`  → estado del servicio y modelos cargados.
+* `GET  /metrics` → métricas en formato de texto de Prometheus
+  (ver `telemetry.py`).
+* `POST /analyze` → analiza documentos sueltos y devuelve los registros
+  con la forma de `schemas/insight.schema.json`. Cuerpo:
+  `{"documents": [{"name": "nota.txt", "text": "..."}], "paths": ["raw/a.txt"],
+  "sentiment": {"mode": "segments", "aggregation": "worst"}}`.
+* `POST /jobs`    → ejecuta el análisis completo de un directorio (igual
+  que `analyze.py`, con caché, auditoría y archivo de salida). Cuerpo:
+  `{"input": "raw", "output": "insights/analysis.json",
+  "format": "jsonl", "no_cache": false, "workers": 1}`.
+
+El servicio no tiene autenticación: escucha en `127.0.0.1` y solo lee y
+escribe bajo `--data-root` (`COGNITIVE_SERVICE_DATA_ROOT`, por defecto
+`outputs`). Las rutas relativas de las peticiones se resuelven contra esa
+raíz y cualquier ruta que quede fuera se rechaza con `403`.
+
+La redacción, el salt y el entorno se toman de las mismas variables
+`COGNITIVE_*` que `analyze.py`. Un cliente puede enviar las suyas en el
+campo `"redaction"` de `/analyze` y `/jobs` (`{"COGNITIVE_ENV": "prod",
+"COGNITIVE_REDACT": "1", "COGNITIVE_HASH_SALT": "..."}`) para reforzar
+la redacción de esa petición, nunca para relajarla (ver
+`analyze.redaction_settings`); `cogctl analyze` envía las que tenga
+definidas. Los análisis se serializan con un cerrojo
+porque los modelos no son seguros entre hilos; `/health` responde aunque
+haya un análisis en curso.
+
+Uso:
+
+```
+python pipeline/service.py --port 8765
+python cogctl.py analyze   # usa el servicio si está levantado
+```
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import analyze  # noqa: E402
+import telemetry  # noqa: E402
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_DATA_ROOT = "outputs"
+# Tamaño máximo del cuerpo de una petición (documentos en línea)
+MAX_REQUEST_BYTES = 64 * 1024 * 1024
+
+
+class DataPathError(ValueError):
+    """Ruta de una petición fuera del directorio de datos del servicio."""
+
+
+class AnalysisService:
+    """Mantiene los modelos cargados y atiende trabajos de análisis."""
+
+    def __init__(self, lexicon: str = "", spacy_profile: str = "", data_root: str = DEFAULT_DATA_ROOT) -> None:
+        self.data_root = Path(data_root).resolve()
+        self.lexicon_path = Path(lexicon) if lexicon else analyze.DEFAULT_LEXICON_PATH
+        self.spacy_profile = analyze.resolve_spacy_profile(spacy_profile)
+        analyze.set_keyword_index(self.lexicon_path)
+        start = time.perf_counter()
+        self.nlp_model = analyze.load_spacy_model(self.spacy_profile)
+        self.sentiment_classifier = analyze.load_sentiment_classifier()
+        self.load_ms = round((time.perf_counter() - start) * 1000, 1)
+        telemetry.MODEL_LOAD_SECONDS.set(self.load_ms / 1000)
+        self.started_at = time.time()
+        self.jobs = 0
+        self.lock = threading.Lock()
+
+    def health(self) -> Dict[str, Any]:
+        return {
+            "status": "ok",
+            "spacy_model": analyze.spacy_model_id(self.nlp_model),
+            "spacy_profile": self.spacy_profile,
+            "spacy_components": list(getattr(self.nlp_model, "pipe_names", []) or []),
+            "sentiment_model": analyze.sentiment_model_id(self.sentiment_classifier),
+            "lexicon": str(self.lexicon_path),
+            "data_root": str(self.data_root),
+            "model_load_ms": self.load_ms,
+            "uptime_s": round(time.time() - self.started_at, 1),
+            "jobs": self.jobs,
+            "busy": self.lock.locked(),
+        }
+
+    def data_path(self, raw_path: Any) -> Path:
+        """Resuelve una ruta de la petición contra `data_root`; rechaza las que quedan fuera."""
+        path = (self.data_root / str(raw_path)).resolve()
+        if not path.is_relative_to(self.data_root):
+            raise DataPathError(f"Ruta fuera del directorio de datos del servicio: {raw_path}")
+        return path
+
+    def analyze_documents(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Analiza documentos en línea y rutas sueltas; devuelve registros y errores."""
+        items: List[Dict[str, Any]] = []
+        errors: List[Dict[str, str]] = []
+        for index, document in enumerate(payload.get("documents") or []):
+            name = str(document.get("name") or f"documento_{index}.txt")
+            text = str(document.get("text") or "")
+            items.append({
+                "path": Path(name),
+                "text": text,
+                "sha256": analyze.hashlib.sha256(text.encode("utf-8")).hexdigest(),
+            })
+        for raw_path in payload.get("paths") or []:
+            path = Path(raw_path)
+            try:
+                path = self.data_path(raw_path)
+                text, content_sha = analyze.read_input(path)
+            except Exception as e:
+                errors.append({"path": str(path), "error": str(e)})
+                continue
+            items.append({"path": path, "text": text, "sha256": content_sha})
+
+        env, force_redact, hash_salt = analyze.redaction_settings(payload.get("redaction"))
+        redact_enabled = env == "prod" or force_redact
+        hash_source = payload.get("hash_source") or os.getenv("COGNITIVE_HASH_SOURCE") or "redacted"
+        if redact_enabled:
+            hash_source = "redacted"
+        trace_context = analyze.build_trace_context(env)
+
+        records: List[Dict[str, Any]] = []
+        with self.lock:
+            self.jobs += 1
+            docs: List[Optional[Any]] = [None] * len(items)
+            if self.nlp_model is not None:
+                for index, item in enumerate(items):
+                    try:
+                        docs[index] = analyze.process_text(self.nlp_model, item["text"])
+                    except Exception as e:
+                        logger.warning(f"Error al procesar con spaCy para {item['path']}: {e}")
+            sentiment_options = {
+                key: value for key, value in (payload.get("sentiment") or {}).items()
+                if key in {"mode", "aggregation", "max_segments"}
+            }
+            sentiments = analyze.classify_sentiment_batch(
+                [item["text"] for item in items], self.sentiment_classifier, **sentiment_options
+            )
+            for item, doc, sentiment in zip(items, docs, sentiments):
+                try:
+                    record = analyze.build_record(
+                        item["path"],
+                        item["text"],
+                        doc,
+                        self.sentiment_classifier,
+                        redact_enabled,
+                        hash_salt,
+                        env,
+                        trace_context,
+                        sentiment=sentiment,
+                        content_sha=item["sha256"],
+                        hash_source=hash_source
+                    )
+                except Exception as e:
+                    telemetry.DOCUMENTS.inc(status="error")
+                    errors.append({"path": str(item["path"]), "error": str(e)})
+                    continue
+                telemetry.DOCUMENTS.inc(status="analyzed")
+                records.append(record)
+        return {"run_id": trace_context["run_id"], "records": records, "errors": errors}
+
+    def run_job(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Ejecuta `analyze.main` sobre un directorio reutilizando los modelos residentes."""
+        argv = [
+            "--input", str(self.data_path(payload.get("input") or "raw")),
+            "--output", str(self.data_path(payload.get("output") or "insights/analysis.json")),
+            "--lexicon", str(self.lexicon_path),
+            "--spacy-profile", self.spacy_profile,
+        ]
+        if payload.get("format"):
+            argv += ["--format", str(payload["format"])]
+        if payload.get("no_cache"):
+            argv.append("--no-cache")
+        if payload.get("workers"):
+            argv += ["--workers", str(int(payload["workers"]))]
+        with self.lock:
+            self.jobs += 1
+            return analyze.main(
+                argv,
+                models=(self.nlp_model, self.sentiment_classifier),
+                redaction=payload.get("redaction")
+            )
+
+
+class ServiceHandler(BaseHTTPRequestHandler):
+    """Traduce las peticiones HTTP a llamadas de `AnalysisService`."""
+
+    server_version = "CognitiveAnalysis/1"
+
+    @property
+    def service(self) -> AnalysisService:
+        return self.server.service  # type: ignore[attr-defined]
+
+    def _send(self, status: int, body: Dict[str, Any]) -> None:
+        self._send_bytes(status, json.dumps(body, ensure_ascii=False).encode("utf-8"), "application/json; charset=utf-8")
+
+    def _send_bytes(self, status: int, data: bytes, content_type: str) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self) -> None:
+        if self.path == "/health":
+            self._send(200, self.service.health())
+        elif self.path == "/metrics":
+            self._send_bytes(200, telemetry.REGISTRY.render().encode("utf-8"), telemetry.CONTENT_TYPE)
+        else:
+            self._send(404, {"error": f"Ruta no encontrada: {self.path}"})
+
+    def do_POST(self) -> None:
+        handlers = {"/analyze": self.service.analyze_documents, "/jobs": self.service.run_job}
+        handler = handlers.get(self.path)
+        if handler is None:
+            self._send(404, {"error": f"Ruta no encontrada: {self.path}"})
+            return
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_REQUEST_BYTES:
+            self._send(413, {"error": "Petición demasiado grande"})
+            return
+        try:
+            payload = json.loads(self.rfile.read(length) or b"{}")
+            if not isinstance(payload, dict):
+                raise ValueError("El cuerpo debe ser un objeto JSON")
+        except ValueError as e:
+            self._send(400, {"error": f"JSON no válido: {e}"})
+            return
+        try:
+            self._send(200, handler(payload))
+        except DataPathError as e:
+            self._send(403, {"error": str(e)})
+        except Exception as e:
+            logger.error(f"Error en {self.path}: {e}")
+            self._send(500, {"error": str(e)})
+
+    def log_message(self, format: str, *args: Any) -> None:
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+
+def create_server(host: str, port: int, service: AnalysisService) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer((host, port), ServiceHandler)
+    server.service = service  # type: ignore[attr-defined]
+    return server
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Servicio de análisis con modelos residentes')
+    parser.add_argument('--host', default=os.getenv("COGNITIVE_SERVICE_HOST", DEFAULT_HOST), help='Interfaz de escucha')
+    parser.add_argument(
+        '--port',
+        type=int,
+        default=int(os.getenv("COGNITIVE_SERVICE_PORT", str(DEFAULT_PORT))),
+        help='Puerto HTTP'
+    )
+    parser.add_argument('--lexicon', default=os.getenv("COGNITIVE_LEXICON", ""), help='Léxico JSON de etiquetas y sentimiento')
+    parser.add_argument(
+        '--data-root',
+        default=os.getenv("COGNITIVE_SERVICE_DATA_ROOT", DEFAULT_DATA_ROOT),
+        help='Único directorio que el servicio puede leer y escribir; las rutas de las peticiones se resuelven contra él'
+    )
+    parser.add_argument(
+        '--spacy-profile',
+        choices=tuple(analyze.SPACY_PROFILES),
+        default=analyze.resolve_spacy_profile(),
+        help='Componentes de spaCy a cargar (ver analyze.py --spacy-profile)'
+    )
+    args = parser.parse_args()
+
+    print("🧠 Cargando modelos de PLN...")
+    service = AnalysisService(args.lexicon, args.spacy_profile, args.data_root)
+    server = create_server(args.host, args.port, service)
+    print(f"🛰️  Servicio de análisis escuchando en http://{args.host}:{args.port} (modelos en {service.load_ms} ms)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
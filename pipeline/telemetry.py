@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+pipeline/telemetry.py
+---------------------
+
+Métricas de ejecución en el formato de texto de Prometheus, sin
+dependencias externas. Las métricas se derivan de los mismos eventos que
+se escriben en la auditoría (`write_audit_event` del análisis y de la
+interfaz), de modo que cada evento auditado actualiza también sus
+contadores e histogramas:
+
+* `analysis_start` → tiempo de carga de modelos.
+* `analysis_file`  → documentos analizados y latencia de cada fase.
+* `analysis_end`   → documentos en caché, casi duplicados, omitidos y con error, aciertos de caché,
+  redacciones por detector, tiempo total por fase y duración de la ejecución.
+* `ui_*`           → eventos de la interfaz por tipo y rol.
+
+Las métricas se exponen de dos formas:
+
+* `start_http_server(port)` sirve `GET /metrics` en `127.0.0.1`, para
+  procesos de larga duración (servicio de análisis, interfaz Streamlit).
+* `write_textfile(path)` vuelca el estado al final de una ejecución por
+  lotes, en el formato del *textfile collector* de node_exporter.
+"""
+
+import os
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+DEFAULT_HOST = "127.0.0.1"
+# Cubos en segundos: de fases de un documento (ms) a ejecuciones completas
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+
+LabelValues = Tuple[str, ...]
+
+
+def format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def escape_label(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def format_labels(names: Iterable[str], values: Iterable[str]) -> str:
+    pairs = [f'{name}="{escape_label(value)}"' for name, value in zip(names, values)]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Metric:
+    """Base de contadores, medidores e histogramas con etiquetas."""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labels: Iterable[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self.lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        if set(labels) != set(self.labels):
+            raise ValueError(f"{self.name} espera las etiquetas {self.labels}, recibió {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labels)
+
+    def samples(self) -> List[Tuple[str, str, float]]:
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for suffix, labels, value in self.samples():
+            lines.append(f"{self.name}{suffix}{labels} {format_value(value)}")
+        return lines
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labels: Iterable[str] = ()) -> None:
+        super().__init__(name, documentation, labels)
+        self.values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        if amount < 0:
+            raise ValueError("Un contador solo puede incrementarse")
+        key = self._key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0.0) + amount
+
+    def get(self, **labels: str) -> float:
+        return self.values.get(self._key(labels), 0.0)
+
+    def samples(self) -> List[Tuple[str, str, float]]:
+        with self.lock:
+            return [("", format_labels(self.labels, key), value) for key, value in sorted(self.values.items())]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self.lock:
+            self.values[key] = float(value)
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: Iterable[str] = (),
+        buckets: Iterable[float] = DEFAULT_BUCKETS
+    ) -> None:
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        self.values: Dict[LabelValues, Tuple[List[int], float]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self.lock:
+            counts, total = self.values.get(key) or ([0] * len(self.buckets), 0.0)
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[index] += 1
+            self.values[key] = (counts, total + value)
+
+    def count(self, **labels: str) -> int:
+        entry = self.values.get(self._key(labels))
+        return entry[0][-1] if entry else 0
+
+    def samples(self) -> List[Tuple[str, str, float]]:
+        samples: List[Tuple[str, str, float]] = []
+        with self.lock:
+            for key, (counts, total) in sorted(self.values.items()):
+                for bound, count in zip(self.buckets, counts):
+                    labels = format_labels(self.labels + ("le",), key + (format_value(bound),))
+                    samples.append(("_bucket", labels, count))
+                samples.append(("_sum", format_labels(self.labels, key), total))
+                samples.append(("_count", format_labels(self.labels, key), counts[-1]))
+        return samples
+
+
+class MetricsRegistry:
+    """Conjunto de métricas que se exponen juntas."""
+
+    def __init__(self) -> None:
+        self.metrics: Dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Any:
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labels: Iterable[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labels))
+
+    def gauge(self, name: str, documentation: str, labels: Iterable[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labels))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labels: Iterable[str] = (),
+        buckets: Iterable[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self.register(Histogram(name, documentation, labels, buckets))
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self.metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self, path: Any) -> None:
+        """Escribe las métricas con un renombrado atómico (lectores nunca ven un archivo a medias)."""
+        path = os.fspath(path)
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as handle:
+            handle.write(self.render())
+        os.replace(tmp_path, path)
+
+
+REGISTRY = MetricsRegistry()
+
+DOCUMENTS = REGISTRY.counter(
+    "cognitive_documents_processed_total", "Documentos procesados por el análisis", ("status",)
+)
+STAGE_SECONDS = REGISTRY.histogram(
+    "cognitive_stage_duration_seconds", "Latencia por documento de cada fase del análisis", ("stage",)
+)
+STAGE_SECONDS_TOTAL = REGISTRY.counter(
+    "cognitive_stage_seconds_total", "Tiempo acumulado de cada fase, incluidas las fases por lote", ("stage",)
+)
+REDACTIONS = REGISTRY.counter(
+    "cognitive_redactions_total", "Datos redactados por detector", ("detector",)
+)
+CACHE_LOOKUPS = REGISTRY.counter(
+    "cognitive_cache_lookups_total", "Consultas a la caché incremental de registros", ("result",)
+)
+CACHE_HIT_RATIO = REGISTRY.gauge(
+    "cognitive_cache_hit_ratio", "Proporción de aciertos de caché en la última ejecución"
+)
+MODEL_LOAD_SECONDS = REGISTRY.gauge(
+    "cognitive_model_load_seconds", "Tiempo de carga de los modelos de PLN en el último arranque"
+)
+RUN_SECONDS = REGISTRY.histogram(
+    "cognitive_analysis_run_duration_seconds", "Duración de cada ejecución completa del análisis"
+)
+UI_EVENTS = REGISTRY.counter(
+    "cognitive_ui_events_total", "Eventos auditados de la interfaz", ("event", "role")
+)
+UI_PAGE_LOAD_SECONDS = REGISTRY.histogram(
+    "cognitive_ui_page_load_seconds", "Tiempo de renderizado de cada página de la interfaz", ("page",)
+)
+
+
+def record_event(event: Dict[str, Any]) -> None:
+    """Actualiza las métricas a partir de un evento de auditoría."""
+    name = str(event.get("event", ""))
+    if name == "analysis_start":
+        if "model_load_ms" in event:
+            MODEL_LOAD_SECONDS.set(event["model_load_ms"] / 1000)
+    elif name == "analysis_file":
+        DOCUMENTS.inc(status="analyzed")
+        for stage, elapsed_ms in (event.get("stages_ms") or {}).items():
+            STAGE_SECONDS.observe(elapsed_ms / 1000, stage=stage)
+    elif name == "analysis_end":
+        hits = int(event.get("cache_hits") or 0)
+        misses = int(event.get("cache_misses") or 0)
+        DOCUMENTS.inc(hits, status="cached")
+        DOCUMENTS.inc(int(event.get("error_count") or 0), status="error")
+        DOCUMENTS.inc(int(event.get("skipped_count") or 0), status="skipped")
+        DOCUMENTS.inc(int(event.get("near_duplicate_count") or 0), status="duplicate")
+        CACHE_LOOKUPS.inc(hits, result="hit")
+        CACHE_LOOKUPS.inc(misses, result="miss")
+        if hits + misses:
+            CACHE_HIT_RATIO.set(hits / (hits + misses))
+        for detector, count in (event.get("redaction_counts") or {}).items():
+            REDACTIONS.inc(count, detector=detector)
+        for stage, elapsed_ms in (event.get("stages_ms") or {}).items():
+            STAGE_SECONDS_TOTAL.inc(elapsed_ms / 1000, stage=stage)
+        if "duration_ms" in event:
+            RUN_SECONDS.observe(event["duration_ms"] / 1000)
+    elif name.startswith("ui_"):
+        UI_EVENTS.inc(event=name, role=str(event.get("role", "")))
+
+
+_SERVERS: Dict[Tuple[str, int], Any] = {}
+
+
+def start_http_server(port: int, host: str = DEFAULT_HOST, registry: Optional[MetricsRegistry] = None) -> Any:
+    """Sirve `GET /metrics` en un hilo en segundo plano; una sola vez por dirección.
+
+    Streamlit vuelve a ejecutar el script en cada interacción, así que las
+    llamadas repetidas con la misma dirección devuelven el servidor ya creado.
+    """
+    if (host, port) in _SERVERS:
+        return _SERVERS[(host, port)]
+    # Importación diferida: el análisis por lotes no necesita http.server
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    source = registry or REGISTRY
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            data = source.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format: str, *args: Any) -> None:
+            pass
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    thread = threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True)
+    thread.start()
+    _SERVERS[(host, port)] = server
+    return server
+
+
+def stop_http_server(server: Any) -> None:
+    """Detiene un servidor creado con `start_http_server`."""
+    server.shutdown()
+    server.server_close()
+    for address, running in list(_SERVERS.items()):
+        if running is server:
+            del _SERVERS[address]
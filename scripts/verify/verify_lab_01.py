@@ -5,7 +5,6 @@ Validator for Lab 01: Deep Dive.
 Checks if the security pipeline was correctly executed with redaction enabled.
 """
 
-import json
 import sys
 from pathlib import Path
 
@@ -14,22 +13,32 @@ if sys.platform == "win32":
     import io
     sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
 
+ROOT_DIR = Path(__file__).resolve().parents[2]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.append(str(ROOT_DIR))
+
+from pipeline.records import iter_records, resolve_analysis_path  # noqa: E402
+
+
 def verify():
-    analysis_file = Path("outputs/insights/analysis.json")
+    analysis_file = resolve_analysis_path(Path("outputs/insights"))
     audit_file = Path("outputs/audit/analysis.jsonl")
 
     if not analysis_file.exists():
         return False, "Evidencia ausente: No se encontró el archivo analysis.json. Ejecuta el pipeline primero."
 
     try:
-        data = json.loads(analysis_file.read_text(encoding="utf-8"))
-        if not data:
+        total = 0
+        count = 0
+        for rec in iter_records(analysis_file):
+            total += 1
+            if rec.get("redacted"):
+                count += 1
+        if not total:
             return False, "Evidencia inválida: El archivo de análisis está vacío."
 
         # Check for redaction (Lab 01 core requirement)
-        v = any(rec.get("redacted") for rec in data)
-        if v:
-            count = sum(1 for rec in data if rec.get("redacted"))
+        if count:
             # Audit trail check (optional but recommended for Phase 2)
             if not audit_file.exists():
                 return False, "Fallo de auditoría: No se encontró outputs/audit/analysis.jsonl. La misión requiere un registro de auditoría."
@@ -5,7 +5,7 @@ Validator for Lab 02: GitOps Steward.
 Checks if the pipeline was executed in 'prod' mode with hashing and salt.
 """
 
-import json
+import itertools
 import os
 import sys
 from pathlib import Path
@@ -15,32 +15,39 @@ if sys.platform == "win32":
     import io
     sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
 
+ROOT_DIR = Path(__file__).resolve().parents[2]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.append(str(ROOT_DIR))
+
+from pipeline.records import iter_records, resolve_analysis_path  # noqa: E402
+
+
 def verify():
-    insights_file = Path("outputs/insights/analysis.json")
+    insights_file = resolve_analysis_path(Path("outputs/insights"))
 
     if not insights_file.exists():
         return False, "Evidence missing: outputs/insights/analysis.json not found."
 
+    # Los registros se leen en streaming: un error de JSON puede aparecer en cualquier línea
     try:
-        with open(insights_file, "r", encoding="utf-8") as f:
-            data = json.load(f)
-    except Exception as e:
-        return False, f"Error reading evidence: {e}"
-
-    if not data:
-        return False, "Evidence empty."
+        records = iter_records(insights_file)
+        first = next(records, None)
+        if first is None:
+            return False, "Evidence empty."
 
-    # Lab 02 specific checks
-    for record in data:
-        redaction = record.get("redaction", {})
-        if redaction.get("env") != "prod":
-            return False, f"Desajuste de entorno: Se esperaba 'prod', se encontró '{redaction.get('env')}'. Las misiones en el Laboratorio 02 deben estar listas para producción."
+        # Lab 02 specific checks
+        for record in itertools.chain([first], records):
+            redaction = record.get("redaction", {})
+            if redaction.get("env") != "prod":
+                return False, f"Desajuste de entorno: Se esperaba 'prod', se encontró '{redaction.get('env')}'. Las misiones en el Laboratorio 02 deben estar listas para producción."
 
-        if not redaction.get("enabled"):
-            return False, "Fallo de seguridad: La redacción debe estar habilitada en el Laboratorio 02."
+            if not redaction.get("enabled"):
+                return False, "Fallo de seguridad: La redacción debe estar habilitada en el Laboratorio 02."
 
-        if not redaction.get("hash_salt_set"):
-            return False, "Fallo de privacidad: COGNITIVE_HASH_SALT debe configurarse para garantizar IDs irreversibles."
+            if not redaction.get("hash_salt_set"):
+                return False, "Fallo de privacidad: COGNITIVE_HASH_SALT debe configurarse para garantizar IDs irreversibles."
+    except Exception as e:
+        return False, f"Error reading evidence: {e}"
 
     # The instruction provided a snippet that seems to replace the final success message
     # and also introduces new logic related to COGNITIVE_ENV.
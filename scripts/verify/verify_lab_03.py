@@ -15,12 +15,12 @@ if sys.platform == "win32":
 
 def verify():
     dashboard_file = Path("frontend/streamlit_app.py")
-    insights_file = Path("outputs/insights/analysis.json")
+    insights_dir = Path("outputs/insights")
 
     if not dashboard_file.exists():
         return False, "Evidencia ausente: No se encontró frontend/streamlit_app.py."
 
-    if not insights_file.exists():
+    if not any((insights_dir / name).exists() for name in ("analysis.json", "analysis.jsonl")):
         return False, "Evidencia ausente: No hay datos para visualizar (análisis ausente)."
 
     # Check for customization (Paso 4)
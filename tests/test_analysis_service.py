@@ -0,0 +1,123 @@
+import json
+import sys
+import threading
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+import pytest
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+if str(ROOT_DIR / "pipeline") not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR / "pipeline"))
+
+import analyze  # noqa: E402
+import service  # noqa: E402
+
+
+def request(base, path, payload=None):
+    data = json.dumps(payload).encode("utf-8") if payload is not None else None
+    req = urllib.request.Request(base + path, data=data, headers={"Content-Type": "application/json"})
+    with urllib.request.urlopen(req, timeout=10) as response:
+        return json.loads(response.read())
+
+
+def test_service_analyzes_inline_documents_and_directory_jobs(tmp_path, monkeypatch):
+    monkeypatch.setenv("COGNITIVE_FAST_MODE", "1")
+    monkeypatch.setenv("COGNITIVE_ENV", "dev")
+    monkeypatch.delenv("COGNITIVE_REDACT", raising=False)
+    monkeypatch.setenv("COGNITIVE_AUDIT_LOG", str(tmp_path / "audit.jsonl"))
+    raw = tmp_path / "raw"
+    raw.mkdir()
+    (raw / "a.txt").write_text("Idea de proyecto con riesgo.", encoding="utf-8")
+
+    server = service.create_server("127.0.0.1", 0, service.AnalysisService(data_root=str(tmp_path)))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        assert request(base, "/health")["status"] == "ok"
+
+        out = request(base, "/analyze", {
+            "documents": [{"name": "nota.txt", "text": "Idea de proyecto con riesgo."}],
+            "paths": [str(raw / "a.txt"), str(raw / "missing.txt")],
+        })
+        assert [record["file"] for record in out["records"]] == ["nota.txt", str(raw / "a.txt")]
+        assert out["records"][0]["intent_tags"] == analyze.generate_cognitive_tags("Idea de proyecto con riesgo.", None)
+        assert out["records"][0]["gitops_trace"]["run_id"] == out["run_id"]
+        assert [error["path"] for error in out["errors"]] == [str(raw / "missing.txt")]
+
+        output = tmp_path / "insights" / "analysis.jsonl"
+        summary = request(base, "/jobs", {"input": str(raw), "output": str(output), "no_cache": True})
+        assert summary["file_count"] == 1 and summary["error_count"] == 0
+        assert len(output.read_text(encoding="utf-8").splitlines()) == 1
+        assert request(base, "/health")["jobs"] == 2
+
+        outside = tmp_path.parent / "fuera.txt"
+        out = request(base, "/analyze", {"paths": [str(outside), "../fuera.txt", "raw/a.txt"]})
+        assert [error["path"] for error in out["errors"]] == [str(outside), "../fuera.txt"]
+        assert [record["file"] for record in out["records"]] == [str(raw / "a.txt")]
+        with pytest.raises(urllib.error.HTTPError) as denied:
+            request(base, "/jobs", {"input": "raw", "output": str(tmp_path.parent / "robado.jsonl")})
+        assert denied.value.code == 403
+        assert not (tmp_path.parent / "robado.jsonl").exists()
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_service_applies_client_redaction_settings(tmp_path, monkeypatch):
+    monkeypatch.setenv("COGNITIVE_FAST_MODE", "1")
+    monkeypatch.setenv("COGNITIVE_ENV", "dev")
+    monkeypatch.delenv("COGNITIVE_REDACT", raising=False)
+    monkeypatch.delenv("COGNITIVE_HASH_SALT", raising=False)
+    monkeypatch.setenv("COGNITIVE_AUDIT_LOG", str(tmp_path / "audit.jsonl"))
+    raw = tmp_path / "raw"
+    raw.mkdir()
+    (raw / "a.txt").write_text("Escribir a ana@example.com sobre el riesgo.", encoding="utf-8")
+    client = {"COGNITIVE_ENV": "dev", "COGNITIVE_REDACT": "1", "COGNITIVE_HASH_SALT": "sal"}
+
+    svc = service.AnalysisService(data_root=str(tmp_path))
+    out = svc.analyze_documents({"paths": [str(raw / "a.txt")], "redaction": client})
+    assert out["records"][0]["redacted"] is True
+    assert out["records"][0]["file"] == f"file_{analyze.hash_identifier('a.txt', 'sal')}"
+
+    output = tmp_path / "insights" / "analysis.jsonl"
+    svc.run_job({"input": str(raw), "output": str(output), "no_cache": True, "redaction": client})
+    record = json.loads(output.read_text(encoding="utf-8").splitlines()[0])
+    assert record["file"] == f"file_{analyze.hash_identifier('a.txt', 'sal')}"
+    assert "ana@example.com" not in output.read_text(encoding="utf-8")
+    assert svc.analyze_documents({"paths": [str(raw / "a.txt")]})["records"][0]["redacted"] is False
+
+
+def test_client_redaction_settings_cannot_weaken_the_service(monkeypatch):
+    monkeypatch.setenv("COGNITIVE_ENV", "prod")
+    monkeypatch.delenv("COGNITIVE_REDACT", raising=False)
+    monkeypatch.setenv("COGNITIVE_HASH_SALT", "servicio")
+
+    empty = {"COGNITIVE_ENV": "", "COGNITIVE_REDACT": "", "COGNITIVE_HASH_SALT": ""}
+    assert analyze.redaction_settings(empty) == ("prod", False, "servicio")
+    assert analyze.redaction_settings({"COGNITIVE_ENV": "dev", "COGNITIVE_REDACT": "0"}) == ("prod", False, "servicio")
+    assert analyze.redaction_settings({"COGNITIVE_HASH_SALT": "cliente"})[2] == "cliente"
+
+    monkeypatch.setenv("COGNITIVE_ENV", "dev")
+    monkeypatch.setenv("COGNITIVE_REDACT", "1")
+    assert analyze.redaction_settings({"COGNITIVE_REDACT": "0"})[:2] == ("dev", True)
+    assert analyze.redaction_settings({"COGNITIVE_ENV": "prod"})[0] == "prod"
+
+
+def test_service_counts_failed_documents_only_as_errors(tmp_path, monkeypatch):
+    monkeypatch.setenv("COGNITIVE_FAST_MODE", "1")
+    svc = service.AnalysisService()
+
+    def failing_build_record(*args, **kwargs):
+        raise RuntimeError("fallo")
+
+    monkeypatch.setattr(analyze, "build_record", failing_build_record)
+    analyzed = service.telemetry.DOCUMENTS.get(status="analyzed")
+    errors = service.telemetry.DOCUMENTS.get(status="error")
+
+    out = svc.analyze_documents({"documents": [{"name": "nota.txt", "text": "Idea."}]})
+    assert out["records"] == [] and len(out["errors"]) == 1
+    assert service.telemetry.DOCUMENTS.get(status="analyzed") == analyzed
+    assert service.telemetry.DOCUMENTS.get(status="error") == errors + 1
@@ -0,0 +1,651 @@
+import json
+import sys
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+for path in (ROOT_DIR / "pipeline", ROOT_DIR / "benchmarks"):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+import analyze  # noqa: E402
+import reference  # noqa: E402
+
+
+class FakeEnt:
+    def __init__(self, text, label):
+        self.text = text
+        self.label_ = label
+
+
+class FakeDoc:
+    def __init__(self, text, ents=()):
+        self.text = text
+        self.ents = list(ents)
+
+
+class FakeNLP:
+    def __init__(self):
+        self.pipe_calls = []
+
+    def __call__(self, text):
+        return FakeDoc(text)
+
+    def pipe(self, items, as_tuples=False, batch_size=1, n_process=1):
+        self.pipe_calls.append((batch_size, n_process))
+        for text, context in items:
+            yield FakeDoc(text), context
+
+
+TRACE = {"run_id": "test", "actor": "pytest", "env": "dev"}
+
+
+def test_iter_docs_batches_in_input_order(tmp_path):
+    paths = []
+    for idx in range(5):
+        path = tmp_path / f"doc_{idx}.txt"
+        path.write_text(f"documento {idx}", encoding="utf-8")
+        paths.append(path)
+    missing = tmp_path / "missing.txt"
+    paths.insert(2, missing)
+
+    nlp = FakeNLP()
+    out = list(analyze.iter_docs(paths, nlp, batch_size=4, n_process=2))
+
+    assert [item["path"] for item in out] == paths
+    assert nlp.pipe_calls == [(4, 2)]
+    assert out[2]["error"] is not None and out[2]["doc"] is None
+    assert out[0]["text"] == "documento 0"
+    assert out[0]["doc"].text == "documento 0"
+
+
+def test_batched_record_matches_single_file_record(tmp_path):
+    path = tmp_path / "nota.txt"
+    path.write_text("Idea de proyecto con riesgo. Autor: Ana López\n", encoding="utf-8")
+
+    single = analyze.generate_record(path, FakeNLP(), None, False, "", "dev", TRACE)
+    item = next(analyze.iter_docs([path], FakeNLP()))
+    batched = analyze.build_record(path, item["text"], item["doc"], None, False, "", "dev", TRACE)
+
+    assert item["error"] is None
+    for key in ("intent_tags", "sentiment", "summary", "author_signature", "relevance_score"):
+        assert single[key] == batched[key]
+    assert single["gitops_trace"]["source"] == batched["gitops_trace"]["source"]
+
+
+class FakeClassifier:
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, inputs, **kwargs):
+        self.calls.append((inputs, kwargs))
+        if isinstance(inputs, str):
+            inputs = [inputs]
+        return [
+            {"label": "NEGATIVE" if "malo" in text else "POSITIVE", "score": 0.9}
+            for text in inputs
+        ]
+
+
+def test_classify_sentiment_batch_uses_single_call_and_keeps_order():
+    classifier = FakeClassifier()
+    texts = ["esto es malo", "esto es bueno", "x" * 2000]
+
+    out = analyze.classify_sentiment_batch(texts, classifier, batch_size=8)
+
+    assert out == [("NEGATIVE", 0.9), ("POSITIVE", 0.9), ("POSITIVE", 0.9)]
+    assert len(classifier.calls) == 1
+    inputs, kwargs = classifier.calls[0]
+    assert kwargs["batch_size"] == 8 and kwargs["truncation"] is True
+    assert len(inputs[2]) == analyze.SENTIMENT_MAX_CHARS
+    assert out == [analyze.classify_sentiment(text, FakeClassifier()) for text in texts]
+
+
+def test_classify_sentiment_batch_falls_back_to_heuristic():
+    out = analyze.classify_sentiment_batch(["Resultado excelente.", "Sin datos"], None)
+    assert out == [analyze.heuristic_sentiment("Resultado excelente."), ("NEUTRAL", 0.5)]
+
+
+def test_analysis_cache_reuses_unchanged_files_and_drops_deleted(tmp_path):
+    raw = tmp_path / "raw"
+    raw.mkdir()
+    kept = raw / "kept.txt"
+    changed = raw / "changed.txt"
+    deleted = raw / "deleted.txt"
+    for path in (kept, changed, deleted):
+        path.write_text(f"contenido de {path.stem}", encoding="utf-8")
+    cache_path = tmp_path / "cache"
+
+    def run(fingerprint="v1"):
+        cache = analyze.AnalysisCache(cache_path, fingerprint)
+        cache.load()
+        items = list(analyze.iter_docs(sorted(analyze.iter_input_files(raw)), FakeNLP(), lookup=cache.get))
+        for item in items:
+            if item["cached"] is None:
+                record = analyze.build_record(
+                    item["path"], item["text"], item["doc"], None, False, "", "dev", TRACE
+                )
+                cache.put(item["path"], item["sha256"], record)
+        cache.save()
+        return cache, items
+
+    run()
+    changed.write_text("contenido nuevo", encoding="utf-8")
+    deleted.unlink()
+    cache, items = run()
+
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert {item["path"].name: item["cached"] is not None for item in items} == {
+        "changed.txt": False,
+        "kept.txt": True,
+    }
+    assert len(list(cache_path.glob("*/*.json"))) == 2
+
+    cache, _ = run(fingerprint="v2")
+    assert cache.hits == 0
+
+
+def test_analysis_cache_is_namespaced_per_input_directory(tmp_path, monkeypatch):
+    monkeypatch.setenv("COGNITIVE_FAST_MODE", "1")
+    monkeypatch.setenv("COGNITIVE_AUDIT_LOG", str(tmp_path / "audit.jsonl"))
+    cache_dir = tmp_path / "cache"
+    inputs = {}
+    for name in ("a", "b"):
+        inputs[name] = tmp_path / name
+        inputs[name].mkdir()
+        (inputs[name] / f"doc_{name}.txt").write_text(f"Idea {name} con riesgo. Autor: Ana", encoding="utf-8")
+
+    def run(name):
+        return analyze.main([
+            "--input", str(inputs[name]),
+            "--output", str(tmp_path / "insights" / f"{name}.jsonl"),
+            "--cache-dir", str(cache_dir),
+        ])
+
+    run("a")
+    run("b")
+    assert run("a")["cache_hits"] == 1
+    assert run("b")["cache_hits"] == 1
+    assert len(list(cache_dir.glob("*/*/*.json"))) == 2
+
+
+def test_pipeline_fingerprint_tracks_redaction_settings():
+    base = analyze.pipeline_fingerprint(None, None, False, "", "dev")
+    assert base == analyze.pipeline_fingerprint(None, None, False, "", "dev")
+    assert base != analyze.pipeline_fingerprint(None, None, True, "", "dev")
+    assert base != analyze.pipeline_fingerprint(None, None, False, "salt", "dev")
+
+
+def test_record_writer_json_matches_json_dump(tmp_path):
+    records = [{"uuid": "a", "summary": "línea\ncon salto"}, {"uuid": "b", "entities": [["PER", "Ana"]]}]
+    for batch in ([], records):
+        out = tmp_path / "analysis.json"
+        with analyze.RecordWriter(out, "json") as writer:
+            for record in batch:
+                writer.write(record)
+        assert out.read_text(encoding="utf-8") == json.dumps(batch, indent=2, ensure_ascii=False)
+        assert not writer.partial_path.exists()
+
+
+def test_record_writer_jsonl_keeps_partial_output_on_failure(tmp_path):
+    out = tmp_path / "analysis.jsonl"
+    try:
+        with analyze.RecordWriter(out, "jsonl") as writer:
+            writer.write({"uuid": "a"})
+            raise RuntimeError("fallo a mitad de análisis")
+    except RuntimeError:
+        pass
+
+    assert not out.exists()
+    lines = writer.partial_path.read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line) for line in lines] == [{"uuid": "a"}]
+
+
+def test_resolve_output_format():
+    assert analyze.resolve_output_format(Path("a.json"), None) == (Path("a.json"), "json")
+    assert analyze.resolve_output_format(Path("a.jsonl"), None) == (Path("a.jsonl"), "jsonl")
+    assert analyze.resolve_output_format(Path("a.json"), "jsonl") == (Path("a.jsonl"), "jsonl")
+
+
+REDACTION_FIXTURES = ROOT_DIR / "tests" / "fixtures" / "redaction"
+
+
+def test_redact_regex_matches_fixture_output():
+    for source in sorted(REDACTION_FIXTURES.glob("*.txt")):
+        if source.name.endswith(".expected.txt"):
+            continue
+        text = source.read_text(encoding="utf-8")
+        expected = source.with_name(f"{source.stem}.expected.txt").read_text(encoding="utf-8")
+        assert analyze.redact_regex(text) == expected
+        assert reference.redact_regex_sequential(text) == expected
+
+
+def test_redact_regex_is_equivalent_to_sequential_substitutions():
+    import random
+
+    tokens = [
+        "juan@x.com", "+34 600 123 456", "600123456", "91 123 45 67", "12345678Z",
+        "B12345678", "4111 1111 1111 1111", "4111 1111 1111 1112", "4111-1111-1111-1111",
+        "1.234,56 €", "100 EUR", "28001", "5 de marzo de 2024", "10.0.0.1", "123-45-6789",
+        "DNI:", "Empresa:", "cargo:", "Calle:", "en calidad de:", "texto", "(91)", "@",
+        "DİRECCİÓN: Foo 3", "dırección:", "ſociedad:", "RAZÓN SOCIAL:", "Nıf:",
+        "1234", ".", ",", "\n", " ",
+    ]
+    rng = random.Random(2024)
+    for _ in range(2000):
+        text = "".join(
+            rng.choice(tokens) + rng.choice(["", " ", "\n", ", ", "."])
+            for _ in range(rng.randint(1, 12))
+        )
+        assert analyze.redact_regex(text) == reference.redact_regex_sequential(text), text
+
+
+def test_find_regex_spans_prioritises_earlier_detectors():
+    text = "IP 192.168.1.254 y tel 600 123 456"
+    spans = analyze.find_regex_spans(text)
+    assert [name for _, _, name, _ in spans] == ["IP", "PHONE"]
+    assert analyze.apply_spans(text, spans) == "IP [REDACTED_IP] y tel [REDACTED_PHONE]"
+
+
+def test_entity_matcher_matches_per_entity_substitution():
+    doc = FakeDoc("", [
+        FakeEnt("Juan Pérez", "PER"),
+        FakeEnt("Acme S.A.", "ORG"),
+        FakeEnt("Madrid", "LOC"),
+        FakeEnt("Ana", "PER"),
+        FakeEnt("UE", "ORG"),
+        FakeEnt("contrato", "MISC"),
+    ])
+    text = "Juan Pérez firmó con ACME S.A. en madrid; ana revisó el contrato (UE)."
+
+    matcher = analyze.EntityMatcher(doc)
+
+    assert matcher.redact(text) == reference.redact_entities_sequential(text, doc)
+    assert analyze.redact_text(text, doc) == analyze.redact_text(text, doc, matcher)
+
+
+def test_entity_matcher_prefers_longest_overlapping_entity():
+    doc = FakeDoc("", [FakeEnt("Madrid", "LOC"), FakeEnt("Universidad de Madrid", "ORG")])
+    out = analyze.EntityMatcher(doc).redact("La Universidad de Madrid está en Madrid.")
+    assert out == "La [REDACTED_ORG] está en [REDACTED_LOC]."
+
+
+def test_build_record_redacts_each_document_once(tmp_path, monkeypatch):
+    path = tmp_path / "nota.txt"
+    text = "Idea: Ana López (ana@x.com) propone el proyecto. Tel 600 123 456.\n"
+    path.write_text(text, encoding="utf-8")
+    doc = FakeDoc(text, [FakeEnt("Ana López", "PER")])
+
+    matchers = []
+    original = analyze.EntityMatcher
+
+    def counting_matcher(doc):
+        matchers.append(doc)
+        return original(doc)
+
+    monkeypatch.setattr(analyze, "EntityMatcher", counting_matcher)
+    redaction = analyze.DocumentRedaction(text, doc)
+    record = analyze.build_record(
+        path, text, doc, None, True, "salt", "prod", TRACE, redaction=redaction
+    )
+
+    assert len(matchers) == 1
+    assert record["gitops_trace"]["source"]["sha256"] == analyze.hash_text(
+        analyze.redact_text(text, doc), "salt"
+    )
+    assert record["summary"] == analyze.redact_text(analyze.generate_summary(text, 400), doc)
+    assert redaction.counts == {"PER": 1, "EMAIL": 1, "PHONE": 1}
+
+
+def test_raw_hash_source_skips_redaction_in_dev(tmp_path, monkeypatch):
+    path = tmp_path / "nota.txt"
+    path.write_bytes(b"Contacto: ana@x.com\r\n")
+
+    def fail(text):
+        raise AssertionError("no debe redactarse el texto completo")
+
+    monkeypatch.setattr(analyze, "find_regex_spans", fail)
+    record = analyze.generate_record(path, FakeNLP(), None, False, "", "dev", TRACE, hash_source="raw")
+
+    assert record["gitops_trace"]["source"]["sha256"] == analyze.hashlib.sha256(path.read_bytes()).hexdigest()
+    assert record["redaction"]["hash_source"] == "raw"
+
+
+def test_worker_pool_keeps_input_order_and_reports_errors(tmp_path, monkeypatch):
+    monkeypatch.setenv("COGNITIVE_FAST_MODE", "1")
+    paths = []
+    for idx in range(6):
+        path = tmp_path / f"doc_{idx}.txt"
+        path.write_text(f"Idea {idx}: proyecto con riesgo. Contacto ana{idx}@x.com", encoding="utf-8")
+        paths.append(path)
+    paths.insert(3, tmp_path / "missing.txt")
+    settings = {
+        "redact": False,
+        "hash_salt": "",
+        "env": "dev",
+        "hash_source": "redacted",
+        "trace_context": TRACE,
+        "cache_path": str(tmp_path / "cache"),
+    }
+
+    with analyze.create_worker_pool(2, settings) as pool:
+        assert pool.submit(analyze.worker_fingerprint).result() == analyze.pipeline_fingerprint(
+            None, None, False, "", "dev", "redacted"
+        )
+        results = list(analyze.iter_parallel_results(pool, paths, 2))
+
+    assert [result["path"] for result in results] == paths
+    assert results[3]["error"] is not None and results[3]["record"] is None
+    expected = analyze.generate_record(paths[0], None, None, False, "", "dev", TRACE)
+    assert results[0]["record"]["summary"] == expected["summary"]
+    assert results[0]["record"]["gitops_trace"]["source"] == expected["gitops_trace"]["source"]
+    assert results[0]["redaction_counts"] == {"EMAIL": 1}
+    assert results[0]["cached"] is False
+
+
+def test_keyword_index_matches_sequential_tags_and_sentiment():
+    import random
+
+    tokens = [
+        "idea", "ideas", "ilegalidad", "legal", "ley", "plan", "planeta", "debe", "deber", "por hacer",
+        "riesgo", "riesgoso", "bien", "bien.", "mal", "malo", "Éxito", "PROBLEMA", "daño", "texto",
+        "sanción,", "(peligro)", "posible", "\n", ".",
+    ]
+    rng = random.Random(7)
+    for _ in range(1000):
+        text = rng.choice(["", " "]).join(rng.choice(tokens) + rng.choice([" ", "", "\n"]) for _ in range(rng.randint(0, 10)))
+        assert analyze.generate_cognitive_tags(text, None) == reference.generate_cognitive_tags_sequential(text, None), text
+        assert analyze.heuristic_sentiment(text) == reference.heuristic_sentiment_sequential(text), text
+
+
+def test_keyword_index_word_match_mode():
+    index = analyze.KeywordIndex({
+        "tag_match": "word",
+        "tags": {"proyecto": ["plan"], "acción pendiente": ["to do"]},
+        "sentiment": {"positive": ["good"], "negative": ["bad"]},
+    })
+    assert index.scan("The planet is good.").tags == []
+    assert index.scan("A plan, things to do. Good bad").tags == ["proyecto", "acción pendiente"]
+    assert index.scan("good bad").positive == {"good"} and index.scan("good bad!").negative == set()
+
+
+def test_fast_path_startup_skips_heavy_imports_within_budget(tmp_path):
+    import os
+    import subprocess
+
+    env = dict(os.environ, COGNITIVE_FAST_MODE="1")
+    out = subprocess.run(
+        [sys.executable, str(ROOT_DIR / "pipeline" / "analyze.py"), "--profile-startup"],
+        env=env, capture_output=True, text=True, check=True, cwd=tmp_path
+    )
+    report = json.loads(out.stdout)
+
+    assert report["fast_path"] is True
+    assert report["heavy_modules_loaded"] == []
+    assert report["within_budget"] is True
+    assert "import_spacy" not in report["phases_ms"]
+
+
+def test_import_optional_caches_missing_modules():
+    assert analyze.import_optional("modulo_que_no_existe_cognitive") is None
+    assert "modulo_que_no_existe_cognitive" in analyze._OPTIONAL_MODULES
+    assert analyze.import_optional("json") is json
+
+
+class EntityNLP(FakeNLP):
+    """Detecta como entidad ORG cada palabra en mayúsculas y registra el tamaño de cada texto."""
+
+    def __init__(self, max_length=1_000_000):
+        super().__init__()
+        self.max_length = max_length
+        self.lengths = []
+
+    def __call__(self, text):
+        import re
+
+        assert len(text) <= self.max_length
+        self.lengths.append(len(text))
+        doc = FakeDoc(text)
+        for match in re.finditer(r"\b[A-ZÁÉÍÓÚ]{3,}\b", text):
+            ent = FakeEnt(match.group(), "ORG")
+            ent.start_char, ent.end_char = match.start(), match.end()
+            doc.ents.append(ent)
+        return doc
+
+    def pipe(self, items, as_tuples=False, batch_size=1, n_process=1):
+        self.pipe_calls.append((batch_size, n_process))
+        for item in items:
+            if as_tuples:
+                yield self(item[0]), item[1]
+            else:
+                yield self(item)
+
+
+def test_iter_text_chunks_prefers_paragraph_and_sentence_boundaries():
+    text = "Primer párrafo corto.\n\nSegundo párrafo. Con dos frases largas aquí.\n\n" + "palabra " * 40
+    chunks = list(analyze.iter_text_chunks(text, 50))
+
+    assert "".join(chunk for _, chunk in chunks) == text
+    assert all(len(chunk) <= 50 for _, chunk in chunks)
+    assert chunks[0][1] == "Primer párrafo corto.\n\n"
+    assert [offset for offset, _ in chunks] == [sum(len(c) for _, c in chunks[:i]) for i in range(len(chunks))]
+
+
+def test_long_documents_are_chunked_with_entity_offsets(tmp_path):
+    paragraphs = [f"Reunión {idx} con ACME y la AEPD en Madrid.\n\n" for idx in range(200)]
+    text = "".join(paragraphs)
+    long_path = tmp_path / "largo.txt"
+    long_path.write_text(text, encoding="utf-8")
+    short_path = tmp_path / "corto.txt"
+    short_path.write_text("Nota breve de ACME.", encoding="utf-8")
+
+    nlp = EntityNLP(max_length=500)
+    items = list(analyze.iter_docs([short_path, long_path], nlp, batch_size=4))
+
+    assert [item["path"] for item in items] == [short_path, long_path]
+    doc = items[1]["doc"]
+    assert isinstance(doc, analyze.ChunkedDoc) and doc.chunks > 1
+    assert max(nlp.lengths) <= 500
+    assert items[1]["text"] == text
+    assert [(ent.label_, ent.text) for ent in doc.ents] == analyze.extract_entities(EntityNLP()(text))
+    assert all(text[ent.start_char:ent.end_char] == ent.text for ent in doc.ents)
+
+    record = analyze.build_record(long_path, text, doc, None, True, "", "prod", TRACE)
+    assert "ACME" not in record["summary"] and "[REDACTED_ORG]" in record["summary"]
+
+
+def test_segmented_sentiment_scores_whole_document_in_one_call():
+    text = ("Todo va bien. " * 40) + "\n\n" + ("Esto es malo. " * 40)
+    classifier = FakeClassifier()
+
+    head = analyze.classify_sentiment_batch([text], classifier)
+    calls_before = len(classifier.calls)
+    mean, = analyze.classify_sentiment_batch([text, "bien"], classifier, mode="segments")[:1]
+    worst = analyze.classify_sentiment_batch([text], classifier, mode="segments", aggregation="worst")
+
+    assert head == [("POSITIVE", 0.9)]
+    assert len(classifier.calls) == calls_before + 2
+    inputs, _ = classifier.calls[calls_before]
+    assert len(inputs) == len(analyze.sentiment_segments(text)) + 1
+    assert all(len(segment) <= analyze.SENTIMENT_MAX_CHARS for segment in inputs)
+    assert mean[0] in {"POSITIVE", "NEGATIVE"}
+    assert worst == [("NEGATIVE", 0.9)]
+
+
+def test_sentiment_segments_are_capped_and_keep_both_ends():
+    text = "".join(f"Frase número {idx}. " for idx in range(2000))
+    segments = analyze.sentiment_segments(text, max_segments=5)
+    assert len(segments) == 5
+    assert text.startswith(segments[0]) and text.endswith(segments[-1])
+
+
+def test_aggregate_sentiment_modes():
+    predictions = [("POSITIVE", 0.8), ("NEGATIVE", 0.6)]
+    assert analyze.aggregate_sentiment(predictions, [1, 1], "mean") == ("POSITIVE", 0.6)
+    assert analyze.aggregate_sentiment(predictions, [1, 4], "weighted") == ("NEGATIVE", 0.52)
+    assert analyze.aggregate_sentiment(predictions, [1, 1], "worst") == ("NEGATIVE", 0.6)
+
+
+def test_onnx_backend_falls_back_to_pytorch_when_unavailable(monkeypatch):
+    monkeypatch.delenv("COGNITIVE_SKIP_MODELS", raising=False)
+    monkeypatch.delenv("COGNITIVE_FAST_MODE", raising=False)
+    fallback = FakeClassifier()
+    monkeypatch.setattr(analyze, "load_onnx_sentiment_classifier", lambda: None)
+    monkeypatch.setattr(analyze, "import_optional", lambda name: type("T", (), {"pipeline": lambda *a, **k: fallback}))
+
+    assert analyze.load_sentiment_classifier("onnx") is fallback
+
+
+def test_onnx_backend_changes_fingerprint_and_normalises_labels():
+    class ORTModelForSequenceClassification:
+        name_or_path = "outputs/cache/onnx"
+
+    onnx_classifier = FakeClassifier()
+    onnx_classifier.model = ORTModelForSequenceClassification()
+    pytorch_fp = analyze.pipeline_fingerprint(None, FakeClassifier(), False, "", "dev")
+    onnx_fp = analyze.pipeline_fingerprint(None, onnx_classifier, False, "", "dev")
+
+    assert analyze.sentiment_model_id(onnx_classifier).startswith("onnx-int8:")
+    assert pytorch_fp != onnx_fp
+    assert analyze.normalize_sentiment_result({"label": "negative", "score": 0.7}) == ("NEGATIVE", 0.7)
+
+
+def test_spacy_profiles_exclude_unused_components(monkeypatch):
+    monkeypatch.delenv("COGNITIVE_SKIP_MODELS", raising=False)
+    monkeypatch.delenv("COGNITIVE_FAST_MODE", raising=False)
+    loads = []
+
+    class FakeSpacy:
+        @staticmethod
+        def load(name, exclude=()):
+            loads.append(list(exclude))
+            nlp = FakeNLP()
+            nlp.pipe_names = [c for c in ("tok2vec", "parser", "lemmatizer", "ner") if c not in exclude]
+            return nlp
+
+    monkeypatch.setattr(analyze, "import_optional", lambda name: FakeSpacy)
+
+    assert analyze.load_spacy_model("ner").pipe_names == ["tok2vec", "ner"]
+    assert analyze.load_spacy_model("tokenizer").pipe_names == []
+    assert analyze.load_spacy_model("full").pipe_names == ["tok2vec", "parser", "lemmatizer", "ner"]
+    monkeypatch.setenv("COGNITIVE_SPACY_PROFILE", "desconocido")
+    assert analyze.resolve_spacy_profile() == analyze.DEFAULT_SPACY_PROFILE
+    assert loads[2] == []
+
+
+def test_stage_timings_reach_audit_log_and_trace(tmp_path, monkeypatch):
+    monkeypatch.setenv("COGNITIVE_FAST_MODE", "1")
+    monkeypatch.setenv("COGNITIVE_AUDIT_LOG", str(tmp_path / "audit.jsonl"))
+    input_dir = tmp_path / "raw"
+    input_dir.mkdir()
+    for idx in range(3):
+        (input_dir / f"doc_{idx}.txt").write_text(f"Idea {idx} con riesgo. Autor: Ana", encoding="utf-8")
+    trace_path = tmp_path / "trace.json"
+
+    summary = analyze.main([
+        "--input", str(input_dir),
+        "--output", str(tmp_path / "insights" / "analysis.jsonl"),
+        "--no-cache",
+        "--trace-file", str(trace_path),
+    ])
+
+    events = [json.loads(line) for line in (tmp_path / "audit.jsonl").read_text(encoding="utf-8").splitlines()]
+    per_file = [event for event in events if event["event"] == "analysis_file"]
+    end = next(event for event in events if event["event"] == "analysis_end")
+    assert sorted(event["file"] for event in per_file) == ["doc_0.txt", "doc_1.txt", "doc_2.txt"]
+    assert {"read", "tags", "legal", "author", "redaction", "hashing", "serialization"} <= set(per_file[0]["stages_ms"])
+    assert list(end["stages_ms"]) == [s for s in analyze.ANALYSIS_STAGES if s in end["stages_ms"]]
+    assert summary["stages_ms"] == end["stages_ms"]
+    trace = json.loads(trace_path.read_text(encoding="utf-8"))
+    assert {event["name"] for event in trace["traceEvents"]} >= {"read", "sentiment", "hashing"}
+
+
+def test_speedscope_profile_keeps_events_sequential():
+    timer = analyze.StageTimer(record_events=True)
+    timer.add("spacy", 10.0, 5000.0)
+    timer.add("read", 10.001, 1.0, "a.txt")
+    timer.add("tags", 20.0, 2.0, "a.txt")
+
+    profile = timer.speedscope()["profiles"][0]
+    ats = [event["at"] for event in profile["events"]]
+    assert ats == sorted(ats)
+    assert profile["endValue"] == ats[-1]
+    assert timer.pop_file("a.txt") == {"read": 1.0, "tags": 2.0}
+    assert timer.summary() == {"read": 1.0, "spacy": 5000.0, "tags": 2.0}
+
+
+def test_near_duplicate_index_matches_similar_texts_only():
+    base = " ".join(f"palabra{idx} del informe" for idx in range(200))
+    edited = base.replace("palabra7 ", "palabra siete ")
+    other = " ".join(f"termino{idx} del acta" for idx in range(200))
+    index = analyze.NearDuplicateIndex(0.9)
+
+    assert index.add("a", analyze.minhash_signature(base)) is None
+    assert index.add("b", analyze.minhash_signature(other)) is None
+    representative, similarity = index.add("c", analyze.minhash_signature(edited))
+    assert representative == "a" and similarity >= 0.9
+
+
+def test_near_duplicates_reuse_representative_analysis(tmp_path, monkeypatch):
+    monkeypatch.setenv("COGNITIVE_FAST_MODE", "1")
+    monkeypatch.setenv("COGNITIVE_AUDIT_LOG", str(tmp_path / "audit.jsonl"))
+    monkeypatch.delenv("COGNITIVE_HASH_SALT", raising=False)
+    input_dir = tmp_path / "raw"
+    input_dir.mkdir()
+    body = " ".join(f"La propuesta {idx} del proyecto tiene un riesgo legal." for idx in range(60))
+    (input_dir / "a_original.txt").write_text(body + " Autor: Ana", encoding="utf-8")
+    (input_dir / "b_copia.txt").write_text(body + " Autor: Ana.", encoding="utf-8")
+    (input_dir / "c_otro.txt").write_text("Idea distinta sobre el contrato. Autor: Luis", encoding="utf-8")
+    output = tmp_path / "insights" / "analysis.jsonl"
+
+    summary = analyze.main([
+        "--input", str(input_dir), "--output", str(output), "--no-cache", "--near-duplicates",
+    ])
+
+    lines = output.read_text(encoding="utf-8").splitlines()
+    records = {Path(r["file"]).name: r for r in map(json.loads, lines)}
+    assert set(records) == {"a_original.txt", "b_copia.txt", "c_otro.txt"}
+    duplicate = records["b_copia.txt"]
+    assert duplicate["duplicate_of"] == records["a_original.txt"]["file"]
+    assert duplicate["near_duplicate_similarity"] >= 0.9
+    assert duplicate["uuid"] != records["a_original.txt"]["uuid"]
+    assert duplicate["intent_tags"] == records["a_original.txt"]["intent_tags"]
+    assert "intent_tags" in duplicate["near_duplicate_inherited"]
+    assert "word_count" not in duplicate["near_duplicate_inherited"]
+    copy_text = (input_dir / "b_copia.txt").read_text(encoding="utf-8")
+    assert duplicate["char_count"] == len(copy_text) != records["a_original.txt"]["char_count"]
+    copy_hash = analyze.hash_text(analyze.hashlib.sha256(copy_text.encode("utf-8")).hexdigest(), "")
+    assert duplicate["gitops_trace"]["source"]["sha256"] == copy_hash
+    assert duplicate["gitops_trace"]["source"]["sha256"] != records["a_original.txt"]["gitops_trace"]["source"]["sha256"]
+    assert "duplicate_of" not in records["c_otro.txt"]
+    assert summary["near_duplicate_count"] == 1
+    assert summary["file_count"] == 3
+
+
+def test_failed_representative_promotes_next_group_member(tmp_path, monkeypatch):
+    monkeypatch.setenv("COGNITIVE_FAST_MODE", "1")
+    monkeypatch.setenv("COGNITIVE_AUDIT_LOG", str(tmp_path / "audit.jsonl"))
+    input_dir = tmp_path / "raw"
+    input_dir.mkdir()
+    body = " ".join(f"La propuesta {idx} del proyecto tiene un riesgo legal." for idx in range(60))
+    for name, suffix in (("a_original", ""), ("b_copia", "."), ("c_copia", "..")):
+        (input_dir / f"{name}.txt").write_text(body + suffix, encoding="utf-8")
+    original = analyze.build_record
+
+    def failing_build_record(file_path, *args, **kwargs):
+        if file_path.name == "a_original.txt":
+            raise RuntimeError("fallo")
+        return original(file_path, *args, **kwargs)
+
+    monkeypatch.setattr(analyze, "build_record", failing_build_record)
+    output = tmp_path / "insights" / "analysis.jsonl"
+    summary = analyze.main([
+        "--input", str(input_dir), "--output", str(output), "--no-cache", "--near-duplicates",
+    ])
+
+    lines = output.read_text(encoding="utf-8").splitlines()
+    records = {Path(r["file"]).name: r for r in map(json.loads, lines)}
+    assert set(records) == {"b_copia.txt", "c_copia.txt"}
+    assert "duplicate_of" not in records["b_copia.txt"]
+    assert records["c_copia.txt"]["duplicate_of"] == records["b_copia.txt"]["file"]
+    assert summary["error_count"] == 1 and summary["near_duplicate_count"] == 1
+    assert summary["skipped_count"] == 0
@@ -0,0 +1,330 @@
+import json
+import sys
+import zipfile
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+for module_dir in ("ingestor", "pipeline"):
+    if str(ROOT_DIR / module_dir) not in sys.path:
+        sys.path.insert(0, str(ROOT_DIR / module_dir))
+
+import analyze  # noqa: E402
+import ingest  # noqa: E402
+
+
+class FakePage:
+    def __init__(self, text):
+        self.text = text
+
+    def get_text(self, kind):
+        return self.text
+
+
+class FakePdf:
+    """PDF de prueba: páginas separadas por saltos de página en un archivo de texto."""
+
+    def __init__(self, path):
+        self.pages = Path(path).read_text(encoding="utf-8").split("\f")
+        self.page_count = len(self.pages)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def load_page(self, number):
+        return FakePage(self.pages[number])
+
+
+def fake_fitz(monkeypatch):
+    module = type(sys)("fitz")
+    module.open = FakePdf
+    monkeypatch.setitem(sys.modules, "fitz", module)
+
+
+def run_ingest(monkeypatch, *argv):
+    monkeypatch.setattr(sys, "argv", ["ingest.py", *map(str, argv)])
+    ingest.main()
+
+
+def test_manifest_skips_unchanged_sources(tmp_path, monkeypatch):
+    source_dir = tmp_path / "input"
+    (source_dir / "sub").mkdir(parents=True)
+    (source_dir / "a.txt").write_text("uno", encoding="utf-8")
+    (source_dir / "sub" / "b.md").write_text("dos", encoding="utf-8")
+    output_dir = tmp_path / "outputs" / "raw"
+    calls = []
+    original = ingest.ingest_file
+
+    def counting_ingest(in_path, out_path, stats=None):
+        calls.append(in_path.name)
+        return original(in_path, out_path, stats)
+
+    monkeypatch.setattr(ingest, "ingest_file", counting_ingest)
+    run_ingest(monkeypatch, source_dir, "--output", output_dir)
+    assert sorted(calls) == ["a.txt", "b.md"]
+    assert (output_dir / "sub" / "b.txt").read_text(encoding="utf-8") == "dos"
+    assert (tmp_path / "outputs" / "cache" / "ingest" / "manifest.json").exists()
+
+    calls.clear()
+    run_ingest(monkeypatch, source_dir, "--output", output_dir)
+    assert calls == []
+
+    (source_dir / "a.txt").write_text("uno cambiado", encoding="utf-8")
+    run_ingest(monkeypatch, source_dir, "--output", output_dir)
+    assert calls == ["a.txt"]
+
+    calls.clear()
+    run_ingest(monkeypatch, source_dir, "--output", output_dir, "--force")
+    assert sorted(calls) == ["a.txt", "b.md"]
+
+
+def test_manifest_prune_keeps_other_input_directories(tmp_path, monkeypatch):
+    for name in ("a", "b"):
+        (tmp_path / name).mkdir()
+        (tmp_path / name / f"{name}.txt").write_text(name, encoding="utf-8")
+    output_dir = tmp_path / "outputs" / "raw"
+    run_ingest(monkeypatch, tmp_path / "a", "--output", output_dir)
+    run_ingest(monkeypatch, tmp_path / "b", "--output", output_dir)
+
+    manifest = ingest.IngestManifest(tmp_path / "outputs" / "cache" / "ingest" / "manifest.json")
+    manifest.load()
+    assert sorted(Path(key).name for key in manifest.entries) == ["a.txt", "b.txt"]
+
+    (tmp_path / "b" / "b.txt").unlink()
+    removed = manifest.prune(tmp_path / "b", [])
+    assert [Path(key).name for key in removed] == ["b.txt"]
+    assert [Path(key).name for key in manifest.entries] == ["a.txt"]
+
+
+def test_parallel_ingestion_matches_sequential(tmp_path):
+    source_dir = tmp_path / "input"
+    source_dir.mkdir()
+    for idx in range(6):
+        (source_dir / f"doc_{idx}.txt").write_text(f"texto {idx}", encoding="utf-8")
+    jobs = list(ingest.iter_jobs(source_dir, tmp_path / "raw"))
+
+    results = list(ingest.run_jobs(jobs, workers=3, media_workers=1))
+
+    assert sorted(r["source"] for r in results) == sorted(str(source) for source, _ in jobs)
+    assert all(r["ok"] and r["sha256"] for r in results)
+    for idx in range(6):
+        assert (tmp_path / "raw" / f"doc_{idx}.txt").read_text(encoding="utf-8") == f"texto {idx}"
+
+
+def test_whisper_model_loaded_once_per_process(tmp_path, monkeypatch):
+    loads = []
+
+    class FakeModel:
+        def __init__(self, name):
+            self.name = name
+
+        def transcribe(self, path):
+            return {"text": f"{self.name}:{Path(path).stem}"}
+
+    def load_model(name):
+        loads.append(name)
+        return FakeModel(name)
+
+    monkeypatch.setitem(sys.modules, "whisper", type(sys)("whisper"))
+    monkeypatch.setattr(sys.modules["whisper"], "load_model", load_model, raising=False)
+    monkeypatch.setattr(ingest, "_WHISPER_MODELS", {})
+    source_dir = tmp_path / "input"
+    source_dir.mkdir()
+    for name in ("uno", "dos", "tres"):
+        (source_dir / f"{name}.wav").write_bytes(b"RIFF")
+    output_dir = tmp_path / "outputs" / "raw"
+    manifest_path = tmp_path / "manifest.json"
+
+    run_ingest(monkeypatch, source_dir, "--output", output_dir, "--manifest", manifest_path, "--whisper-model", "tiny")
+    assert loads == ["tiny"]
+    assert (output_dir / "dos.txt").read_text(encoding="utf-8") == "tiny:dos"
+    entries = json.loads(manifest_path.read_text(encoding="utf-8"))["entries"]
+    assert all(entry["whisper_model"] == "tiny" and entry["elapsed_ms"] >= 0 for entry in entries.values())
+
+    run_ingest(monkeypatch, source_dir, "--output", output_dir, "--manifest", manifest_path, "--whisper-model", "tiny")
+    assert loads == ["tiny"]
+
+    run_ingest(monkeypatch, source_dir, "--output", output_dir, "--manifest", manifest_path, "--whisper-model", "small")
+    assert loads == ["tiny", "small"]
+    assert (output_dir / "uno.txt").read_text(encoding="utf-8") == "small:uno"
+
+
+def test_pdf_pages_stream_to_output_in_order(tmp_path, monkeypatch):
+    fake_fitz(monkeypatch)
+    pdf_path = tmp_path / "norma.pdf"
+    pdf_path.write_text("\f".join(f"página {idx}" for idx in range(9)), encoding="utf-8")
+    expected = "\n".join(f"página {idx}" for idx in range(9))
+
+    sequential = tmp_path / "secuencial.txt"
+    assert ingest.write_pdf_text(pdf_path, sequential) == 9
+    assert sequential.read_text(encoding="utf-8") == expected
+
+    parallel = tmp_path / "paralelo.txt"
+    assert ingest.write_pdf_text(pdf_path, parallel, workers=3, min_pages=2) == 9
+    assert parallel.read_text(encoding="utf-8") == expected
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["norma.pdf", "paralelo.txt", "secuencial.txt"]
+
+    stats = {}
+    assert ingest.ingest_file(pdf_path, tmp_path / "raw" / "norma.txt", stats)
+    assert stats == {"format": "pdf", "pages": 9}
+
+
+W_NS = 'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"'
+
+
+def write_docx(path, parts):
+    with zipfile.ZipFile(path, "w") as zf:
+        for name, body in parts.items():
+            zf.writestr(name, f'<?xml version="1.0" encoding="UTF-8"?>{body}')
+
+
+def test_docx_streaming_includes_headers_tables_and_footers(tmp_path):
+    docx_path = tmp_path / "contrato.docx"
+    write_docx(docx_path, {
+        "word/header1.xml": f'<w:hdr {W_NS}><w:p><w:r><w:t>Confidencial</w:t></w:r></w:p></w:hdr>',
+        "word/document.xml": (
+            f'<w:document {W_NS}><w:body>'
+            '<w:p><w:pPr><w:tabs><w:tab w:val="left"/></w:tabs></w:pPr>'
+            '<w:r><w:t>Cláusula 1:</w:t></w:r><w:r><w:tab/><w:t xml:space="preserve">Pago &amp; plazos</w:t></w:r></w:p>'
+            '<w:p/>'
+            '<w:tbl><w:tr><w:tc><w:p><w:r><w:t>Parte</w:t></w:r></w:p></w:tc>'
+            '<w:tc><w:p><w:r><w:t>Importe</w:t></w:r></w:p></w:tc></w:tr>'
+            '<w:tr><w:tc><w:p><w:r><w:t>Cliente</w:t></w:r></w:p></w:tc>'
+            '<w:tc><w:p><w:r><w:t>1.000 €</w:t></w:r></w:p></w:tc></w:tr></w:tbl>'
+            '<w:p><w:r><w:t>Línea uno</w:t><w:br/><w:t>línea dos</w:t></w:r></w:p>'
+            '</w:body></w:document>'
+        ),
+        "word/footer1.xml": f'<w:ftr {W_NS}><w:p><w:r><w:t>Página</w:t></w:r></w:p></w:ftr>',
+    })
+
+    paragraphs = list(ingest.iter_docx_paragraphs(docx_path))
+    assert paragraphs == [
+        "Confidencial",
+        "Cláusula 1:\tPago & plazos",
+        "Parte | Importe",
+        "Cliente | 1.000 €",
+        "Línea uno\nlínea dos",
+        "Página",
+    ]
+    with zipfile.ZipFile(docx_path) as zf, zf.open("word/document.xml") as handle:
+        # Bloques diminutos: ninguna etiqueta ni texto partido entre bloques debe perderse
+        assert list(ingest.iter_docx_xml_paragraphs(handle, chunk_size=7)) == paragraphs[1:-1]
+    stats = {}
+    out_path = tmp_path / "raw" / "contrato.txt"
+    assert ingest.ingest_file(docx_path, out_path, stats)
+    assert stats == {"format": "docx", "paragraphs": 6}
+    assert out_path.read_text(encoding="utf-8") == ingest.extract_docx_text(docx_path)
+
+
+def test_content_addressed_store_dedups_ingestion_and_analysis(tmp_path, monkeypatch):
+    monkeypatch.setenv("COGNITIVE_FAST_MODE", "1")
+    monkeypatch.setenv("COGNITIVE_ENV", "dev")
+    monkeypatch.delenv("COGNITIVE_REDACT", raising=False)
+    monkeypatch.setenv("COGNITIVE_AUDIT_LOG", str(tmp_path / "audit.jsonl"))
+    source_dir = tmp_path / "input"
+    (source_dir / "correo_2").mkdir(parents=True)
+    (source_dir / "adjunto.txt").write_text("Idea de proyecto con riesgo legal.", encoding="utf-8")
+    (source_dir / "correo_2" / "copia.md").write_text("Idea de proyecto con riesgo legal.", encoding="utf-8")
+    (source_dir / "otro.txt").write_text("Otro documento distinto.", encoding="utf-8")
+    store_dir = tmp_path / "outputs" / "raw"
+
+    run_ingest(monkeypatch, source_dir, "--output", store_dir, "--store")
+    index = json.loads((store_dir / "index.json").read_text(encoding="utf-8"))["entries"]
+    assert len(index) == 3
+    assert len({entry["sha256"] for entry in index.values()}) == 2
+    assert len(list((store_dir / "objects").rglob("*.txt"))) == 2
+    assert not list((store_dir / "tmp").iterdir())
+
+    summary = analyze.main([
+        "--input", str(store_dir),
+        "--output", str(tmp_path / "insights" / "analysis.jsonl"),
+        "--no-cache",
+    ])
+    assert summary["file_count"] == 2
+    records = [
+        json.loads(line)
+        for line in (tmp_path / "insights" / "analysis.jsonl").read_text(encoding="utf-8").splitlines()
+    ]
+    shared = next(record for record in records if len(record["sources"]) == 2)
+    assert [Path(source).name for source in shared["sources"]] == ["adjunto.txt", "copia.md"]
+    assert shared["title"] == "adjunto"
+    assert shared["content_type"] == "txt"
+
+    (source_dir / "otro.txt").unlink()
+    run_ingest(monkeypatch, source_dir, "--output", store_dir, "--store")
+    assert len(json.loads((store_dir / "index.json").read_text(encoding="utf-8"))["entries"]) == 2
+    assert len(list((store_dir / "objects").rglob("*.txt"))) == 1
+
+
+def test_store_gc_keeps_objects_of_other_input_directories(tmp_path, monkeypatch):
+    for name in ("a", "b"):
+        (tmp_path / name).mkdir()
+        (tmp_path / name / f"{name}.txt").write_text(f"Texto de {name}.", encoding="utf-8")
+    store_dir = tmp_path / "outputs" / "raw"
+    run_ingest(monkeypatch, tmp_path / "a", "--output", store_dir, "--store")
+    run_ingest(monkeypatch, tmp_path / "b", "--output", store_dir, "--store")
+
+    index = json.loads((store_dir / "index.json").read_text(encoding="utf-8"))["entries"]
+    assert sorted(Path(source).name for source in index) == ["a.txt", "b.txt"]
+    assert all((store_dir / entry["object"]).exists() for entry in index.values())
+
+    # Un objeto que no liberó ninguna entrada de esta ejecución no se recoge
+    foreign = store_dir / "objects" / "ff" / "ff" / ("f" * 64 + ".txt")
+    foreign.parent.mkdir(parents=True)
+    foreign.write_text("de otro manifiesto", encoding="utf-8")
+    # Un texto modificado libera su objeto anterior, salvo que otra fuente lo comparta
+    old_object = next(store_dir / entry["object"] for source, entry in index.items() if source.endswith("b.txt"))
+    (tmp_path / "b" / "b.txt").write_text("Texto nuevo de b.", encoding="utf-8")
+    run_ingest(monkeypatch, tmp_path / "b", "--output", store_dir, "--store")
+    assert not old_object.exists()
+    assert foreign.exists()
+    assert len(list((store_dir / "objects").rglob("*.txt"))) == 3
+
+
+def test_unknown_formats_are_sniffed_and_binaries_become_stubs(tmp_path, monkeypatch):
+    fake_fitz(monkeypatch)
+    (tmp_path / "escaneo.bin").write_text("%PDF-1.7\fContrato de arrendamiento", encoding="utf-8")
+    (tmp_path / "LEEME").write_text("Notas de la reunión sobre el proyecto.", encoding="utf-8")
+    (tmp_path / "volcado.dat").write_bytes(bytes(range(256)) * 64)
+
+    assert ingest.sniff_format(tmp_path / "escaneo.bin") == "pdf"
+    assert ingest.sniff_format(tmp_path / "LEEME") == "text"
+    assert ingest.sniff_format(tmp_path / "volcado.dat") == "binary"
+
+    stats = {}
+    assert ingest.ingest_file(tmp_path / "volcado.dat", tmp_path / "raw" / "volcado.txt", stats)
+    stub = (tmp_path / "raw" / "volcado.txt").read_text(encoding="utf-8")
+    assert stats == {"format": "binary"}
+    assert stub.startswith(ingest.BINARY_STUB_MARKER)
+    assert "tamaño: 16384 bytes" in stub
+    assert ingest.ingest_file(tmp_path / "escaneo.bin", tmp_path / "raw" / "escaneo.txt")
+    assert "Contrato de arrendamiento" in (tmp_path / "raw" / "escaneo.txt").read_text(encoding="utf-8")
+
+
+def test_analysis_skips_non_linguistic_content(tmp_path, monkeypatch):
+    import base64
+
+    monkeypatch.setenv("COGNITIVE_FAST_MODE", "1")
+    monkeypatch.setenv("COGNITIVE_AUDIT_LOG", str(tmp_path / "audit.jsonl"))
+    raw = tmp_path / "raw"
+    raw.mkdir()
+    (raw / "acta.txt").write_text("Acta de la reunión: el equipo aprueba la propuesta.", encoding="utf-8")
+    (raw / "volcado.txt").write_text(f"{ingest.BINARY_STUB_MARKER}\nnombre: volcado.dat\n", encoding="utf-8")
+    (raw / "adjunto.txt").write_text(base64.b64encode(bytes(range(256)) * 8).decode("ascii"), encoding="utf-8")
+    (raw / "tabla.txt").write_text("1.234,56 | 7.890,12 | 3,14 | 2024-01-01\n" * 20, encoding="utf-8")
+
+    assert analyze.BINARY_STUB_MARKER == ingest.BINARY_STUB_MARKER
+    summary = analyze.main([
+        "--input", str(raw),
+        "--output", str(tmp_path / "insights" / "analysis.jsonl"),
+        "--no-cache",
+    ])
+
+    assert summary["file_count"] == 1
+    assert summary["skipped_count"] == 3
+    events = [json.loads(line) for line in (tmp_path / "audit.jsonl").read_text(encoding="utf-8").splitlines()]
+    end = next(event for event in events if event["event"] == "analysis_end")
+    assert sorted(end["skipped_files"]) == ["adjunto.txt", "tabla.txt", "volcado.txt"]
+    assert analyze.non_linguistic_reason("1234 5678", min_letter_ratio=0) == ""
@@ -0,0 +1,23 @@
+import json
+import sys
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+if str(ROOT_DIR / "pipeline") not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR / "pipeline"))
+
+import records  # noqa: E402
+
+
+def test_read_records_stops_jsonl_at_limit(tmp_path):
+    path = tmp_path / "analysis.jsonl"
+    # La línea final no es JSON válido: leerla haría fallar la carga
+    path.write_text("".join(json.dumps({"i": i}) + "\n" for i in range(5)) + "{roto\n", encoding="utf-8")
+
+    data, truncated = records.read_records(path, 3)
+    assert [rec["i"] for rec in data] == [0, 1, 2] and truncated
+
+    listing = tmp_path / "analysis.json"
+    listing.write_text(json.dumps([{"i": 0}, {"i": 1}]), encoding="utf-8")
+    assert records.read_records(listing, 2) == ([{"i": 0}, {"i": 1}], False)
+    assert records.read_records(listing, 0) == ([{"i": 0}, {"i": 1}], False)
@@ -0,0 +1,64 @@
+import sys
+import urllib.request
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+if str(ROOT_DIR / "pipeline") not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR / "pipeline"))
+
+import analyze  # noqa: E402
+import telemetry  # noqa: E402
+
+
+def test_registry_renders_text_exposition_format():
+    registry = telemetry.MetricsRegistry()
+    counter = registry.counter("demo_total", "Contador de prueba", ("detector",))
+    histogram = registry.histogram("demo_seconds", "Histograma de prueba", buckets=(0.1, 1.0))
+    counter.inc(2, detector='E"MAIL')
+    histogram.observe(0.05)
+    histogram.observe(0.5)
+
+    lines = registry.render().splitlines()
+    assert "# TYPE demo_total counter" in lines
+    assert 'demo_total{detector="E\\"MAIL"} 2' in lines
+    assert 'demo_seconds_bucket{le="0.1"} 1' in lines
+    assert 'demo_seconds_bucket{le="1"} 2' in lines
+    assert 'demo_seconds_bucket{le="+Inf"} 2' in lines
+    assert "demo_seconds_sum 0.55" in lines
+    assert "demo_seconds_count 2" in lines
+
+
+def test_analysis_run_feeds_metrics_file_and_http_endpoint(tmp_path, monkeypatch):
+    monkeypatch.setenv("COGNITIVE_FAST_MODE", "1")
+    monkeypatch.setenv("COGNITIVE_AUDIT_LOG", str(tmp_path / "audit.jsonl"))
+    input_dir = tmp_path / "raw"
+    input_dir.mkdir()
+    for idx in range(2):
+        (input_dir / f"doc_{idx}.txt").write_text(f"Contacto ana{idx}@x.com", encoding="utf-8")
+    analyzed_before = telemetry.DOCUMENTS.get(status="analyzed")
+    emails_before = telemetry.REDACTIONS.get(detector="EMAIL")
+    reads_before = telemetry.STAGE_SECONDS.count(stage="read")
+    metrics_file = tmp_path / "metrics" / "analysis.prom"
+
+    analyze.main([
+        "--input", str(input_dir),
+        "--output", str(tmp_path / "insights" / "analysis.json"),
+        "--no-cache",
+        "--metrics-file", str(metrics_file),
+    ])
+
+    assert telemetry.DOCUMENTS.get(status="analyzed") == analyzed_before + 2
+    assert telemetry.REDACTIONS.get(detector="EMAIL") == emails_before + 2
+    assert telemetry.STAGE_SECONDS.count(stage="read") == reads_before + 2
+    exposition = metrics_file.read_text(encoding="utf-8")
+    assert "cognitive_model_load_seconds " in exposition
+    assert 'cognitive_stage_duration_seconds_bucket{stage="hashing",le="+Inf"}' in exposition
+
+    server = telemetry.start_http_server(0)
+    try:
+        url = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+        with urllib.request.urlopen(url, timeout=5) as response:
+            assert response.headers["Content-Type"] == telemetry.CONTENT_TYPE
+            assert "cognitive_documents_processed_total" in response.read().decode("utf-8")
+    finally:
+        telemetry.stop_http_server(server)